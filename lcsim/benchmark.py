@@ -0,0 +1,461 @@
+"""
+Benchmark suite for the circuit builders and evaluation engines.
+
+Every case builds one circuit in a fresh Python process, so construction
+time and peak memory are not skewed by earlier cases, and reports:
+
+    build_seconds      time to build the circuit of gates
+    gates              number of components instantiated by the build
+    compile_seconds    time to compile the circuit into a netlist
+    wires              number of wires of the compiled netlist
+    rss_kb             peak resident set size of the process before the
+                       build, after build and compile, and at the end
+    engines            for every evaluation engine, the time to prepare it
+                       for the circuit, the time to evaluate a batch of
+                       random input vectors, and whether its outputs
+                       match those of the netlist engine
+
+Run the whole suite with
+
+    python -m lcsim.benchmark -o results.json
+
+and compare two runs with
+
+    python -m lcsim.benchmark --compare before.json results.json
+
+New engines are added to the comparison with register_engine(), or on
+the command line with
+
+    python -m lcsim.benchmark --add-engine mine=package.module:prepare
+"""
+import argparse
+import collections
+import importlib
+import json
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+
+from lcsim.circuits import adders, bitwise, netlist
+from lcsim.circuits.simulation import EventSimulator
+from lcsim.components.base import ComponentBase
+from lcsim.sha1 import builder
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+__author__ = 'Jacky'
+
+# Case name -> (builder function, arguments)
+CASES = collections.OrderedDict()
+
+for _n in (8, 64, 256, 1024):
+    CASES['adder-%d' % _n] = (adders.ripple_adder_no_carry, (_n,))
+for _name in ('and', 'or', 'xor', 'not'):
+    for _n in (8, 64, 256, 1024):
+        CASES['bitwise-%s-%d' % (_name, _n)] = (
+            getattr(bitwise, 'bitwise_%s_circuit' % _name), (_n,))
+for _rounds in (1, 10, 20, 40, 80):
+    CASES['sha1-%d' % _rounds] = (builder.sha1_circuit, (_rounds,))
+
+# Engine name -> function that prepares an engine for a circuit, see
+# register_engine
+ENGINES = collections.OrderedDict()
+
+
+def register_engine(name, prepare):
+    """
+    Add an evaluation engine to the benchmark.
+
+    Parameters:
+        name:
+            Name of the engine in the results.
+        prepare:
+            Function that takes a circuit and returns a function that
+            evaluates the circuit for a list of input vectors. Input
+            vectors and results are lists of bits. Raising ImportError
+            marks the engine as unavailable, e.g. if an optional dependency
+            is missing. Since run() benchmarks every case in a separate
+            process, the function must be defined at the top level of an
+            importable module, so the process can import it by name.
+
+    Example usage:
+        >>> def prepare(circuit):
+        ...     compiled = circuit.compile()
+        ...     return lambda vectors: [compiled.evaluate(v) for v in vectors]
+        >>> register_engine('netlist-copy', prepare)
+
+    :type name str
+    """
+    ENGINES[name] = prepare
+
+
+def _netlist_engine(circuit):
+    compiled = circuit.compile()
+    return lambda vectors: [compiled.evaluate(v) for v in vectors]
+
+
+def _jit_engine(circuit):
+    function = circuit.jit()
+    return lambda vectors: [function(v) for v in vectors]
+
+
+def _bitsliced_engine(circuit):
+    function = circuit.jit()
+
+    def evaluate(vectors):
+        size = len(vectors)
+        lanes = netlist.pack_lanes(vectors, len(circuit._inputs))
+        return netlist.unpack_lanes(function(lanes, (1 << size) - 1), size)
+
+    return evaluate
+
+
+def _vectorized_engine(circuit):
+    from lcsim.circuits import vectorized
+
+    engine = vectorized.VectorizedNetlist(circuit.compile())
+    return lambda vectors: engine.evaluate(vectors).tolist()
+
+
+def _event_engine(circuit):
+    simulator = EventSimulator(circuit)
+
+    def evaluate(vectors):
+        result = []
+        for vector in vectors:
+            simulator.set_inputs(vector)
+            result.append(simulator.outputs())
+
+        return result
+
+    return evaluate
+
+
+register_engine('netlist', _netlist_engine)
+register_engine('jit', _jit_engine)
+register_engine('bitsliced', _bitsliced_engine)
+register_engine('vectorized', _vectorized_engine)
+register_engine('event', _event_engine)
+
+# Engines defined in this module, which every process knows without being
+# told, see _engine_spec
+_BUILTIN_ENGINES = dict(ENGINES)
+
+
+def run_case(name, engines=None, vectors=64, seed=0):
+    """
+    Run a single benchmark case in the current process.
+
+    Parameters:
+        name:
+            Name of the case, a key of CASES.
+        engines:
+            Names of the engines to evaluate with, defaults to all of them.
+        vectors:
+            Number of random input vectors to evaluate.
+        seed:
+            Seed for the random input vectors.
+
+    Returns:
+        Dictionary of results, see the module documentation.
+
+    Raises:
+        KeyError if the case or an engine does not exist.
+
+    :type name str
+    :rtype dict
+    """
+    function, args = CASES[name]
+    if engines is None:
+        engines = list(ENGINES)
+
+    result = {'case': name, 'rss_kb': {'before': _peak_rss()}}
+
+    count = ComponentBase.count
+    start = time.time()
+    circuit = function(*args)
+    result['build_seconds'] = time.time() - start
+    result['gates'] = ComponentBase.count - count
+
+    start = time.time()
+    compiled = circuit.compile()
+    result['compile_seconds'] = time.time() - start
+    result['wires'] = len(compiled.ops)
+    result['rss_kb']['build'] = _peak_rss()
+
+    rng = random.Random(seed)
+    inputs = [[rng.getrandbits(1) for _ in xrange(0, compiled.input_size)]
+              for _ in xrange(0, vectors)]
+    expected = [compiled.evaluate(v) for v in inputs]
+
+    result['engines'] = collections.OrderedDict()
+    for engine in engines:
+        prepare = ENGINES[engine]
+
+        start = time.time()
+        try:
+            evaluate = prepare(circuit)
+        except ImportError as e:
+            result['engines'][engine] = {'error': str(e)}
+            continue
+        prepared = time.time()
+
+        outputs = evaluate(inputs)
+        end = time.time()
+
+        result['engines'][engine] = {
+            'prepare_seconds': prepared - start,
+            'evaluate_seconds': end - prepared,
+            'vectors': vectors,
+            'matches': [list(x) for x in outputs] == expected,
+        }
+
+    result['rss_kb']['end'] = _peak_rss()
+    return result
+
+
+def run(cases=None, engines=None, vectors=64, seed=0, log=None):
+    """
+    Run benchmark cases, each in a fresh Python process.
+
+    Parameters:
+        cases:
+            Names of the cases to run, defaults to all of them.
+        engines:
+            Names of the engines to evaluate with, defaults to all of them.
+        vectors:
+            Number of random input vectors to evaluate per case.
+        seed:
+            Seed for the random input vectors.
+        log:
+            Optional file to report progress to.
+
+    Returns:
+        Dictionary with information about the machine and the list of case
+        results under 'results'.
+
+    Raises:
+        RuntimeError if a case fails.
+        ValueError if an engine registered with register_engine() cannot
+        be imported by the case processes.
+
+    :rtype dict
+    """
+    if cases is None:
+        cases = list(CASES)
+
+    command = [sys.executable, '-m', 'lcsim.benchmark', '--vectors',
+               str(vectors), '--seed', str(seed)]
+    for name in (list(ENGINES) if engines is None else engines):
+        if _BUILTIN_ENGINES.get(name) is not ENGINES[name]:
+            command += ['--add-engine', _engine_spec(name, ENGINES[name])]
+    if engines is not None:
+        command += ['--engines', ','.join(engines)]
+
+    results = []
+    for name in cases:
+        if log is not None:
+            print >> log, 'Running %s' % name
+
+        process = subprocess.Popen(command + ['--run-case', name],
+                                   stdout=subprocess.PIPE)
+        output, _ = process.communicate()
+        if process.returncode != 0:
+            raise RuntimeError('Benchmark case %s failed.' % name)
+
+        results.append(json.loads(output))
+
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'vectors': vectors,
+        'results': results,
+    }
+
+
+def compare(before, after):
+    """
+    Returns a table comparing two benchmark runs, as text with one line per
+    case that appears in both: build time, compile time, memory used by
+    the build and evaluation time of every engine, before -> after.
+
+    :type before dict
+    :type after dict
+    :rtype str
+    """
+    old = dict((r['case'], r) for r in before['results'])
+
+    lines = []
+    for new in after['results']:
+        if new['case'] not in old:
+            continue
+
+        previous = old[new['case']]
+        columns = [new['case'],
+                   _change('build', previous['build_seconds'],
+                           new['build_seconds']),
+                   _change('compile', previous['compile_seconds'],
+                           new['compile_seconds'])]
+
+        memory = [_build_memory(r) for r in (previous, new)]
+        if None not in memory:
+            columns.append('build rss %dkB -> %dkB' % tuple(memory))
+
+        for engine, values in new['engines'].iteritems():
+            values0 = previous['engines'].get(engine, {})
+            if 'evaluate_seconds' in values and \
+                    'evaluate_seconds' in values0:
+                columns.append(_change(engine, values0['evaluate_seconds'],
+                                       values['evaluate_seconds']))
+
+        lines.append('  '.join(columns))
+
+    return '\n'.join(lines)
+
+
+def _engine_spec(name, prepare):
+    """
+    Returns the --add-engine argument that registers an engine in another
+    process, as name=module:function.
+
+    Raises:
+        ValueError if the function cannot be imported by name.
+    """
+    module = getattr(prepare, '__module__', None)
+    function = getattr(prepare, '__name__', None)
+    if module in (None, '__main__') or \
+            getattr(sys.modules.get(module), function, None) is not prepare:
+        raise ValueError('Engine %s cannot be benchmarked in a separate '
+                         'process, its function is not importable.' % name)
+
+    return '%s=%s:%s' % (name, module, function)
+
+
+def _load_engine(spec):
+    """
+    Returns (name, function) for an --add-engine argument name=module:function.
+
+    Raises:
+        ValueError if the argument is malformed or the function cannot be
+        imported.
+    """
+    name, _, path = spec.partition('=')
+    module, _, function = path.partition(':')
+    if not (name and module and function):
+        raise ValueError('Expected name=module:function, got %s.' % spec)
+
+    try:
+        return name, getattr(importlib.import_module(module), function)
+    except (ImportError, AttributeError) as e:
+        raise ValueError('Cannot import engine %s: %s' % (name, e))
+
+
+def _change(label, before, after):
+    return '%s %.4fs -> %.4fs (x%.2f)' % (label, before, after,
+                                          after / before if before else 0)
+
+
+def _build_memory(result):
+    """
+    Returns the growth of the peak resident set size during build and
+    compile of a case result in kB, or None if it was not measured.
+    """
+    rss = result['rss_kb']
+    if rss['before'] is None:
+        return None
+
+    return rss['build'] - rss['before']
+
+
+def _peak_rss():
+    """
+    Returns the peak resident set size of the process in kB, or None if it
+    cannot be measured on this platform.
+    """
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on OS X and in kB elsewhere
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m lcsim.benchmark',
+        description='Benchmark circuit construction and evaluation.')
+    parser.add_argument('-o', '--output',
+                        help='write the JSON results to this file')
+    parser.add_argument('-c', '--cases', default='.',
+                        help='regular expression selecting the cases to run')
+    parser.add_argument('-e', '--engines',
+                        help='comma-separated engines to evaluate with '
+                             '(default: %s)' % ','.join(ENGINES))
+    parser.add_argument('--add-engine', action='append', default=[],
+                        metavar='NAME=MODULE:FUNCTION',
+                        help='register an engine implemented by a function '
+                             'of an importable module, see register_engine '
+                             '(may be repeated)')
+    parser.add_argument('-n', '--vectors', type=int, default=64,
+                        help='random input vectors per case')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-l', '--list', action='store_true',
+                        help='list the cases and engines and exit')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'),
+                        help='compare two JSON result files and exit')
+    parser.add_argument('--run-case', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    for spec in args.add_engine:
+        try:
+            register_engine(*_load_engine(spec))
+        except ValueError as e:
+            parser.error(str(e))
+
+    engines = args.engines.split(',') if args.engines else None
+    for engine in engines or ():
+        if engine not in ENGINES:
+            parser.error('unknown engine %s' % engine)
+
+    if args.list:
+        print 'Cases: %s' % ' '.join(CASES)
+        print 'Engines: %s' % ' '.join(ENGINES)
+        return
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            before = json.load(f)
+        with open(args.compare[1]) as f:
+            after = json.load(f)
+
+        print compare(before, after)
+        return
+
+    if args.run_case:
+        json.dump(run_case(args.run_case, engines, args.vectors, args.seed),
+                  sys.stdout)
+        return
+
+    pattern = re.compile(args.cases)
+    cases = [name for name in CASES if pattern.search(name)]
+
+    results = run(cases, engines, args.vectors, args.seed, sys.stderr)
+    text = json.dumps(results, indent=2, sort_keys=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print text
+
+
+if __name__ == '__main__':
+    main()
@@ -64,6 +64,10 @@ def ripple_adder_no_carry(bits):
     result = circuit.Circuit('%dAdd' % bits, 2 * bits, bits)
     full_adds = [__full_adder_components() for _ in xrange(0, bits)]
 
+    # Gates reading bit i of A and B, wired to the input space at the end
+    input_xors = [None] * bits
+    input_ands = [None] * bits
+
     for i in xrange(bits - 1, -1, -1):
         if i < bits - 1:
             xors, ands, ors = full_adds[i]
@@ -74,10 +78,8 @@ def ripple_adder_no_carry(bits):
                 next_xors[1].add_input(ors[0], 1)
                 next_ands[0].add_input(ors[0], 1)
 
-            # Now connect the circuit inputs for this bit addition
-            # Remember inputs are stacked so A is i, B is i + bits
-            result.add_input_component(xors[0], {i: 0, i + bits: 1})
-            result.add_input_component(ands[1], {i: 0, i + bits: 1})
+            input_xors[i] = xors[0]
+            input_ands[i] = ands[1]
 
             # Now set the output sum bit, result of the second XOR gate
             result.add_output_component(xors[1], i)
@@ -87,8 +89,8 @@ def ripple_adder_no_carry(bits):
             xor_g = gates.XORGate()
             and_g = gates.ANDGate()
 
-            result.add_input_component(xor_g, {i: 0, i + bits: 1})
-            result.add_input_component(and_g, {i: 0, i + bits: 1})
+            input_xors[i] = xor_g
+            input_ands[i] = and_g
 
             result.add_output_component(xor_g, i)
             if bits > 1:
@@ -97,4 +99,9 @@ def ripple_adder_no_carry(bits):
                 next_xors[1].add_input(and_g, 1)
                 next_ands[0].add_input(and_g, 1)
 
+    # Inputs are stacked so A is i, B is i + bits
+    for components in (input_xors, input_ands):
+        result.add_input_bus(components, 0, 0)
+        result.add_input_bus(components, bits, 1)
+
     return result
\ No newline at end of file
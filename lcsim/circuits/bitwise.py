@@ -22,10 +22,10 @@ def bitwise_and_circuit(bits):
     result = circuit.Circuit('bAND', 2*bits, bits)
     comps = [gates.ANDGate() for _ in xrange(0, bits)]
 
-    for i in xrange(0, bits):
-        result.add_input_component(comps[i], {i: 0})
-        result.add_input_component(comps[i], {i + bits: 1})
+    result.add_input_bus(comps, 0, 0)
+    result.add_input_bus(comps, bits, 1)
 
+    for i in xrange(0, bits):
         result.add_output_component(comps[i], i)
 
     return result
@@ -49,10 +49,10 @@ def bitwise_or_circuit(bits):
     result = circuit.Circuit('bOR', 2*bits, bits)
     comps = [gates.ORGate() for _ in xrange(0, bits)]
 
-    for i in xrange(0, bits):
-        result.add_input_component(comps[i], {i: 0})
-        result.add_input_component(comps[i], {i + bits: 1})
+    result.add_input_bus(comps, 0, 0)
+    result.add_input_bus(comps, bits, 1)
 
+    for i in xrange(0, bits):
         result.add_output_component(comps[i], i)
 
     return result
@@ -76,10 +76,10 @@ def bitwise_xor_circuit(bits):
     result = circuit.Circuit('bXOR', 2*bits, bits)
     comps = [gates.XORGate() for _ in xrange(0, bits)]
 
-    for i in xrange(0, bits):
-        result.add_input_component(comps[i], {i: 0})
-        result.add_input_component(comps[i], {i + bits: 1})
+    result.add_input_bus(comps, 0, 0)
+    result.add_input_bus(comps, bits, 1)
 
+    for i in xrange(0, bits):
         result.add_output_component(comps[i], i)
 
     return result
@@ -100,8 +100,46 @@ def bitwise_not_circuit(bits):
     result = circuit.Circuit('bNOT', bits, bits)
     comps = [gates.NOTGate() for _ in xrange(0, bits)]
 
+    result.add_input_bus(comps, 0, 0)
+
     for i in xrange(0, bits):
-        result.add_input_component(comps[i], {i: 0})
         result.add_output_component(comps[i], i)
 
     return result
+
+
+def bitwise_mux_circuit(bits):
+    """
+    Create a circuit that selects one of two equal-sized inputs with a
+    select bit. The input space is the select bit followed by the two
+    inputs stacked on top of each other, e.g. for a 2-bit circuit
+    S-A0-A1-B0-B1. The output is A if the select bit is 1, otherwise B.
+
+    Parameters:
+        bits:
+            The number of bits expected for each input argument. The size of
+            the input space of the circuit is 2*bits + 1 and the size of the
+            output space is bits.
+
+    Returns:
+        Bitwise multiplexer circuit for 2 inputs of the specified size.
+    """
+    result = circuit.Circuit('bMUX', 2*bits + 1, bits)
+    inv = gates.NOTGate()
+    result.add_input_component(inv, {0: 0})
+
+    for i in xrange(0, bits):
+        a = gates.ANDGate()
+        b = gates.ANDGate()
+        comp = gates.ORGate()
+
+        result.add_input_component(a, {0: 0})
+        result.add_input_component(a, {i + 1: 1})
+        b.add_input(inv, 0)
+        result.add_input_component(b, {i + bits + 1: 1})
+
+        comp.add_input(a, 0)
+        comp.add_input(b, 1)
+        result.add_output_component(comp, i)
+
+    return result
@@ -1,3 +1,8 @@
+from itertools import izip
+
+from lcsim.circuits import codegen, encoding, netlist, ports
+from lcsim.components import base, registers
+
 __author__ = 'Jacky'
 
 
@@ -50,6 +55,12 @@ class Circuit(object):
         # space.
         self._outputs = [None] * output_size
 
+        # Compiled netlist used to evaluate the circuit with bound inputs,
+        # created on demand by compile().
+        self._netlist = None
+        # Generated function for the compiled netlist, see jit().
+        self._function = None
+
     def add_input_component(self, component, mapping):
         """
         Set an input component for the circuit. Specify a mapping keyed by
@@ -84,6 +95,52 @@ class Circuit(object):
         for k, v in mapping.iteritems():
             self._inputs[k].append((component, v))
 
+        self._netlist = None
+
+    def add_input_bus(self, components, offset, index):
+        """
+        Map a range of the circuit input space to one input bit of each of
+        a list of components: input space offset + i is wired to input bit
+        'index' of components[i]. Equivalent to calling
+        add_input_component(components[i], {offset + i: index}) for every
+        component, but the range is validated once instead of per bit.
+
+        Parameters:
+            components:
+                List of components (inherit from ComponentBase).
+            offset:
+                First input space of the range.
+            index:
+                Input bit number of every component.
+
+        Raises:
+            ValueError if the range exceeds the input space of the circuit
+            or the input bit is out of range for any component.
+
+        Example usage:
+            >>> from lcsim.components import gates
+            >>> c = Circuit('bAND', 8, 4)
+            >>> comps = [gates.ANDGate() for _ in xrange(0, 4)]
+            >>> c.add_input_bus(comps, 0, 0)
+            >>> c.add_input_bus(comps, 4, 1)
+
+        :type components list[ComponentBase]
+        :type offset int
+        :type index int
+        """
+        if offset < 0 or offset + len(components) > len(self._inputs):
+            raise ValueError('Invalid input space range %d-%d.' %
+                             (offset, offset + len(components) - 1))
+
+        for component in components:
+            if index < 0 or index >= len(component._input_bits):
+                raise ValueError('Invalid component input index %d' % index)
+
+        for in_list, component in izip(self._inputs[offset:], components):
+            in_list.append((component, index))
+
+        self._netlist = None
+
     def add_output_component(self, component, output_index):
         """
         Set an output component for the circuit. Output bit index of the
@@ -110,8 +167,9 @@ class Circuit(object):
             raise ValueError('Circuit output space %d already taken.' % output_index)
 
         self._outputs[output_index] = component
+        self._netlist = None
 
-    def evaluate(self):
+    def evaluate(self, inputs=None, output_format=list):
         """
         Evaluate the result of the circuit. If any components in the circuit
         are not fully connected (i.e. have less input connections than
@@ -122,16 +180,49 @@ class Circuit(object):
 
         If all gates are fully connected, then the result of this method
         call will be that all the gates in the circuit are evaluated.
+        Evaluated gates are memoized until the next call to invalidate()
+        or until any component is rewired.
         Returns the evaluated output bits of all last-level gates in order
         as a list of ints.
 
+        If 'inputs' is given, it is bound to the input space of the circuit
+        for this call only: every gate input bit that is not connected to
+        another component reads its value from the corresponding input
+        space. The circuit is compiled on the first such call and the
+        netlist is reused afterwards, so the same circuit can be evaluated
+        for many inputs without rebuilding it. Gate states are not altered.
+        If gates are connected after the circuit has been compiled, call
+        compile() again to refresh the netlist.
+
+        Parameters:
+            inputs:
+                Optional value for the input space of the circuit. Can be a
+                list of bits, a non-negative integer or a byte string (see
+                encoding.to_bits).
+            output_format:
+                One of list (the default), int or bytes.
+
         Returns:
-            int list of evaluated output of circuit
+            Evaluated output of circuit, as a list of ints by default.
 
         Raises:
             InvalidCircuitException if there are any unspecified input or
             output spaces.
+
+        Example usage:
+            >>> from lcsim.circuits import adders
+            >>> a = adders.ripple_adder_no_carry(4)
+            >>> a.evaluate(0x35, int)
+            8
         """
+        if inputs is not None:
+            if self._netlist is None:
+                self.compile()
+
+            bits = encoding.to_bits(inputs, len(self._inputs))
+            return encoding.from_bits(self._netlist.evaluate(bits),
+                                      output_format)
+
         if None in self._inputs:
             raise InvalidCircuitException('Circuit inputs not fully '
                                           'specified')
@@ -144,8 +235,161 @@ class Circuit(object):
             gate.evaluate()
             result[i] = gate.output_bit
 
+        return encoding.from_bits(result, output_format)
+
+    def invalidate(self):
+        """
+        Mark the evaluated output bits of all gates stale in constant time,
+        so the next call to evaluate() recomputes every gate instead of
+        reusing memoized results, e.g. after the outputs of a gate were set
+        by hand. Since gates may be shared between circuits, this
+        invalidates the gates of every circuit, not only this one. See
+        ComponentBase.invalidate_all.
+        """
+        base.ComponentBase.invalidate_all()
+
+    def compile(self):
+        """
+        Compile the circuit into a flat, topologically sorted Netlist that
+        can be evaluated iteratively. Unlike evaluate(), evaluating the
+        compiled netlist does not recurse through the gates, so it works
+        for arbitrarily deep circuits without raising the recursion limit,
+        and does not alter the state of any gates.
+
+        The netlist is a snapshot of the circuit - if any gates are
+        connected or disconnected afterwards, compile the circuit again.
+        The most recently compiled netlist is kept and used by evaluate()
+        when inputs are given.
+
+        Returns:
+            The compiled Netlist.
+
+        Raises:
+            InvalidCircuitException if there are unspecified output spaces.
+            MissingInputException if any gate in the circuit is missing
+            an input that is not part of the circuit input space.
+
+        Example usage:
+            >>> from lcsim.circuits import adders, sources
+            >>> src = sources.digital_source_int_circuit(0x35, 8)
+            >>> a = adders.ripple_adder_no_carry(4)
+            >>> connect_circuits(src, a, {i: i for i in xrange(0, 8)})
+            >>> a.compile().evaluate()
+            [1, 0, 0, 0]
+        """
+        self._netlist = netlist.compile_circuit(self)
+        self._function = None
+        return self._netlist
+
+    def jit(self):
+        """
+        Returns a generated Python function that evaluates the circuit.
+        The function is straight-line code with one local variable per wire
+        and one bitwise expression per gate, generated from the compiled
+        netlist (see codegen.generate_source). It is cached on the circuit
+        together with the netlist, and regenerated whenever the circuit is
+        compiled again.
+
+        The function takes a list of ints for the input space of the
+        circuit and an optional lane mask, and returns a list of ints for
+        the output space. With the default mask of 1 every int is a single
+        bit; with a mask of (1 << width) - 1 every int carries 'width'
+        bit-sliced lanes.
+
+        Example usage:
+            >>> from lcsim.circuits import adders
+            >>> f = adders.ripple_adder_no_carry(4).jit()
+            >>> f([0, 0, 1, 1, 0, 1, 0, 1])
+            [1, 0, 0, 0]
+            >>> f([0b01, 0b00, 0b11, 0b11, 0b10, 0b01, 0b00, 0b11], 0b11)
+            [2, 2, 0, 0]
+        """
+        if self._netlist is None:
+            self.compile()
+
+        if self._function is None:
+            self._function = codegen.generate_function(self._netlist)
+
+        return self._function
+
+    def registers(self):
+        """
+        Returns all registers (D flip-flops) the outputs of the circuit
+        depend on, directly or through the inputs of other registers.
+
+        :rtype list[DFlipFlop]
+        """
+        result = []
+        visited = set()
+
+        roots = self._outputs
+        while roots:
+            found = [component for component in
+                     netlist.topological_order(roots)
+                     if isinstance(component, registers.DFlipFlop) and
+                     component not in visited]
+
+            visited.update(found)
+            result.extend(found)
+            roots = [register._input_bits[0] for register in found]
+
         return result
 
+    def clock(self, cycles=1):
+        """
+        Simulate clock cycles of a sequential circuit. On every cycle the
+        logic feeding the D inputs of all registers is evaluated from the
+        current register states, then all registers store their sampled
+        inputs at once. Afterwards evaluate() returns the outputs for the
+        new register states.
+
+        The logic between registers is evaluated iteratively in
+        topological order, so deep logic does not raise the recursion
+        limit.
+
+        Parameters:
+            cycles:
+                Number of clock cycles to simulate.
+
+        Raises:
+            MissingInputException if any register or gate feeding a
+            register is missing an input.
+
+        Example usage:
+            >>> from lcsim.sha1 import builder
+            >>> h = builder.sha1_sequential_circuit(message_circuit)
+            >>> h.clock(81)
+            >>> h.evaluate(output_format=int)
+
+        :type cycles int
+        """
+        regs = self.registers()
+        order = netlist.topological_order([register._input_bits[0]
+                                           for register in regs])
+
+        for _ in xrange(0, cycles):
+            base.ComponentBase.invalidate_all()
+
+            for component in order:
+                if component.output_bit is None:
+                    component.evaluate()
+
+            for register in regs:
+                register.sample()
+            for register in regs:
+                register.latch()
+
+        base.ComponentBase.invalidate_all()
+
+    def reset(self):
+        """
+        Restore the initial state of all registers of the circuit.
+        """
+        for register in self.registers():
+            register.reset()
+
+        base.ComponentBase.invalidate_all()
+
 
 def connect_circuits(out_circuit, in_circuit, mapping):
     """
@@ -191,24 +435,105 @@ def connect_circuits(out_circuit, in_circuit, mapping):
         for (com_in, j) in in_list:
             com_in.add_input(com_out, j)
 
+    in_circuit._netlist = None
+
 
-def stack_circuits(name, c1, c2):
+def connect_bus(out_circuit, in_circuit, in_offset=0, out_offset=0,
+                size=None, rotation=0):
     """
-    Stack two circuits together by merging them side-by-side. Conceptually
-    like putting two circuits together in parallel. Returns the resulting
+    Connect a contiguous range of output bits of one circuit to a contiguous
+    range of input bits of another, optionally rotated. Input bit
+    in_offset + i of in_circuit reads output bit
+    out_offset + (i + rotation) % size of out_circuit, so a positive
+    rotation is a left rotation of the bus.
+
+    This is the same as connect_circuits with the mapping
+    {out_offset + (i + rotation) % size: in_offset + i}, but the ranges are
+    validated once and no mapping is built, which makes it the cheaper way
+    to route whole words between circuits.
+
+    Parameters:
+        out_circuit:
+            Circuit (inherits from Circuit) to wire connections from.
+        in_circuit:
+            Circuit (inherits from Circuit) to wire connections to.
+        in_offset:
+            First input bit of in_circuit to connect.
+        out_offset:
+            First output bit of out_circuit to connect.
+        size:
+            Number of bits to connect. Defaults to the rest of the output
+            space of out_circuit from out_offset.
+        rotation:
+            Number of bits to rotate the bus to the left by.
+
+    Raises:
+        ValueError if either range is out of bounds or the output range is
+        incomplete.
+
+    Example usage:
+        >>> from lcsim.circuits import adders, sources
+        >>> a = adders.ripple_adder_no_carry(32)
+        >>> # a leftrotate 5 to the first operand, w[3] to the second
+        >>> connect_bus(x, a, 0, rotation=5)
+        >>> connect_bus(message, a, 32, 3 * 32, 32)
+
+    :type out_circuit Circuit
+    :type in_circuit Circuit
+    :type in_offset int
+    :type out_offset int
+    :type size int
+    :type rotation int
+    """
+    if size is None:
+        size = len(out_circuit._outputs) - out_offset
+
+    if size < 0 or out_offset < 0 or \
+            out_offset + size > len(out_circuit._outputs):
+        raise ValueError('Invalid output bit range %d-%d: not '
+                         'addressable.' % (out_offset, out_offset + size - 1))
+    if in_offset < 0 or in_offset + size > len(in_circuit._inputs):
+        raise ValueError('Invalid input bit range %d-%d: not '
+                         'addressable.' % (in_offset, in_offset + size - 1))
+    if size == 0:
+        return
+
+    outputs = out_circuit._outputs[out_offset:out_offset + size]
+    if None in outputs:
+        raise ValueError('Output circuit is incomplete.')
+
+    rotation %= size
+    if rotation:
+        outputs = outputs[rotation:] + outputs[:rotation]
+
+    for com_out, in_list in izip(outputs, in_circuit._inputs[in_offset:]):
+        for (com_in, j) in in_list:
+            com_in.add_input(com_out, j)
+
+    in_circuit._netlist = None
+
+
+def stack_circuits(name, *circuits):
+    """
+    Stack circuits together by merging them side-by-side. Conceptually
+    like putting the circuits together in parallel. Returns the resulting
     circuit.
 
+    The ports of the stacked circuits are shared through a view (see
+    lcsim.circuits.ports) instead of copied, and stacking a stacked circuit
+    does not nest views, so stacking n circuits takes O(n) time whether
+    they are stacked at once or one at a time.
+
     Parameters:
         name:
             The name to give to the resulting circuit. Can be any arbitrary
             string.
-        c1:
-            Top circuit to stack. The input and output bit positions of this
-            circuit will remain unchanged in the resulting stacked circuit.
-        c2:
-            Bottom circuit to stack. The input and output bit positions of
-            this circuit will be shifted by the input and output size of c1,
-            respectively.
+        circuits:
+            Circuits to stack, from top to bottom. The input and output bit
+            positions of the first circuit remain unchanged in the
+            resulting circuit, and those of every following circuit are
+            shifted by the total input and output size of the circuits
+            before it.
 
     Returns:
         The resulting stacked circuit as a single circuit object.
@@ -228,12 +553,9 @@ def stack_circuits(name, c1, c2):
         >>> c3.evaluate()
         [1, 0]
     """
-    new_inputs = c1._inputs + c2._inputs
-    new_outputs = c1._outputs + c2._outputs
-
-    result = Circuit(name, len(new_inputs), len(new_outputs))
-    result._inputs = new_inputs
-    result._outputs = new_outputs
+    result = Circuit(name, 0, 0)
+    result._inputs = ports.ConcatenatedPorts(c._inputs for c in circuits)
+    result._outputs = ports.ConcatenatedPorts(c._outputs for c in circuits)
 
     return result
 
@@ -0,0 +1,81 @@
+from lcsim.circuits import netlist
+
+__author__ = 'Jacky'
+
+_EXPRESSIONS = {
+    netlist.CONST0: '0',
+    netlist.CONST1: 'mask',
+    netlist.INPUT: 'inputs[%(a)d] & mask',
+    netlist.AND: 'w%(a)d & w%(b)d',
+    netlist.OR: 'w%(a)d | w%(b)d',
+    netlist.XOR: 'w%(a)d ^ w%(b)d',
+    netlist.NOT: 'w%(a)d ^ mask',
+    netlist.NAND: '(w%(a)d & w%(b)d) ^ mask',
+    netlist.NOR: '(w%(a)d | w%(b)d) ^ mask',
+    netlist.XNOR: 'w%(a)d ^ w%(b)d ^ mask',
+    netlist.BUF: 'w%(a)d',
+}
+
+
+def generate_source(compiled, name='evaluate'):
+    """
+    Generate the source code of a Python function that evaluates a compiled
+    netlist. Every wire becomes a local variable and every gate a single
+    bitwise expression, in topological order.
+
+    The generated function takes a list of ints for the input space and an
+    optional lane mask, and returns a list of ints for the output space.
+    With the default mask of 1 it evaluates one vector of bits; with a mask
+    of (1 << width) - 1 it evaluates 'width' bit-sliced lanes at once, like
+    Netlist.evaluate_lanes.
+
+    Parameters:
+        compiled:
+            The netlist to generate code for.
+        name:
+            Name of the generated function.
+
+    Returns:
+        The source code as a string.
+
+    Example usage:
+        >>> from lcsim.circuits import bitwise
+        >>> print generate_source(bitwise.bitwise_not_circuit(1).compile())
+        def evaluate(inputs, mask=1):
+            w0 = inputs[0] & mask
+            w1 = w0 ^ mask
+            return [w1]
+
+    :type compiled Netlist
+    :rtype str
+    """
+    lines = ['def %s(inputs, mask=1):' % name]
+
+    for i, op in enumerate(compiled.ops):
+        expression = _EXPRESSIONS[op] % {'a': compiled.in0[i],
+                                         'b': compiled.in1[i]}
+        lines.append('    w%d = %s' % (i, expression))
+
+    lines.append('    return [%s]' % ', '.join('w%d' % i
+                                               for i in compiled.outputs))
+
+    return '\n'.join(lines) + '\n'
+
+
+def generate_function(compiled):
+    """
+    Generate and compile a Python function that evaluates a compiled
+    netlist. See generate_source for the signature of the function.
+
+    Unlike Netlist.evaluate, the generated function does not check the
+    size of its input.
+
+    :type compiled Netlist
+    :rtype function
+    """
+    source = generate_source(compiled)
+    code = compile(source, '<lcsim netlist>', 'exec')
+
+    namespace = {}
+    exec code in namespace
+    return namespace['evaluate']
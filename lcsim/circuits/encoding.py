@@ -0,0 +1,99 @@
+__author__ = 'Jacky'
+
+
+def to_bits(value, size):
+    """
+    Convert a value to a list of 'size' bits, most significant bit first.
+    This is the same bit order digital_source_int_circuit uses for its
+    output space.
+
+    Parameters:
+        value:
+            A list or tuple of bits (ints 0 or 1), a non-negative integer,
+            or a byte string / bytearray of exactly size / 8 bytes.
+        size:
+            Number of bits to produce.
+
+    Returns:
+        List of ints (0 or 1) of length 'size'.
+
+    Raises:
+        ValueError if the value does not fit in 'size' bits or contains
+        values that are not bits.
+        TypeError if the value is of an unsupported type.
+
+    Example usage:
+        >>> to_bits(6, 4)
+        [0, 1, 1, 0]
+        >>> to_bits('\\x0f', 8)
+        [0, 0, 0, 0, 1, 1, 1, 1]
+    """
+    if isinstance(value, (list, tuple)):
+        if len(value) != size:
+            raise ValueError('Expected %d bits, got %d.' % (size, len(value)))
+        if any([x != 1 and x != 0 for x in value]):
+            raise ValueError('Bits can only be 0 or 1.')
+
+        return list(value)
+
+    if isinstance(value, (bytes, bytearray)):
+        if len(value) * 8 != size:
+            raise ValueError('Expected %d bits, got %d bytes.' %
+                             (size, len(value)))
+
+        return [(byte >> (7 - j)) & 1 for byte in bytearray(value)
+                for j in xrange(0, 8)]
+
+    if isinstance(value, (int, long)):
+        if value < 0:
+            raise ValueError('Input number must be unsigned.')
+        if value >> size:
+            raise ValueError('Input number is too large to be represented '
+                             'by %d bits.' % size)
+
+        return [int((value >> (size - 1 - j)) & 1) for j in xrange(0, size)]
+
+    raise TypeError('Cannot convert %s to bits.' % type(value).__name__)
+
+
+def from_bits(bits, output_format=list):
+    """
+    Convert a list of bits, most significant bit first, to the requested
+    format.
+
+    Parameters:
+        bits:
+            List of ints (0 or 1).
+        output_format:
+            One of list, int or bytes. Converting to bytes requires the
+            number of bits to be a multiple of 8.
+
+    Returns:
+        The bits as a list, a non-negative integer or a byte string.
+
+    Raises:
+        ValueError if the format is not supported or the bits cannot be
+        packed into whole bytes.
+
+    Example usage:
+        >>> from_bits([0, 1, 1, 0], int)
+        6
+    """
+    if output_format is list:
+        return bits
+
+    if output_format is int:
+        number = 0
+        for bit in bits:
+            number = (number << 1) | bit
+
+        return number
+
+    if output_format is bytes:
+        if len(bits) % 8:
+            raise ValueError('Cannot pack %d bits into bytes.' % len(bits))
+
+        return bytes(bytearray(from_bits(bits[i:i + 8], int)
+                               for i in xrange(0, len(bits), 8)))
+
+    raise ValueError('Unsupported output format %r.' % (output_format,))
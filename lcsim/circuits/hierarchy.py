@@ -0,0 +1,184 @@
+from lcsim.circuits import circuit as circuits, netlist
+from lcsim.components import cells, gates, sources
+
+__author__ = 'Jacky'
+
+
+class Cell(object):
+    """
+    A reusable circuit definition. The circuit is compiled once, and every
+    instance of the cell evaluates the same shared netlist instead of
+    owning its own gates, so a design built from many instances of the
+    same cell needs a fraction of the components of the flat design.
+
+    Instances are flattened into gates only on demand, see flatten().
+    Compiling a circuit that contains instances inlines them without
+    flattening, see netlist.compile_circuit.
+    """
+
+    def __init__(self, circuit, name=None):
+        """
+        Define a cell from a circuit. Every gate input of the circuit must
+        either be connected or mapped to the circuit input space, which
+        becomes the input space of every instance.
+
+        The circuit is only read while the cell is defined. Changing it
+        afterwards does not change the cell. Buffer gates carry no logic
+        and are left out of the definition, so circuits built from input
+        circuits like digital_input_circuit do not add buffers to every
+        instance.
+
+        Parameters:
+            circuit:
+                The circuit to define the cell from.
+            name:
+                Name of the cell, defaults to the name of the circuit.
+
+        Raises:
+            InvalidCircuitException if there are unspecified output spaces.
+            MissingInputException if any gate input is neither connected
+            nor part of the circuit input space.
+
+        :type circuit Circuit
+        :type name str
+        """
+        self.name = circuit.name if name is None else name
+        self.netlist = _remove_buffers(netlist.compile_circuit(circuit))
+
+    def instance(self):
+        """
+        Create a new instance of the cell. The result is a circuit with the
+        same input and output space as the circuit the cell was defined
+        from, and can be connected like any other circuit.
+
+        Example usage:
+            >>> from lcsim.circuits import adders, sources
+            >>> adder = Cell(adders.ripple_adder_no_carry(32))
+            >>> a = adder.instance()
+            >>> connect_circuits(sources.digital_source_int_circuit(x, 64), a,
+            ...                  {i: i for i in xrange(0, 64)})
+            >>> a.evaluate(output_format=int) == (x >> 32) + (x & 0xFFFFFFFF)
+            True
+
+        :rtype Circuit
+        """
+        instance = cells.CellInstance(self)
+        size = len(self.netlist.outputs)
+
+        result = circuits.Circuit(self.name, self.netlist.input_size, size)
+        for k in xrange(0, self.netlist.input_size):
+            result.add_input_component(instance, {k: k})
+        for i in xrange(0, size):
+            result.add_output_component(cells.CellOutput(instance, i), i)
+
+        return result
+
+
+def _remove_buffers(compiled):
+    """
+    Returns a copy of a netlist with every buffer replaced by a direct
+    connection to its input wire.
+    """
+    ops, in0, in1 = [], [], []
+    index = [0] * len(compiled.ops)
+
+    for i, op in enumerate(compiled.ops):
+        if op == netlist.BUF:
+            index[i] = index[compiled.in0[i]]
+            continue
+
+        a, b = compiled.in0[i], compiled.in1[i]
+        if op != netlist.INPUT:
+            a = index[a] if a >= 0 else -1
+            b = index[b] if b >= 0 else -1
+
+        index[i] = len(ops)
+        ops.append(op)
+        in0.append(a)
+        in1.append(b)
+
+    return netlist.Netlist(ops, in0, in1,
+                           [index[i] for i in compiled.outputs],
+                           compiled.input_size)
+
+
+def flatten(circuit):
+    """
+    Replace every cell instance in the transitive fan-in of the circuit
+    outputs by fresh gates in place. Output ports of the instances are
+    replaced by the gates computing them, and components connected to the
+    ports are rewired, even if they are not part of this circuit. Input
+    bits of instances that are mapped to the circuit input space are
+    replaced by buffer gates mapped to the same input spaces.
+
+    Use this before handing the circuit to code that walks individual gates,
+    e.g. lcsim.sha1.graph.to_graph.
+
+    Parameters:
+        circuit:
+            The circuit to flatten.
+
+    Returns:
+        Number of instances flattened.
+
+    :type circuit Circuit
+    :rtype int
+    """
+    instances = [component for component in
+                 netlist.topological_order(circuit._outputs)
+                 if isinstance(component, cells.CellInstance)]
+
+    for instance in instances:
+        _flatten_instance(circuit, instance)
+
+    circuit._netlist = None
+    return len(instances)
+
+
+def _flatten_instance(circuit, instance):
+    """
+    Replace a single cell instance of a circuit by gates.
+    """
+    cell = instance.cell.netlist
+
+    # (instance, input bit) -> buffer gate replacing it, for input bits
+    # mapped to the circuit input space
+    buffers = {}
+
+    wires = []
+    for i, op in enumerate(cell.ops):
+        if op == netlist.INPUT:
+            j = cell.in0[i]
+            component = instance._input_bits[j]
+            if component is None:
+                component = buffers.setdefault((instance, j), gates.BUFGate())
+        elif op == netlist.CONST0:
+            component = sources.DigitalZero()
+        elif op == netlist.CONST1:
+            component = sources.DigitalOne()
+        else:
+            component = netlist.gate_class(op)()
+            component.add_input(wires[cell.in0[i]], 0)
+            if cell.in1[i] >= 0:
+                component.add_input(wires[cell.in1[i]], 1)
+
+        wires.append(component)
+
+    for in_list in circuit._inputs:
+        in_list[:] = [(buffers[(component, j)], 0)
+                      if (component, j) in buffers else (component, j)
+                      for (component, j) in in_list]
+
+    for port in frozenset(instance.children):
+        if not isinstance(port, cells.CellOutput):
+            continue
+
+        gate = wires[cell.outputs[port.index]]
+        port.move_outputs(gate)
+        port.disconnect_inputs()
+
+        for i, component in enumerate(circuit._outputs):
+            if component is port:
+                circuit._outputs[i] = gate
+
+    instance.disconnect_inputs()
@@ -0,0 +1,543 @@
+from lcsim.components import base, cells, gates, registers, sources
+
+__author__ = 'Jacky'
+
+# Gate type codes used in compiled netlists.
+CONST0 = 0
+CONST1 = 1
+INPUT = 2
+AND = 3
+OR = 4
+XOR = 5
+NOT = 6
+NAND = 7
+NOR = 8
+XNOR = 9
+BUF = 10
+
+_CODES = {
+    gates.ANDGate: AND,
+    gates.ORGate: OR,
+    gates.XORGate: XOR,
+    gates.NOTGate: NOT,
+    gates.NANDGate: NAND,
+    gates.NORGate: NOR,
+    gates.XNORGate: XNOR,
+    gates.BUFGate: BUF,
+}
+
+# Gate type code -> basic gate class
+_CLASSES = dict((code, cls) for cls, code in _CODES.iteritems())
+
+
+def class_code(cls):
+    """
+    Returns the netlist gate type code of a component class, or None if it
+    is not a basic gate. Subclasses of the basic gates have the code of the
+    gate they extend.
+
+    :type cls type
+    :rtype int
+    """
+    for base_cls in cls.__mro__:
+        if base_cls in _CODES:
+            return _CODES[base_cls]
+
+    return None
+
+
+def gate_class(code):
+    """
+    Returns the basic gate class of a netlist gate type code.
+
+    Raises:
+        ValueError if the code is not the code of a basic gate, e.g. a
+        constant or an input.
+
+    :type code int
+    :rtype type
+    """
+    if code not in _CLASSES:
+        raise ValueError('No gate class for gate type code %d.' % code)
+
+    return _CLASSES[code]
+
+
+def gate_code(component):
+    """
+    Returns the netlist gate type code for a component. Subclasses of the
+    basic gates compile to the code of the gate they extend, and components
+    with no input bits (digital sources) compile to a constant. The state
+    of the component is not altered.
+
+    Raises:
+        ValueError if the component cannot be represented in a netlist.
+
+    :type component ComponentBase
+    :rtype int
+    """
+    code = class_code(type(component))
+    if code is not None:
+        return code
+
+    if len(component._input_bits) == 0:
+        return CONST1 if _constant_value(component) else CONST0
+
+    raise ValueError('Cannot compile component of type %s.' %
+                     type(component).__name__)
+
+
+def _constant_value(component):
+    """
+    Returns the output bit of a component without inputs. Digital sources
+    report their value directly. Other components are evaluated, and their
+    previous output bit is put back afterwards.
+    """
+    if isinstance(component, sources.DigitalSourceBase):
+        return component.value
+
+    saved = component._output_bit, component._epoch
+    try:
+        component.evaluate()
+        return component._output_bit
+    finally:
+        component._output_bit, component._epoch = saved
+
+
+def topological_order(roots):
+    """
+    Returns all components in the transitive fan-in of the given components
+    in topological order (every component comes after all of its inputs).
+    The walk is iterative, so arbitrarily deep circuits can be sorted
+    without raising the recursion limit.
+
+    Unconnected input bits are skipped. Registers (D flip-flops) are
+    included, but the walk does not continue through their inputs, so
+    feedback loops through registers are cut.
+
+    Parameters:
+        roots:
+            Iterable of components to start the walk from.
+
+    Returns:
+        List of components in topological order.
+
+    :type roots list[ComponentBase]
+    :rtype list[ComponentBase]
+    """
+    order = []
+    visited = set()
+
+    for root in roots:
+        if root is None or root in visited:
+            continue
+
+        visited.add(root)
+        stack = [(root, _fan_in(root))]
+        while stack:
+            component, it = stack[-1]
+            for parent in it:
+                if parent is not None and parent not in visited:
+                    visited.add(parent)
+                    stack.append((parent, _fan_in(parent)))
+                    break
+            else:
+                stack.pop()
+                order.append(component)
+
+    return order
+
+
+def _fan_in(component):
+    """
+    Returns an iterator over the components topological_order walks into
+    from a component.
+    """
+    if isinstance(component, registers.DFlipFlop):
+        return iter(())
+
+    return iter(component._input_bits)
+
+
+class Netlist(object):
+    """
+    A flat, integer-indexed representation of a circuit. Every wire in the
+    netlist is driven by exactly one gate, and wires are numbered in
+    topological order so the whole circuit can be evaluated in a single
+    forward pass.
+
+    For wire i, ops[i] is the gate type code, and in0[i]/in1[i] are the
+    indices of the wires connected to its input bits (-1 if unused). Input
+    wires store the circuit input space they read from in in0.
+    """
+
+    def __init__(self, ops, in0, in1, outputs, input_size, components=None):
+        """
+        Initialize a netlist from its arrays. Netlists are usually created
+        by compile_circuit() or Circuit.compile() rather than directly.
+
+        Parameters:
+            ops:
+                List of gate type codes, one for each wire.
+            in0:
+                List of first input wire indices, one for each wire.
+            in1:
+                List of second input wire indices, one for each wire.
+            outputs:
+                List of wire indices for each output space of the circuit.
+            input_size:
+                Number of bits in the input space of the circuit.
+            components:
+                Optional list mapping each wire to the component it was
+                compiled from, or None for input wires and wires inlined
+                from cell instances.
+        """
+        self.ops = ops
+        self.in0 = in0
+        self.in1 = in1
+        self.outputs = outputs
+        self.input_size = input_size
+        self.components = components
+
+    def __len__(self):
+        return len(self.ops)
+
+    def evaluate(self, inputs=None):
+        """
+        Evaluate the netlist and return the output bits in order as a list
+        of ints.
+
+        Parameters:
+            inputs:
+                List of bits for the input space of the circuit. Only
+                needed if any gates read from the input space.
+
+        Raises:
+            ValueError if the netlist reads from its input space and the
+            wrong number of input bits is given.
+
+        :type inputs list[int]
+        :rtype list[int]
+        """
+        return self.evaluate_lanes(inputs, 1)
+
+    def evaluate_lanes(self, lanes, width):
+        """
+        Bit-sliced evaluation of the netlist. Each wire carries an integer
+        of 'width' bits where bit k is the value of the wire for input
+        vector k, so a single pass over the gates evaluates 'width' input
+        vectors at once.
+
+        Parameters:
+            lanes:
+                List of ints, one for each bit of the input space of the
+                circuit. Only needed if any gates read from the input space.
+            width:
+                Number of input vectors (lanes) packed into each int.
+
+        Returns:
+            List of ints, one for each output space of the circuit, packed
+            the same way as the input lanes.
+
+        Raises:
+            ValueError if the netlist reads from its input space and the
+            wrong number of input lanes is given.
+
+        :type lanes list[int]
+        :type width int
+        :rtype list[int]
+        """
+        ops, in0, in1 = self.ops, self.in0, self.in1
+        mask = (1 << width) - 1
+
+        if lanes is None:
+            if INPUT in ops:
+                raise ValueError('Netlist requires %d input bits.' %
+                                 self.input_size)
+        elif len(lanes) != self.input_size:
+            raise ValueError('Netlist requires %d input bits, got %d.' %
+                             (self.input_size, len(lanes)))
+
+        values = [0] * len(ops)
+        for i in xrange(0, len(ops)):
+            op = ops[i]
+            if op == AND:
+                values[i] = values[in0[i]] & values[in1[i]]
+            elif op == XOR:
+                values[i] = values[in0[i]] ^ values[in1[i]]
+            elif op == OR:
+                values[i] = values[in0[i]] | values[in1[i]]
+            elif op == NOT:
+                values[i] = values[in0[i]] ^ mask
+            elif op == CONST0:
+                values[i] = 0
+            elif op == CONST1:
+                values[i] = mask
+            elif op == INPUT:
+                values[i] = lanes[in0[i]] & mask
+            elif op == NAND:
+                values[i] = (values[in0[i]] & values[in1[i]]) ^ mask
+            elif op == NOR:
+                values[i] = (values[in0[i]] | values[in1[i]]) ^ mask
+            elif op == XNOR:
+                values[i] = values[in0[i]] ^ values[in1[i]] ^ mask
+            elif op == BUF:
+                values[i] = values[in0[i]]
+
+        return [values[i] for i in self.outputs]
+
+    def evaluate_batch(self, vectors):
+        """
+        Evaluate the netlist for many input vectors in one bit-sliced pass.
+
+        Parameters:
+            vectors:
+                List of input vectors, each a list of bits for the input
+                space of the circuit.
+
+        Returns:
+            List of output vectors in the same order, each a list of bits.
+
+        Example usage:
+            >>> from lcsim.circuits import adders
+            >>> n = adders.ripple_adder_no_carry(2).compile()
+            >>> n.evaluate_batch([[0, 1, 0, 1], [1, 1, 0, 1]])
+            [[1, 0], [0, 0]]
+        """
+        if not vectors:
+            return []
+
+        lanes = pack_lanes(vectors, self.input_size)
+        return unpack_lanes(self.evaluate_lanes(lanes, len(vectors)),
+                            len(vectors))
+
+
+def pack_lanes(vectors, size):
+    """
+    Transpose a list of bit vectors into bit-sliced lanes: bit k of lane j
+    is bit j of vector k.
+
+    Parameters:
+        vectors:
+            List of bit vectors, each of length 'size'.
+        size:
+            Number of bits in each vector.
+
+    Returns:
+        List of 'size' ints.
+
+    Raises:
+        ValueError if any vector is not of length 'size'.
+
+    :type vectors list[list[int]]
+    :type size int
+    :rtype list[int]
+    """
+    lanes = [0] * size
+    for k, vector in enumerate(vectors):
+        if len(vector) != size:
+            raise ValueError('Input vector %d has %d bits, expected %d.' %
+                             (k, len(vector), size))
+
+        for j, bit in enumerate(vector):
+            if bit:
+                lanes[j] |= 1 << k
+
+    return lanes
+
+
+def unpack_lanes(lanes, count):
+    """
+    Inverse of pack_lanes: transpose bit-sliced lanes back into a list of
+    'count' bit vectors.
+
+    :type lanes list[int]
+    :type count int
+    :rtype list[list[int]]
+    """
+    return [[(lane >> k) & 1 for lane in lanes] for k in xrange(0, count)]
+
+
+def compile_circuit(circuit):
+    """
+    Compile a circuit into a Netlist. Only gates in the transitive fan-in of
+    the circuit outputs are included.
+
+    Input bits of gates that are not connected to another component but are
+    mapped to the circuit input space become input wires of the netlist.
+
+    Cell instances (see lcsim.circuits.hierarchy) are inlined: the wires of
+    the compiled cell are copied into the netlist once per instance, and
+    every output port of an instance becomes a buffer reading the
+    corresponding wire.
+
+    Parameters:
+        circuit:
+            The circuit to compile.
+
+    Returns:
+        The compiled Netlist.
+
+    Raises:
+        InvalidCircuitException (from lcsim.circuits.circuit) if there are
+        unspecified output spaces.
+        MissingInputException if a gate input bit is neither connected nor
+        part of the circuit input space.
+
+    :type circuit Circuit
+    :rtype Netlist
+    """
+    from lcsim.circuits.circuit import InvalidCircuitException
+
+    if None in circuit._outputs:
+        raise InvalidCircuitException('Circuit outputs not fully specified')
+
+    # (component, input bit) -> circuit input space
+    spaces = {}
+    for k, in_list in enumerate(circuit._inputs):
+        for (component, j) in in_list:
+            spaces[(component, j)] = k
+
+    order = topological_order(circuit._outputs)
+
+    ops = []
+    in0 = []
+    in1 = []
+    components = []
+    index = {}
+    input_wires = {}
+
+    def wire(component, j):
+        parent = component._input_bits[j]
+        if parent is not None:
+            return index[parent]
+
+        k = spaces.get((component, j))
+        if k is None:
+            raise base.MissingInputException(
+                '%s gate requires %d input bits. Bit %d is missing.' % (
+                    component.name, len(component._input_bits), j))
+
+        if k not in input_wires:
+            input_wires[k] = len(ops)
+            ops.append(INPUT)
+            in0.append(k)
+            in1.append(-1)
+            components.append(None)
+
+        return input_wires[k]
+
+    # Cell instance -> wire indices of the output space of its cell
+    instances = {}
+
+    for component in order:
+        if isinstance(component, cells.CellInstance):
+            pins = [wire(component, j)
+                    for j in xrange(0, len(component._input_bits))]
+            instances[component] = _inline(component.cell.netlist, pins,
+                                           ops, in0, in1, components)
+            continue
+
+        if isinstance(component, cells.CellOutput):
+            if component._input_bits[0] is None:
+                raise base.MissingInputException(
+                    'Cell output port is not connected to an instance.')
+
+            code = BUF
+            a = instances[component._input_bits[0]][component.index]
+            b = -1
+        else:
+            code = gate_code(component)
+            a = wire(component, 0) if len(component._input_bits) > 0 else -1
+            b = wire(component, 1) if len(component._input_bits) > 1 else -1
+
+        index[component] = len(ops)
+        ops.append(code)
+        in0.append(a)
+        in1.append(b)
+        components.append(component)
+
+    outputs = [index[component] for component in circuit._outputs]
+
+    return Netlist(ops, in0, in1, outputs, len(circuit._inputs), components)
+
+
+def _inline(cell, pins, ops, in0, in1, components):
+    """
+    Append the wires of a compiled cell to netlist arrays. Input wires of
+    the cell are replaced by the given wires connected to the input bits of
+    the instance. Returns the wire indices of the output space of the cell.
+    """
+    local = [0] * len(cell.ops)
+
+    for i, op in enumerate(cell.ops):
+        if op == INPUT:
+            local[i] = pins[cell.in0[i]]
+            continue
+
+        local[i] = len(ops)
+        ops.append(op)
+        in0.append(local[cell.in0[i]] if cell.in0[i] >= 0 else -1)
+        in1.append(local[cell.in1[i]] if cell.in1[i] >= 0 else -1)
+        components.append(None)
+
+    return [local[i] for i in cell.outputs]
+
+
+def decompile(compiled, name='netlist'):
+    """
+    Build a circuit of basic gates and digital sources from a netlist, the
+    inverse of compile_circuit. Gate input bits that read an input wire of
+    the netlist are mapped to the corresponding input space of the circuit.
+    Output spaces that read an input wire directly get a buffer gate.
+
+    Parameters:
+        compiled:
+            The netlist to build the circuit from.
+        name:
+            Name of the resulting circuit.
+
+    Returns:
+        The resulting circuit.
+
+    :type compiled Netlist
+    :type name str
+    :rtype Circuit
+    """
+    from lcsim.circuits.circuit import Circuit
+
+    ops, in0, in1 = compiled.ops, compiled.in0, compiled.in1
+    result = Circuit(name, compiled.input_size, len(compiled.outputs))
+
+    components = [None] * len(ops)
+    for i in xrange(0, len(ops)):
+        op = ops[i]
+        if op == INPUT:
+            continue
+
+        if op == CONST0:
+            component = sources.DigitalZero()
+        elif op == CONST1:
+            component = sources.DigitalOne()
+        else:
+            component = gate_class(op)()
+            for j, wire in enumerate((in0[i], in1[i])):
+                if wire < 0:
+                    continue
+
+                if ops[wire] == INPUT:
+                    result.add_input_component(component, {in0[wire]: j})
+                else:
+                    component.add_input(components[wire], j)
+
+        components[i] = component
+
+    for k, wire in enumerate(compiled.outputs):
+        component = components[wire]
+        if component is None:
+            component = gates.BUFGate()
+            result.add_input_component(component, {in0[wire]: 0})
+
+        result.add_output_component(component, k)
+
+    return result
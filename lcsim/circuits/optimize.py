@@ -0,0 +1,359 @@
+from lcsim.circuits import circuit as circuits, netlist
+from lcsim.components import sources
+
+__author__ = 'Jacky'
+
+
+def fold_constants(circuit):
+    """
+    Propagate constant values from digital sources through the gates of a
+    circuit in place. Gates whose output is fixed are replaced by a digital
+    source with that value, and gates that pass one input through unchanged
+    (e.g. XOR with 0, AND with 1, OR with 0, XNOR with 1, buffers) are
+    collapsed into a wire from that input.
+
+    Only gates in the transitive fan-in of the circuit outputs are folded.
+    Components connected to the outputs of folded gates are rewired, even
+    if they are not part of this circuit, so every circuit sharing these
+    gates still evaluates to the same result. Output spaces of other
+    circuits that refer to folded gates directly are not updated.
+
+    Parameters:
+        circuit:
+            The circuit to optimize.
+
+    Returns:
+        Dictionary of statistics: 'before' and 'after' are the number of
+        components in the fan-in of the circuit outputs before and after
+        folding, and 'removed' is the difference.
+
+    Example usage:
+        >>> from lcsim.circuits import adders, circuit, sources
+        >>> src = sources.digital_source_int_circuit(0x35, 8)
+        >>> a = adders.ripple_adder_no_carry(4)
+        >>> connect_circuits(src, a, {i: i for i in xrange(0, 8)})
+        >>> fold_constants(a)['after']
+        2
+        >>> a.evaluate()
+        [1, 0, 0, 0]
+
+    :type circuit Circuit
+    :rtype dict
+    """
+    order = netlist.topological_order(circuit._outputs)
+    before = len(order)
+
+    # Component -> constant output value, for every folded component
+    constants = {}
+    # Constant value -> digital source used to replace folded gates
+    replacements = {}
+
+    for component in order:
+        try:
+            code = netlist.gate_code(component)
+        except ValueError:
+            continue
+
+        # Digital sources and other components without inputs
+        if code == netlist.CONST0 or code == netlist.CONST1:
+            value = 1 if code == netlist.CONST1 else 0
+            constants[component] = value
+            replacements.setdefault(value, component)
+            continue
+
+        inputs = component._input_bits
+        values = [constants.get(gate) for gate in inputs]
+        result, wire = _fold(code, values)
+
+        if result is not None:
+            if result not in replacements:
+                replacements[result] = (sources.DigitalOne() if result
+                                        else sources.DigitalZero())
+                constants[replacements[result]] = result
+
+            _replace(circuit, component, replacements[result])
+        elif wire is not None and inputs[wire] is not None:
+            _replace(circuit, component, inputs[wire])
+
+    after = len(netlist.topological_order(circuit._outputs))
+    return {'before': before, 'after': after, 'removed': before - after}
+
+
+def prune(circuit, outputs=None):
+    """
+    Returns a new circuit that only contains the gates in the transitive
+    fan-in of the selected output spaces of a circuit. The gates are
+    copied, so the original circuit is left untouched and gates of the
+    pruned circuit have no connections to logic outside of it.
+
+    The pruned circuit has the same input space as the original, but only
+    gates that are part of the pruned circuit remain mapped to it.
+
+    Parameters:
+        circuit:
+            The circuit to prune.
+        outputs:
+            Optional list of output space indices of the circuit to keep,
+            in the order they should appear in the pruned circuit. Keeps
+            all output spaces by default.
+
+    Returns:
+        (pruned, stats):
+            The pruned circuit and a dictionary of statistics: 'before'
+            and 'after' are the number of components in the fan-in of all
+            outputs of the original circuit and of the pruned circuit,
+            'removed' is the difference and 'outputs' is the number of
+            output spaces kept.
+
+    Raises:
+        ValueError if any output index is out of range.
+        InvalidCircuitException if any selected output space is empty.
+
+    Example usage:
+        >>> from lcsim.sha1 import builder
+        >>> c = builder.sha1_circuit()
+        >>> h0, stats = prune(c, range(0, 32))
+        >>> h0.evaluate(message, int) == c.evaluate(message, int) >> 128
+        True
+
+    :type circuit Circuit
+    :type outputs list[int]
+    :rtype (Circuit, dict)
+    """
+    if outputs is None:
+        outputs = range(0, len(circuit._outputs))
+
+    for i in outputs:
+        if i < 0 or i >= len(circuit._outputs):
+            raise ValueError('Output index out of bounds: %d' % i)
+
+    roots = [circuit._outputs[i] for i in outputs]
+    if None in roots:
+        raise circuits.InvalidCircuitException('Circuit outputs not fully '
+                                               'specified')
+
+    before = len(netlist.topological_order(circuit._outputs))
+    order = netlist.topological_order(roots)
+
+    copies = {}
+    for component in order:
+        result = component.copy()
+        for j, gate in enumerate(component._input_bits):
+            if gate is not None:
+                result.add_input(copies[gate], j)
+
+        copies[component] = result
+
+    pruned = circuits.Circuit(circuit.name, len(circuit._inputs), len(roots))
+    for k, in_list in enumerate(circuit._inputs):
+        pruned._inputs[k] = [(copies[component], j)
+                             for (component, j) in in_list
+                             if component in copies]
+
+    for i, component in enumerate(roots):
+        pruned._outputs[i] = copies[component]
+
+    return pruned, {'before': before, 'after': len(order),
+                    'removed': before - len(order), 'outputs': len(roots)}
+
+
+class StructuralHashTable(object):
+    """
+    Hash-consing table for gates. Gates are keyed by their type and the
+    identities of the components connected to their input bits (sorted,
+    since all basic two-input gates are commutative), and digital sources
+    by their value. Adding a gate that is structurally identical to a gate
+    already in the table returns the existing gate, so equivalent logic is
+    only built once.
+
+    Gates with unconnected input bits and components that cannot be
+    compiled to a netlist are never shared.
+    """
+
+    def __init__(self):
+        self._table = {}
+
+    def __len__(self):
+        return len(self._table)
+
+    def add(self, component):
+        """
+        Add a component to the table. Returns the equivalent component
+        already in the table if there is one, otherwise the component
+        itself.
+
+        :type component ComponentBase
+        :rtype ComponentBase
+        """
+        key = _structure_key(component)
+        if key is None:
+            return component
+
+        return self._table.setdefault(key, component)
+
+    def gate(self, cls, *inputs):
+        """
+        Returns a gate of the given class connected to the given input
+        components, reusing an equivalent gate from the table if there is
+        one instead of creating a new one.
+
+        Example usage:
+            >>> from lcsim.components import gates, sources
+            >>> table = StructuralHashTable()
+            >>> a, b = sources.DigitalOne(), sources.DigitalZero()
+            >>> table.gate(gates.ANDGate, a, b) is table.gate(gates.ANDGate, b, a)
+            True
+
+        Raises:
+            ValueError if the class is not a basic gate.
+
+        :type cls type
+        :rtype ComponentBase
+        """
+        code = netlist.class_code(cls)
+        if code is None:
+            raise ValueError('Cannot hash gates of type %s.' % cls.__name__)
+
+        key = (code, tuple(sorted(id(component) for component in inputs)))
+        if key in self._table:
+            return self._table[key]
+
+        gate = cls()
+        for j, component in enumerate(inputs):
+            gate.add_input(component, j)
+
+        self._table[key] = gate
+        return gate
+
+
+def _structure_key(component):
+    """
+    Returns the structural hash key of a component, or None if it cannot
+    be shared.
+    """
+    if isinstance(component, sources.DigitalSourceBase):
+        component.evaluate()
+        return netlist.CONST1 if component.output_bit else netlist.CONST0,
+
+    if None in component._input_bits:
+        return None
+
+    try:
+        code = netlist.gate_code(component)
+    except ValueError:
+        return None
+
+    return code, tuple(sorted(id(gate) for gate in component._input_bits))
+
+
+def hash_structure(circuit):
+    """
+    Deduplicate structurally identical gates of a circuit in place using a
+    StructuralHashTable. Gates are visited in topological order, so once
+    two gates are merged, gates that were only different because they read
+    from those two gates are merged as well.
+
+    As with fold_constants, components connected to the outputs of merged
+    gates are rewired even if they are not part of this circuit.
+
+    Parameters:
+        circuit:
+            The circuit to optimize.
+
+    Returns:
+        Dictionary of statistics: 'before' and 'after' are the number of
+        components in the fan-in of the circuit outputs before and after
+        hashing, and 'removed' is the difference.
+
+    :type circuit Circuit
+    :rtype dict
+    """
+    order = netlist.topological_order(circuit._outputs)
+    before = len(order)
+
+    table = StructuralHashTable()
+    for component in order:
+        existing = table.add(component)
+        if existing is not component:
+            _replace(circuit, component, existing)
+
+    after = len(netlist.topological_order(circuit._outputs))
+    return {'before': before, 'after': after, 'removed': before - after}
+
+
+def _fold(code, values):
+    """
+    Fold a single gate given the constant values of its inputs (None where
+    unknown). Returns a tuple (result, wire): result is the fixed output of
+    the gate if there is one, otherwise wire is the index of the input the
+    gate passes through unchanged, if any.
+    """
+    if code == netlist.BUF:
+        return values[0], 0
+    if code == netlist.NOT:
+        return (None if values[0] is None else values[0] ^ 1), None
+
+    if code in _DOMINANT:
+        value, result = _DOMINANT[code]
+        if value in values:
+            return result, None
+
+    a, b = values
+    if a is not None and b is not None:
+        return _FUNCTIONS[code](a, b), None
+
+    identity = _IDENTITY.get(code)
+    if identity is not None:
+        if a == identity:
+            return None, 1
+        if b == identity:
+            return None, 0
+
+    return None, None
+
+
+# Gate code -> (input value, output value) where a single input with that
+# value fixes the output of the gate.
+_DOMINANT = {
+    netlist.AND: (0, 0),
+    netlist.OR: (1, 1),
+    netlist.NAND: (0, 1),
+    netlist.NOR: (1, 0),
+}
+
+# Gate code -> input value for which the gate passes its other input through
+_IDENTITY = {
+    netlist.AND: 1,
+    netlist.OR: 0,
+    netlist.XOR: 0,
+    netlist.XNOR: 1,
+}
+
+_FUNCTIONS = {
+    netlist.AND: lambda a, b: a & b,
+    netlist.OR: lambda a, b: a | b,
+    netlist.XOR: lambda a, b: a ^ b,
+    netlist.NAND: lambda a, b: (a & b) ^ 1,
+    netlist.NOR: lambda a, b: (a | b) ^ 1,
+    netlist.XNOR: lambda a, b: a ^ b ^ 1,
+}
+
+
+def _replace(circuit, old, new):
+    """
+    Replace a component of a circuit by another one, moving all of its
+    output connections and circuit output spaces to the new component and
+    dropping it from the circuit input space.
+    """
+    old.move_outputs(new)
+    old.disconnect_inputs()
+
+    for i, component in enumerate(circuit._outputs):
+        if component is old:
+            circuit._outputs[i] = new
+
+    for in_list in circuit._inputs:
+        in_list[:] = [(component, j) for (component, j) in in_list
+                      if component is not old]
+
+    circuit._netlist = None
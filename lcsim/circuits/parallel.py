@@ -0,0 +1,124 @@
+import multiprocessing
+from multiprocessing import sharedctypes
+
+from lcsim.circuits import encoding, netlist
+
+__author__ = 'Jacky'
+
+# Netlist of the current worker process, set up by _initialize_worker.
+_worker_netlist = None
+
+
+class BatchEvaluator(object):
+    """
+    Evaluates a circuit for large batches of input vectors on a pool of
+    worker processes.
+
+    The circuit is compiled once and the flat netlist arrays are placed in
+    shared memory that the workers inherit when they start, so the gate
+    objects are never pickled. Batches are split into chunks, and every
+    worker evaluates its chunks with bit-sliced lanes.
+    """
+
+    def __init__(self, circuit, processes=None, chunk_size=256):
+        """
+        Compile a circuit and start the worker pool.
+
+        Parameters:
+            circuit:
+                The circuit to evaluate.
+            processes:
+                Number of worker processes, defaults to the number of CPUs.
+            chunk_size:
+                Number of input vectors sent to a worker at a time, which is
+                also the lane width the workers evaluate with.
+
+        :type circuit Circuit
+        :type processes int
+        :type chunk_size int
+        """
+        compiled = circuit.compile()
+
+        self.input_size = compiled.input_size
+        self.chunk_size = chunk_size
+
+        shared = (sharedctypes.RawArray('b', compiled.ops),
+                  sharedctypes.RawArray('i', compiled.in0),
+                  sharedctypes.RawArray('i', compiled.in1),
+                  sharedctypes.RawArray('i', compiled.outputs),
+                  compiled.input_size)
+
+        self._pool = multiprocessing.Pool(processes, _initialize_worker, shared)
+
+    def evaluate(self, vectors, output_format=list):
+        """
+        Evaluate the circuit for every input vector.
+
+        Parameters:
+            vectors:
+                List of values for the input space of the circuit, each a
+                list of bits, a non-negative integer or a byte string (see
+                encoding.to_bits).
+            output_format:
+                One of list (the default), int or bytes.
+
+        Returns:
+            List of outputs in the same order as the input vectors.
+        """
+        chunks = [(vectors[i:i + self.chunk_size], output_format)
+                  for i in xrange(0, len(vectors), self.chunk_size)]
+
+        result = []
+        for outputs in self._pool.map(_evaluate_chunk, chunks):
+            result.extend(outputs)
+
+        return result
+
+    def close(self):
+        """
+        Stop the worker pool.
+        """
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def evaluate_batch(circuit, vectors, processes=None, output_format=list):
+    """
+    Evaluate a circuit for every input vector in a batch on a pool of
+    worker processes. See BatchEvaluator.
+
+    Example usage:
+        >>> from lcsim.sha1 import builder
+        >>> c = builder.sha1_circuit()
+        >>> hashes = evaluate_batch(c, messages, output_format=int)
+    """
+    with BatchEvaluator(circuit, processes) as evaluator:
+        return evaluator.evaluate(vectors, output_format)
+
+
+def _initialize_worker(ops, in0, in1, outputs, input_size):
+    """
+    Set up the netlist of a worker process from the shared arrays. The
+    arrays are copied into lists once, since indexing lists is faster.
+    """
+    global _worker_netlist
+    _worker_netlist = netlist.Netlist(ops[:], in0[:], in1[:], outputs[:],
+                                      input_size)
+
+
+def _evaluate_chunk(args):
+    """
+    Evaluate a chunk of input vectors in a worker process.
+    """
+    vectors, output_format = args
+    size = _worker_netlist.input_size
+
+    bits = [encoding.to_bits(vector, size) for vector in vectors]
+    return [encoding.from_bits(outputs, output_format)
+            for outputs in _worker_netlist.evaluate_batch(bits)]
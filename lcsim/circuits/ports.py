@@ -0,0 +1,201 @@
+import abc
+import bisect
+import collections
+from itertools import chain, islice
+
+__author__ = 'Jacky'
+
+
+class PortView(collections.Sequence):
+    """
+    Base class for views over the input or output ports of other
+    circuits (the _inputs and _outputs lists). A view behaves like the list
+    it stands for, but shares the ports of the underlying sequences instead
+    of copying them, so rotating or stacking circuits takes time and memory
+    independent of their size.
+
+    Views are copy-on-write: the first assignment to an element copies the
+    ports into a private list, and from then on the view no longer follows
+    the underlying sequences. Until then, a view reflects changes made to
+    them in place.
+    """
+
+    __slots__ = ('_ports',)
+
+    # Mutable like lists, so not hashable
+    __hash__ = None
+
+    def __init__(self):
+        # Private copy of the ports once the view has been written to
+        self._ports = None
+
+    def __len__(self):
+        if self._ports is not None:
+            return len(self._ports)
+
+        return self._size()
+
+    def __getitem__(self, index):
+        if self._ports is not None:
+            return self._ports[index]
+
+        if isinstance(index, slice):
+            return [self._get(i) for i in xrange(*index.indices(len(self)))]
+
+        size = len(self)
+        if index < 0:
+            index += size
+        if index < 0 or index >= size:
+            raise IndexError('Port index out of range: %d' % index)
+
+        return self._get(index)
+
+    def __setitem__(self, index, value):
+        self.materialize()[index] = value
+
+    def __iter__(self):
+        if self._ports is not None:
+            return iter(self._ports)
+
+        return self._iter()
+
+    def __eq__(self, other):
+        if not isinstance(other, (list, tuple, PortView)):
+            return NotImplemented
+
+        return list(self) == list(other)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def __repr__(self):
+        return '%s(%r)' % (type(self).__name__, list(self))
+
+    def materialize(self):
+        """
+        Returns the private list of ports of the view, copying the ports of
+        the underlying sequences on the first call.
+
+        :rtype list
+        """
+        if self._ports is None:
+            self._ports = list(self._iter())
+
+        return self._ports
+
+    @abc.abstractmethod
+    def _size(self):
+        """
+        Returns the number of ports of the underlying sequences.
+        """
+
+    @abc.abstractmethod
+    def _get(self, index):
+        """
+        Returns the port at a valid, non-negative index of the underlying
+        sequences.
+        """
+
+    @abc.abstractmethod
+    def _iter(self):
+        """
+        Returns an iterator over the ports of the underlying sequences.
+        """
+
+
+class RotatedPorts(PortView):
+    """
+    View of a sequence of ports rotated to the left: element i of the view
+    is element (i + shift) % len(ports) of the underlying sequence. A
+    rotation of 0 is a plain view that shares the ports without copying.
+    Rotations of unmodified rotations are combined, so chains of rotations
+    never nest.
+    """
+
+    __slots__ = ('_base', '_shift', '_length')
+
+    def __init__(self, ports, shift):
+        """
+        Parameters:
+            ports:
+                The sequence of ports to rotate.
+            shift:
+                Number of ports to rotate to the left by. Negative values
+                rotate to the right.
+
+        :type ports list
+        :type shift int
+        """
+        super(RotatedPorts, self).__init__()
+
+        if isinstance(ports, RotatedPorts) and ports._ports is None:
+            shift += ports._shift
+            ports = ports._base
+
+        self._base = ports
+        self._length = len(ports)
+        self._shift = shift % self._length if self._length else 0
+
+    def _size(self):
+        return self._length
+
+    def _get(self, index):
+        index += self._shift
+        if index >= self._length:
+            index -= self._length
+
+        return self._base[index]
+
+    def _iter(self):
+        return chain(islice(self._base, self._shift, None),
+                     islice(self._base, 0, self._shift))
+
+
+class ConcatenatedPorts(PortView):
+    """
+    View of several sequences of ports one after another. Unmodified
+    concatenations among the parts are expanded into their own parts, so
+    stacking circuits one at a time or all at once gives a single flat
+    view and indexing takes logarithmic time in the number of parts.
+    """
+
+    __slots__ = ('_parts', '_offsets', '_length')
+
+    def __init__(self, parts):
+        """
+        Parameters:
+            parts:
+                Iterable of sequences of ports.
+        """
+        super(ConcatenatedPorts, self).__init__()
+
+        self._parts = []
+        for part in parts:
+            if isinstance(part, ConcatenatedPorts) and part._ports is None:
+                self._parts.extend(part._parts)
+            elif len(part) > 0:
+                self._parts.append(part)
+
+        # Index of the first port of every part
+        self._offsets = []
+        self._length = 0
+        for part in self._parts:
+            self._offsets.append(self._length)
+            self._length += len(part)
+
+    def _size(self):
+        return self._length
+
+    def _get(self, index):
+        k = bisect.bisect_right(self._offsets, index) - 1
+        return self._parts[k][index - self._offsets[k]]
+
+    def _iter(self):
+        return chain.from_iterable(self._parts)
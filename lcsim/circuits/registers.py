@@ -0,0 +1,47 @@
+from lcsim.circuits import circuit, encoding
+from lcsim.components import registers
+
+__author__ = 'Jacky'
+
+
+def register_circuit(bits, initial=0):
+    """
+    Create a register of D flip-flops. Each input space is the D input of
+    one flip-flop and the output space at the same index is its state. The
+    register only changes state when its circuit is clocked, see
+    Circuit.clock().
+
+    Parameters:
+        bits:
+            The number of flip-flops, which determines the size of the input
+            and output space.
+        initial:
+            Initial state of the register as a non-negative integer, most
+            significant bit first like digital_source_int_circuit.
+
+    Returns:
+        The resulting register circuit.
+
+    Raises:
+        ValueError if 'initial' does not fit in the given bit count.
+
+    Example usage:
+        >>> from lcsim.circuits import sources
+        >>> r = register_circuit(4, 0x3)
+        >>> connect_circuits(sources.digital_source_int_circuit(0x9, 4), r,
+        ...                  {i: i for i in xrange(0, 4)})
+        >>> r.evaluate(output_format=int)
+        3
+        >>> r.clock()
+        >>> r.evaluate(output_format=int)
+        9
+    """
+    result = circuit.Circuit('reg', bits, bits)
+
+    for i, bit in enumerate(encoding.to_bits(initial, bits)):
+        comp = registers.DFlipFlop(bit)
+
+        result.add_input_component(comp, {i: 0})
+        result.add_output_component(comp, i)
+
+    return result
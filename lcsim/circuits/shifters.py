@@ -1,4 +1,5 @@
 from lcsim.circuits.circuit import Circuit
+from lcsim.circuits.ports import RotatedPorts
 
 
 def left_rotate_in_place(circuit, shift):
@@ -18,10 +19,7 @@ def left_rotate_in_place(circuit, shift):
         The modified circuit. The operation is done in place so this will be
         the same reference as the parameter.
     """
-    output_size = len(circuit._outputs)
-    shift %= output_size
-
-    circuit._outputs = circuit._outputs[shift:] + circuit._outputs[:shift]
+    circuit._outputs = RotatedPorts(circuit._outputs, shift)
     return circuit
 
 
@@ -39,16 +37,10 @@ def left_rotate(circuit, shift):
             Number of bits to rotate by.
 
     Returns:
-        A new circuit object that is the result of the rotation.
+        A new circuit object that is the result of the rotation. It shares
+        the ports of the given circuit, see lcsim.circuits.ports.
     """
-    output_size = len(circuit._outputs)
-    shift %= output_size
-
-    result = Circuit(circuit.name, len(circuit._inputs), len(circuit._outputs))
-    result._inputs = circuit._inputs[:]
-    result._outputs = circuit._outputs[shift:] + circuit._outputs[:shift]
-
-    return result
+    return _rotated(circuit, shift)
 
 
 def right_rotate_in_place(circuit, shift):
@@ -68,11 +60,7 @@ def right_rotate_in_place(circuit, shift):
         The modified circuit. The operation is done in place so this will be
         the same reference as the parameter.
     """
-    output_size = len(circuit._outputs)
-    shift %= output_size
-
-    i = output_size - shift
-    circuit._outputs = circuit._outputs[i:] + circuit._outputs[:i]
+    circuit._outputs = RotatedPorts(circuit._outputs, -shift)
     return circuit
 
 
@@ -90,15 +78,20 @@ def right_rotate(circuit, shift):
             Number of bits to rotate by.
 
     Returns:
-        A new circuit that is the result of the rotation.
+        A new circuit that is the result of the rotation. It shares the
+        ports of the given circuit, see lcsim.circuits.ports.
     """
-    output_size = len(circuit._outputs)
-    shift %= output_size
+    return _rotated(circuit, -shift)
 
-    i = output_size - shift
 
-    result = Circuit(circuit.name, len(circuit._inputs), len(circuit._outputs))
-    result._inputs = circuit._inputs[:]
-    result._outputs = circuit._outputs[i:] + circuit._outputs[:i]
+def _rotated(circuit, shift):
+    """
+    Returns a new circuit over the ports of a circuit, with the output
+    ports rotated to the left by 'shift' bits. The ports are shared through
+    views (see lcsim.circuits.ports) instead of copied.
+    """
+    result = Circuit(circuit.name, 0, 0)
+    result._inputs = RotatedPorts(circuit._inputs, 0)
+    result._outputs = RotatedPorts(circuit._outputs, shift)
 
     return result
@@ -0,0 +1,212 @@
+import heapq
+
+from lcsim.circuits import encoding, netlist
+
+__author__ = 'Jacky'
+
+_FUNCTIONS = {
+    netlist.AND: lambda a, b: a & b,
+    netlist.OR: lambda a, b: a | b,
+    netlist.XOR: lambda a, b: a ^ b,
+    netlist.NOT: lambda a, b: a ^ 1,
+    netlist.NAND: lambda a, b: (a & b) ^ 1,
+    netlist.NOR: lambda a, b: (a | b) ^ 1,
+    netlist.XNOR: lambda a, b: a ^ b ^ 1,
+    netlist.BUF: lambda a, b: a,
+}
+
+
+class EventSimulator(object):
+    """
+    Event-driven simulator for incremental re-evaluation of a circuit.
+
+    The circuit is evaluated in full once. After that, changing input bits
+    only re-evaluates gates in the fan-out cone of the changed bits, using
+    the children sets of the components, and propagation stops at every
+    gate whose output does not change. Gates are processed in topological
+    order, so each gate is evaluated at most once per update and the cost
+    of an update is proportional to the number of gates it reaches rather
+    than the size of the circuit.
+
+    The output bits of the simulated components are kept up to date, so
+    the state of any gate can also be read from its output_bit until the
+    next invalidation (see ComponentBase.invalidate_all).
+    """
+
+    def __init__(self, circuit, inputs=None):
+        """
+        Compile a circuit and evaluate it for an initial input value.
+
+        Parameters:
+            circuit:
+                The circuit to simulate. Changing its connections after the
+                simulator is created is not supported.
+            inputs:
+                Initial value of the input space of the circuit, in any
+                format accepted by encoding.to_bits. Defaults to all zeros.
+
+        :type circuit Circuit
+        """
+        compiled = circuit.compile()
+
+        self.circuit = circuit
+        self._ops = compiled.ops
+        self._in0 = compiled.in0
+        self._in1 = compiled.in1
+        self._outputs = compiled.outputs
+        self._components = compiled.components
+        self._index = dict((component, i) for i, component
+                           in enumerate(compiled.components)
+                           if component is not None)
+
+        # Input space -> wire index of the input wire reading from it
+        self._input_wires = {}
+        for i, op in enumerate(self._ops):
+            if op == netlist.INPUT:
+                self._input_wires[self._in0[i]] = i
+
+        # Input wires and wires inlined from cell instances have no
+        # component, so connections from or to them are kept here
+        self._fanout = {}
+        for i, op in enumerate(self._ops):
+            if op == netlist.INPUT:
+                continue
+
+            for wire in (self._in0[i], self._in1[i]):
+                if wire >= 0 and (self._components[i] is None or
+                                  self._components[wire] is None):
+                    self._fanout.setdefault(wire, []).append(i)
+
+        if inputs is None:
+            inputs = [0] * compiled.input_size
+        self._inputs = encoding.to_bits(inputs, compiled.input_size)
+
+        self._values = [0] * len(self._ops)
+        for i in xrange(0, len(self._ops)):
+            self._values[i] = self._evaluate(i)
+            if self._components[i] is not None:
+                self._components[i].output_bit = self._values[i]
+
+    def set_inputs(self, inputs):
+        """
+        Change bits of the input space and propagate the changes through
+        the circuit.
+
+        Parameters:
+            inputs:
+                Either a dictionary of input space index -> new bit value,
+                or a new value for the whole input space in any format
+                accepted by encoding.to_bits.
+
+        Returns:
+            List of components whose output changed, in topological order.
+
+        Raises:
+            ValueError if an input index is out of range or a value is not
+            a bit.
+
+        Example usage:
+            >>> from lcsim.sha1 import builder
+            >>> sim = EventSimulator(builder.sha1_circuit(), message)
+            >>> toggled = set(sim.set_inputs({0: sim.inputs()[0] ^ 1}))
+            >>> # Number of hash bits flipped by flipping message bit 0
+            >>> len(toggled.intersection(sim.circuit._outputs))
+
+        :rtype list[ComponentBase]
+        """
+        size = len(self._inputs)
+        if isinstance(inputs, dict):
+            changes = inputs
+        else:
+            bits = encoding.to_bits(inputs, size)
+            changes = dict((k, bits[k]) for k in xrange(0, size)
+                           if bits[k] != self._inputs[k])
+
+        for k, bit in changes.iteritems():
+            if k < 0 or k >= size:
+                raise ValueError('Input index out of bounds: %d' % k)
+            if bit != 0 and bit != 1:
+                raise ValueError('Bits can only be 0 or 1.')
+
+        # Heap of wire indices waiting to be evaluated. Wire indices are in
+        # topological order, so popping the smallest one first guarantees
+        # all inputs of a gate are final before it is evaluated.
+        heap = []
+        scheduled = set()
+
+        def schedule(wires):
+            for i in wires:
+                if i not in scheduled:
+                    scheduled.add(i)
+                    heapq.heappush(heap, i)
+
+        for k, bit in changes.iteritems():
+            if self._inputs[k] == bit:
+                continue
+
+            self._inputs[k] = bit
+            if k in self._input_wires:
+                i = self._input_wires[k]
+                self._values[i] = bit
+                schedule(self._fanout.get(i, ()))
+
+        toggled = []
+        while heap:
+            i = heapq.heappop(heap)
+            value = self._evaluate(i)
+            if value == self._values[i]:
+                continue
+
+            self._values[i] = value
+            schedule(self._fanout.get(i, ()))
+
+            component = self._components[i]
+            if component is None:
+                continue
+
+            component.output_bit = value
+            toggled.append(component)
+
+            index = self._index
+            schedule(index[child] for child in component.children
+                     if child in index)
+
+        return toggled
+
+    def inputs(self, output_format=list):
+        """
+        Returns the current value of the input space of the circuit.
+
+        Parameters:
+            output_format:
+                One of list (the default), int or bytes.
+        """
+        return encoding.from_bits(list(self._inputs), output_format)
+
+    def outputs(self, output_format=list):
+        """
+        Returns the current value of the output space of the circuit.
+
+        Parameters:
+            output_format:
+                One of list (the default), int or bytes.
+        """
+        return encoding.from_bits([self._values[i] for i in self._outputs],
+                                  output_format)
+
+    def _evaluate(self, i):
+        """
+        Compute the value of a single wire from the current values of its
+        inputs.
+        """
+        op = self._ops[i]
+        if op == netlist.CONST0:
+            return 0
+        if op == netlist.CONST1:
+            return 1
+        if op == netlist.INPUT:
+            return self._inputs[self._in0[i]]
+
+        b = self._in1[i]
+        return _FUNCTIONS[op](self._values[self._in0[i]],
+                              self._values[b] if b >= 0 else 0)
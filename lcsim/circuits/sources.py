@@ -1,5 +1,5 @@
 from lcsim.circuits import circuit
-from lcsim.components import sources
+from lcsim.components import gates, sources
 
 __author__ = 'Jacky'
 
@@ -85,3 +85,32 @@ def digital_source_int_circuit(number, bits):
 
     return result
 
+
+def digital_input_circuit(bits):
+    """
+    Create a circuit that passes its input space straight through to its
+    output space using buffer gates. Use it in place of a digital source
+    circuit to give a larger circuit primary inputs that are bound when
+    the circuit is evaluated, instead of constants baked in when it is
+    built.
+
+    Parameters:
+        bits:
+            The size of the input and output space of the circuit.
+
+    Returns:
+        The resulting input circuit.
+
+    Example usage:
+        >>> c = digital_input_circuit(4)
+        >>> c.evaluate(0xA, int)
+        10
+    """
+    result = circuit.Circuit('dIn', bits, bits)
+    comps = [gates.BUFGate() for _ in xrange(0, bits)]
+
+    for i, buf in enumerate(comps):
+        result.add_input_component(buf, {i: 0})
+        result.add_output_component(buf, i)
+
+    return result
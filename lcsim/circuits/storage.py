@@ -0,0 +1,151 @@
+import ctypes
+import mmap
+import struct
+import sys
+from array import array
+
+from lcsim.circuits import netlist
+
+__author__ = 'Jacky'
+
+MAGIC = 'LCSN'
+VERSION = 2
+
+# Magic, version, number of wires, number of outputs, input size
+_HEADER = struct.Struct('<4sIIII')
+
+
+def save(compiled, path):
+    """
+    Save a netlist to a file in the binary lcsim netlist format:
+
+        header        magic 'LCSN', then version, number of wires, number
+                      of outputs and input size as little-endian uint32
+        ops           one byte per wire, the gate type codes, padded with
+                      zeros to a multiple of 4 bytes
+        in0, in1      one int32 per wire, the fan-in wire indices
+        outputs       one int32 per output space, the wire it reads
+
+    All integers are little-endian.
+
+    Parameters:
+        compiled:
+            The netlist to save, or a circuit, which is compiled first.
+        path:
+            Path of the file to write.
+
+    Example usage:
+        >>> from lcsim.sha1 import builder
+        >>> save(builder.sha1_circuit(), 'sha1.lcsn')
+        >>> load('sha1.lcsn').evaluate(encoding.to_bits(message, 512))
+
+    :type compiled Netlist
+    :type path str
+    """
+    if not isinstance(compiled, netlist.Netlist):
+        compiled = compiled.compile()
+
+    size = len(compiled.ops)
+
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, size, len(compiled.outputs),
+                             compiled.input_size))
+
+        f.write(array('B', compiled.ops).tostring())
+        f.write('\0' * (-size % 4))
+
+        for values in (compiled.in0, compiled.in1, compiled.outputs):
+            f.write(_int32(values).tostring())
+
+
+def load(path):
+    """
+    Load a netlist saved with save(). The file is memory-mapped and the
+    arrays of the netlist are views into the mapping rather than copies, so
+    even very large netlists open almost instantly, and the pages are
+    shared between all processes that load the same file until they are
+    written to.
+
+    Parameters:
+        path:
+            Path of the file to read.
+
+    Returns:
+        The loaded Netlist. Its arrays are ctypes arrays, which support the
+        same indexing as the lists of a compiled netlist.
+
+    Raises:
+        ValueError if the file is not a valid lcsim netlist file.
+
+    :type path str
+    :rtype Netlist
+    """
+    with open(path, 'rb') as f:
+        header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ValueError('%s is not an lcsim netlist file.' % path)
+
+        magic, version, size, outputs, input_size = _HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError('%s is not an lcsim netlist file.' % path)
+        if version != VERSION:
+            raise ValueError('Unsupported netlist file version %d.' % version)
+
+        ops_size = size + (-size % 4)
+        length = _HEADER.size + ops_size + 4 * (2 * size + outputs)
+
+        f.seek(0, 2)
+        if f.tell() != length:
+            raise ValueError('Netlist file %s is truncated or corrupt.' %
+                             path)
+
+        buf = mmap.mmap(f.fileno(), length, access=mmap.ACCESS_COPY)
+
+    offset = _HEADER.size
+    ops = (ctypes.c_uint8 * size).from_buffer(buf, offset)
+    offset += ops_size
+
+    arrays = []
+    for count in (size, size, outputs):
+        arrays.append(_view(buf, offset, count))
+        offset += 4 * count
+
+    in0, in1, outs = arrays
+    return netlist.Netlist(ops, in0, in1, outs, input_size)
+
+
+def load_circuit(path, name='netlist'):
+    """
+    Load a netlist saved with save() and build a circuit of gates from it,
+    see netlist.decompile.
+
+    :type path str
+    :type name str
+    :rtype Circuit
+    """
+    return netlist.decompile(load(path), name)
+
+
+def _int32(values):
+    """
+    Returns an array of little-endian int32 values.
+    """
+    result = array('i', values)
+    if sys.byteorder != 'little':
+        result.byteswap()
+
+    return result
+
+
+def _view(buf, offset, count):
+    """
+    Returns a ctypes int32 array over 'count' little-endian values of a
+    buffer. On big-endian machines the values are copied and swapped
+    instead.
+    """
+    if sys.byteorder == 'little':
+        return (ctypes.c_int32 * count).from_buffer(buf, offset)
+
+    values = array('i', buf[offset:offset + 4 * count])
+    values.byteswap()
+    return (ctypes.c_int32 * count)(*values)
@@ -97,3 +97,19 @@ class TestBitwiseNot(unittest.TestCase):
 
                 result = int(''.join(map(str, c.evaluate())), 2)
                 self.assertEqual(n, result)
+
+
+class TestBitwiseMux(unittest.TestCase):
+    def test_function(self):
+        for l in xrange(1, 4):
+            space = [[0, 1] for _ in xrange(0, 2 * l + 1)]
+
+            for x in itertools.product(*space):
+                c = bitwise.bitwise_mux_circuit(l)
+
+                source_c = sources.digital_source_circuit(x)
+                circuit.connect_circuits(source_c, c,
+                                         {i: i for i in xrange(0, 2 * l + 1)})
+
+                expected = list(x[1:l + 1] if x[0] else x[l + 1:])
+                self.assertEqual(expected, c.evaluate())
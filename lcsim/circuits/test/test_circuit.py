@@ -1,4 +1,4 @@
-from lcsim.circuits import circuit
+from lcsim.circuits import adders, circuit, sources
 from lcsim.components import base
 
 __author__ = 'Jacky'
@@ -28,6 +28,23 @@ class TestCircuit(unittest.TestCase):
         self.assertRaises(ValueError, c.add_input_component, a, {3: 0})
         self.assertRaises(ValueError, c.add_input_component, a, {0: 4})
 
+    def test_add_input_bus(self):
+        a = base.ComponentBase('a', 2)
+        b = base.ComponentBase('b', 2)
+        c = circuit.Circuit('circuit', 4, 0)
+
+        c.add_input_bus([a, b], 0, 0)
+        c.add_input_bus([a, b], 2, 1)
+        c.add_input_bus([b], 0, 1)
+        self.assertEqual([[(a, 0), (b, 1)], [(b, 0)], [(a, 1)], [(b, 1)]],
+                         c._inputs)
+
+        c = circuit.Circuit('circuit', 2, 0)
+        self.assertRaises(ValueError, c.add_input_bus, [a, b], 1, 0)
+        self.assertRaises(ValueError, c.add_input_bus, [a, b], -1, 0)
+        self.assertRaises(ValueError, c.add_input_bus, [a, b], 0, 2)
+        self.assertEqual([[], []], c._inputs)
+
     def test_add_output_component(self):
         a = base.ComponentBase('gate', 0)
         b = base.ComponentBase('gate', 0)
@@ -42,6 +59,64 @@ class TestCircuit(unittest.TestCase):
         self.assertRaises(ValueError, c.add_output_component, a, -1)
         self.assertRaises(ValueError, c.add_output_component, a, 2)
 
+    def test_invalidate(self):
+        src = sources.digital_source_int_circuit(0x35, 8)
+        a = adders.ripple_adder_no_carry(4)
+        circuit.connect_circuits(src, a, {i: i for i in xrange(0, 8)})
+        self.assertEqual([1, 0, 0, 0], a.evaluate())
+
+        # Corrupt the memoized carry into the most significant bit
+        carry = a._outputs[0]._input_bits[1]
+        carry.output_bit ^= 1
+        self.assertEqual([0, 0, 0, 0], a.evaluate())
+
+        a.invalidate()
+        self.assertEqual([1, 0, 0, 0], a.evaluate())
+
+
+class TestEvaluateInputs(unittest.TestCase):
+    def test_function(self):
+        a = adders.ripple_adder_no_carry(4)
+
+        self.assertEqual([1, 0, 0, 0], a.evaluate([0, 0, 1, 1, 0, 1, 0, 1]))
+        self.assertEqual(8, a.evaluate(0x35, int))
+        self.assertEqual('\x07', stack_byte(a).evaluate('\x25', bytes))
+
+        # Compiled once and reused
+        n = a._netlist
+        self.assertIsNotNone(n)
+        for x in xrange(0, 256):
+            self.assertEqual(((x >> 4) + (x & 15)) % 16, a.evaluate(x, int))
+        self.assertIs(n, a._netlist)
+
+        self.assertRaises(ValueError, a.evaluate, 256)
+
+    def test_output_format(self):
+        c = sources.digital_source_int_circuit(0xBEEF, 16)
+
+        self.assertEqual(0xBEEF, c.evaluate(output_format=int))
+        self.assertEqual('\xbe\xef', c.evaluate(output_format=bytes))
+
+    def test_recompile(self):
+        c = sources.digital_input_circuit(2)
+        self.assertEqual(2, c.evaluate(2, int))
+
+        # Wiring the circuit drops the stale netlist
+        n = circuit.Circuit('n', 0, 2)
+        n.add_output_component(sources.digital_source_circuit([1])._outputs[0], 0)
+        n.add_output_component(sources.digital_source_circuit([1])._outputs[0], 1)
+        circuit.connect_circuits(n, c, {0: 0, 1: 1})
+
+        self.assertIsNone(c._netlist)
+        self.assertEqual(3, c.evaluate(0, int))
+
+
+def stack_byte(a):
+    """
+    Pad the output of a 4-bit circuit to a byte with constant zeroes.
+    """
+    return circuit.stack_circuits('byte', sources.digital_source_circuit([0] * 4), a)
+
 
 class TestConnectCircuits(unittest.TestCase):
     def test_one_to_one(self):
@@ -109,6 +184,65 @@ class TestConnectCircuits(unittest.TestCase):
         self.assertEqual([b, b], d._input_bits)
 
 
+class TestConnectBus(unittest.TestCase):
+    def setUp(self):
+        self.sources = [base.ComponentBase(str(i), 0) for i in xrange(0, 6)]
+        self.out_circuit = circuit.Circuit('out', 0, 6)
+        self.out_circuit._outputs = list(self.sources)
+
+        self.gates = [base.ComponentBase('g%d' % i, 1) for i in xrange(0, 6)]
+        self.in_circuit = circuit.Circuit('in', 6, 0)
+        self.in_circuit._inputs = [[(g, 0)] for g in self.gates]
+
+    def connected(self):
+        return [g._input_bits[0] for g in self.gates]
+
+    def test_full(self):
+        circuit.connect_bus(self.out_circuit, self.in_circuit)
+        self.assertEqual(self.sources, self.connected())
+
+    def test_offsets(self):
+        s = self.sources
+        circuit.connect_bus(self.out_circuit, self.in_circuit, 4, 1, 2)
+        self.assertEqual([None, None, None, None, s[1], s[2]],
+                         self.connected())
+
+    def test_rotation(self):
+        s = self.sources
+        circuit.connect_bus(self.out_circuit, self.in_circuit, 1, 1, 4,
+                            rotation=1)
+        self.assertEqual([None, s[2], s[3], s[4], s[1], None],
+                         self.connected())
+
+    def test_rotation_matches_mapping(self):
+        for rotation in xrange(-8, 9):
+            src = sources.digital_source_int_circuit(0xB5, 8)
+            a = adders.ripple_adder_no_carry(8)
+            b = adders.ripple_adder_no_carry(8)
+            zero = sources.digital_source_int_circuit(0, 8)
+            circuit.connect_bus(src, a, 0, rotation=rotation)
+            circuit.connect_circuits(src, b, {(i + rotation) % 8: i
+                                              for i in xrange(0, 8)})
+            circuit.connect_bus(zero, a, 8)
+            circuit.connect_bus(zero, b, 8)
+
+            self.assertEqual(b.evaluate(), a.evaluate())
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, circuit.connect_bus, self.out_circuit,
+                          self.in_circuit, 1)
+        self.assertRaises(ValueError, circuit.connect_bus, self.out_circuit,
+                          self.in_circuit, 0, 2, 5)
+        self.assertRaises(ValueError, circuit.connect_bus, self.out_circuit,
+                          self.in_circuit, -1, 0, 2)
+
+        self.out_circuit._outputs[3] = None
+        self.assertRaises(ValueError, circuit.connect_bus, self.out_circuit,
+                          self.in_circuit)
+        circuit.connect_bus(self.out_circuit, self.in_circuit, 0, 0, 3)
+        self.assertEqual(self.sources[:3] + [None] * 3, self.connected())
+
+
 class TestStackCircuits(unittest.TestCase):
     def test_function(self):
         c1 = circuit.Circuit('top', 2, 1)
@@ -124,6 +258,28 @@ class TestStackCircuits(unittest.TestCase):
         self.assertEqual([1, 2, 4, 5], c3._inputs)
         self.assertEqual([3, 6], c3._outputs)
 
+    def test_many(self):
+        cs = [sources.digital_source_int_circuit(x, 4) for x in xrange(0, 6)]
+
+        nested = cs[0]
+        for c in cs[1:]:
+            nested = circuit.stack_circuits('nested', nested, c)
+        flat = circuit.stack_circuits('flat', *cs)
+
+        self.assertEqual(0x012345, flat.evaluate(output_format=int))
+        self.assertEqual(0x012345, nested.evaluate(output_format=int))
+        self.assertEqual(len(cs), len(nested._outputs._parts))
+
+    def test_copy_on_write(self):
+        c1 = circuit.Circuit('top', 0, 2)
+        c2 = circuit.Circuit('bottom', 0, 1)
+        c3 = circuit.stack_circuits('stacked', c1, c2)
+
+        c3.add_output_component(base.ComponentBase('a', 0), 1)
+        self.assertEqual([None, None], c1._outputs)
+        self.assertRaises(ValueError, c3.add_output_component,
+                          base.ComponentBase('b', 0), 1)
+
 
 class TestMergeCircuits(unittest.TestCase):
     def test_function(self):
@@ -0,0 +1,83 @@
+from lcsim.circuits import adders, bitwise, circuit, codegen, netlist, sources
+from lcsim.components import gates
+from lcsim.sha1 import builder
+
+__author__ = 'Jacky'
+
+import unittest
+import itertools
+import random
+
+
+class TestGenerateSource(unittest.TestCase):
+    def test_function(self):
+        src = sources.digital_source_circuit([1, 0])
+        c = bitwise.bitwise_and_circuit(1)
+        circuit.connect_circuits(src, c, {0: 0, 1: 1})
+
+        source = codegen.generate_source(c.compile(), 'f')
+        self.assertEqual('def f(inputs, mask=1):\n'
+                         '    w0 = mask\n'
+                         '    w1 = 0\n'
+                         '    w2 = w0 & w1\n'
+                         '    return [w2]\n', source)
+
+
+class TestGenerateFunction(unittest.TestCase):
+    def test_all_gates(self):
+        for cls in [gates.NANDGate, gates.NORGate, gates.XNORGate,
+                    gates.ANDGate, gates.ORGate, gates.XORGate]:
+            gate = cls()
+            inv = gates.NOTGate()
+            buf = gates.BUFGate()
+            inv.add_input(gate, 0)
+            buf.add_input(inv, 0)
+
+            c = circuit.Circuit('c', 2, 3)
+            c.add_input_component(gate, {0: 0, 1: 1})
+            c.add_output_component(gate, 0)
+            c.add_output_component(buf, 1)
+            c.add_output_component(
+                sources.digital_source_circuit([1])._outputs[0], 2)
+
+            n = c.compile()
+            f = codegen.generate_function(n)
+
+            vectors = [list(x) for x in itertools.product([0, 1], repeat=2)]
+            for x in vectors:
+                self.assertEqual(n.evaluate(x), f(x))
+
+            lanes = n.evaluate_lanes([0b0011, 0b0101], 4)
+            self.assertEqual(lanes, f([0b0011, 0b0101], 0b1111))
+
+
+class TestJit(unittest.TestCase):
+    def test_adder(self):
+        a = adders.ripple_adder_no_carry(4)
+        f = a.jit()
+
+        self.assertIs(f, a.jit())
+        for x in itertools.product([0, 1], repeat=8):
+            self.assertEqual(a.evaluate(list(x)), f(list(x)))
+
+        # Recompiling regenerates the function
+        a.compile()
+        self.assertIsNot(f, a.jit())
+
+    def test_sha1(self):
+        c = builder.sha1_circuit(rounds=16)
+        f = c.jit()
+
+        messages = [random.getrandbits(512) for _ in xrange(0, 8)]
+        for m in messages:
+            bits = map(int, bin(m)[2:].zfill(512))
+            self.assertEqual(c.evaluate(m), f(bits))
+
+        # Bit-sliced lanes
+        vectors = [map(int, bin(m)[2:].zfill(512)) for m in messages]
+        lanes = netlist.pack_lanes(vectors, 512)
+        outputs = f(lanes, 0xFF)
+
+        self.assertEqual(c.compile().evaluate_lanes(lanes, 8), outputs)
+        self.assertEqual([c.evaluate(m) for m in messages],
+                         netlist.unpack_lanes(outputs, 8))
@@ -0,0 +1,48 @@
+from lcsim.circuits import encoding
+
+__author__ = 'Jacky'
+
+import unittest
+
+
+class TestToBits(unittest.TestCase):
+    def test_list(self):
+        self.assertEqual([0, 1, 1], encoding.to_bits([0, 1, 1], 3))
+        self.assertEqual([1, 0], encoding.to_bits((1, 0), 2))
+
+        self.assertRaises(ValueError, encoding.to_bits, [0, 1], 3)
+        self.assertRaises(ValueError, encoding.to_bits, [0, 2], 2)
+
+    def test_int(self):
+        self.assertEqual([0, 1, 0, 0, 1, 1, 1, 0], encoding.to_bits(78, 8))
+        self.assertEqual([0, 0, 0], encoding.to_bits(0, 3))
+        self.assertEqual([1] * 64, encoding.to_bits((1 << 64) - 1, 64))
+
+        self.assertRaises(ValueError, encoding.to_bits, -1, 3)
+        self.assertRaises(ValueError, encoding.to_bits, 8, 3)
+
+    def test_bytes(self):
+        self.assertEqual([1, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 1, 0],
+                         encoding.to_bits('\xa1\x02', 16))
+        self.assertEqual([0, 0, 0, 0, 1, 1, 1, 1],
+                         encoding.to_bits(bytearray([15]), 8))
+
+        self.assertRaises(ValueError, encoding.to_bits, 'ab', 8)
+
+    def test_failures(self):
+        self.assertRaises(TypeError, encoding.to_bits, 1.5, 8)
+        self.assertRaises(TypeError, encoding.to_bits, None, 8)
+
+
+class TestFromBits(unittest.TestCase):
+    def test_function(self):
+        bits = [1, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 1, 0]
+
+        self.assertIs(bits, encoding.from_bits(bits))
+        self.assertEqual(0xa102, encoding.from_bits(bits, int))
+        self.assertEqual('\xa1\x02', encoding.from_bits(bits, bytes))
+        self.assertEqual(0, encoding.from_bits([], int))
+
+    def test_failures(self):
+        self.assertRaises(ValueError, encoding.from_bits, [1, 0], bytes)
+        self.assertRaises(ValueError, encoding.from_bits, [1, 0], str.upper)
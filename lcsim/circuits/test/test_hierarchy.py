@@ -0,0 +1,142 @@
+from lcsim.circuits import adders, bitwise, circuit, hierarchy, netlist, simulation, sources
+from lcsim.components import base, cells, gates
+
+__author__ = 'Jacky'
+
+import unittest
+import itertools
+import random
+
+
+def connect_source(number, c):
+    src = sources.digital_source_int_circuit(number, len(c._inputs))
+    circuit.connect_circuits(src, c, {i: i for i in xrange(0, len(c._inputs))})
+
+
+class TestCell(unittest.TestCase):
+    def setUp(self):
+        self.adder = hierarchy.Cell(adders.ripple_adder_no_carry(4))
+
+    def test_instance(self):
+        a = self.adder.instance()
+        b = self.adder.instance()
+
+        self.assertEqual(8, len(a._inputs))
+        self.assertEqual(4, len(a._outputs))
+
+        # Instances share the compiled definition
+        instance = a._outputs[0]._input_bits[0]
+        self.assertIsInstance(instance, cells.CellInstance)
+        self.assertIs(instance.cell.netlist,
+                      b._outputs[0]._input_bits[0].cell.netlist)
+
+    def test_evaluate(self):
+        for x in xrange(0, 256):
+            a = self.adder.instance()
+            self.assertEqual(((x >> 4) + x) & 0xF, a.evaluate(x, int))
+
+            connect_source(x, a)
+            self.assertEqual(((x >> 4) + x) & 0xF, a.evaluate(output_format=int))
+
+    def test_chained(self):
+        # (x + y) + z with two instances of the same cell
+        first = self.adder.instance()
+        second = self.adder.instance()
+        circuit.connect_circuits(first, second, {i: i for i in xrange(0, 4)})
+        inputs = sources.digital_input_circuit(4)
+        circuit.connect_circuits(inputs, second, {i: i + 4 for i in xrange(0, 4)})
+        c = circuit.stack_circuits('c', first, inputs)
+        c = circuit.merge_circuits('c', c, second)
+
+        for x in xrange(0, 1 << 12):
+            expected = ((x >> 8) + (x >> 4) + x) & 0xF
+            self.assertEqual(expected, c.evaluate(x, int))
+
+    def test_nested(self):
+        # A cell defined from a circuit that contains instances
+        first = self.adder.instance()
+        inv = bitwise.bitwise_not_circuit(4)
+        circuit.connect_circuits(first, inv, {i: i for i in xrange(0, 4)})
+        cell = hierarchy.Cell(circuit.merge_circuits('n', first, inv))
+
+        c = cell.instance()
+        for x in xrange(0, 256):
+            self.assertEqual(~((x >> 4) + x) & 0xF, c.evaluate(x, int))
+
+    def test_buffers(self):
+        c = sources.digital_input_circuit(2)
+        gate = bitwise.bitwise_xor_circuit(1)
+        circuit.connect_circuits(c, gate, {0: 0, 1: 1})
+        cell = hierarchy.Cell(circuit.merge_circuits('x', c, gate))
+
+        self.assertEqual([netlist.INPUT, netlist.INPUT, netlist.XOR],
+                         cell.netlist.ops)
+
+    def test_missing_input(self):
+        a = self.adder.instance()
+        self.assertRaises(base.MissingInputException, a.evaluate)
+        self.assertRaises(base.MissingInputException,
+                          a._outputs[0]._input_bits[0].evaluate)
+
+
+class TestFlatten(unittest.TestCase):
+    def test_connected(self):
+        adder = hierarchy.Cell(adders.ripple_adder_no_carry(4))
+        a = adder.instance()
+        inv = bitwise.bitwise_not_circuit(4)
+        circuit.connect_circuits(a, inv, {i: i for i in xrange(0, 4)})
+        c = circuit.merge_circuits('c', a, inv)
+        connect_source(0x35, c)
+
+        self.assertEqual(1, hierarchy.flatten(c))
+        self.assertEqual(0, hierarchy.flatten(c))
+        self.assertEqual([0, 1, 1, 1], c.evaluate())
+
+        for component in netlist.topological_order(c._outputs):
+            self.assertNotIsInstance(component, cells.CellInstance)
+            self.assertNotIsInstance(component, cells.CellOutput)
+
+        flat = adders.ripple_adder_no_carry(4).compile()
+        self.assertEqual(len(flat) + 4, len(c.compile()))
+
+    def test_inputs(self):
+        cell = hierarchy.Cell(bitwise.bitwise_and_circuit(2))
+        c = cell.instance()
+        hierarchy.flatten(c)
+
+        for x in itertools.product([0, 1], repeat=4):
+            self.assertEqual([x[0] & x[2], x[1] & x[3]], c.evaluate(list(x)))
+
+    def test_passthrough(self):
+        # Cell outputs may be wired straight to cell inputs or constants
+        c = sources.digital_input_circuit(1)
+        src = sources.digital_source_circuit([1])
+        cell = hierarchy.Cell(circuit.stack_circuits('p', c, src))
+
+        instance = cell.instance()
+        connect_source(0, instance)
+        inv = gates.NOTGate()
+        inv.add_input(instance._outputs[0], 0)
+
+        hierarchy.flatten(instance)
+        self.assertEqual([0, 1], instance.evaluate())
+        inv.evaluate()
+        self.assertEqual(1, inv.output_bit)
+
+
+class TestSimulation(unittest.TestCase):
+    def test_event_simulator(self):
+        adder = hierarchy.Cell(adders.ripple_adder_no_carry(4))
+        a = adder.instance()
+        inv = bitwise.bitwise_not_circuit(4)
+        circuit.connect_circuits(a, inv, {i: i for i in xrange(0, 4)})
+        c = circuit.merge_circuits('c', a, inv)
+
+        sim = simulation.EventSimulator(c)
+        for _ in xrange(0, 50):
+            x = random.getrandbits(8)
+            toggled = sim.set_inputs(x)
+
+            self.assertEqual(c.evaluate(x), sim.outputs())
+            for component in toggled:
+                self.assertIsNotNone(component)
@@ -0,0 +1,206 @@
+from lcsim.circuits import adders, bitwise, circuit, netlist, shifters, sources
+from lcsim.components import base, gates, registers
+
+__author__ = 'Jacky'
+
+import unittest
+import itertools
+
+
+class TestTopologicalOrder(unittest.TestCase):
+    def test_function(self):
+        a = sources.digital_source_circuit([1, 0])
+        n = bitwise.bitwise_not_circuit(1)
+        x = bitwise.bitwise_xor_circuit(1)
+
+        circuit.connect_circuits(a, n, {0: 0})
+        circuit.connect_circuits(n, x, {0: 0})
+        circuit.connect_circuits(a, x, {1: 1})
+
+        order = netlist.topological_order(x._outputs)
+        self.assertEqual(4, len(order))
+        for i, gate in enumerate(order):
+            for parent in gate._input_bits:
+                self.assertLess(order.index(parent), i)
+
+    def test_deep(self):
+        # Deep enough to overflow the default recursion limit
+        gate = sources.digital_source_circuit([1])._outputs[0]
+        for _ in xrange(0, 5000):
+            g = gates.NOTGate()
+            g.add_input(gate, 0)
+            gate = g
+
+        self.assertEqual(5001, len(netlist.topological_order([gate])))
+
+    def test_registers(self):
+        ff = registers.DFlipFlop()
+        inv = gates.NOTGate()
+        inv.add_input(ff, 0)
+        ff.add_input(inv, 0)
+
+        # The feedback loop is cut at the register
+        self.assertEqual([ff, inv], netlist.topological_order([inv]))
+        self.assertEqual([ff], netlist.topological_order([ff]))
+
+
+class TestGateCodes(unittest.TestCase):
+    def test_classes(self):
+        class SubAND(gates.ANDGate):
+            pass
+
+        for code in (netlist.AND, netlist.XNOR, netlist.BUF):
+            cls = netlist.gate_class(code)
+            self.assertEqual(code, netlist.class_code(cls))
+            self.assertEqual(code, netlist.gate_code(cls()))
+
+        self.assertEqual(netlist.AND, netlist.class_code(SubAND))
+        self.assertIsNone(netlist.class_code(registers.DFlipFlop))
+        self.assertRaises(ValueError, netlist.gate_class, netlist.CONST0)
+
+
+class TestCompile(unittest.TestCase):
+    def test_sources(self):
+        c = sources.digital_source_int_circuit(0xBEEF, 16)
+        n = c.compile()
+
+        self.assertEqual(16, len(n))
+        self.assertEqual(c.evaluate(), n.evaluate())
+
+    def test_bitwise(self):
+        builders = [bitwise.bitwise_and_circuit, bitwise.bitwise_or_circuit,
+                    bitwise.bitwise_xor_circuit]
+
+        for x in itertools.product([0, 1], repeat=4):
+            for build in builders:
+                src = sources.digital_source_circuit(x)
+                c = build(2)
+                circuit.connect_circuits(src, c, {i: i for i in xrange(0, 4)})
+
+                self.assertEqual(c.evaluate(), c.compile().evaluate())
+
+            src = sources.digital_source_circuit(x)
+            c = bitwise.bitwise_not_circuit(4)
+            circuit.connect_circuits(src, c, {i: i for i in xrange(0, 4)})
+
+            self.assertEqual(c.evaluate(), c.compile().evaluate())
+
+    def test_other_gates(self):
+        for (cls, x) in itertools.product([gates.NANDGate, gates.NORGate,
+                                           gates.XNORGate],
+                                          itertools.product([0, 1], repeat=2)):
+            src = sources.digital_source_circuit(x)
+            gate = cls()
+            gate.add_input(src._outputs[0], 0)
+            gate.add_input(src._outputs[1], 1)
+
+            c = circuit.Circuit('c', 0, 1)
+            c.add_output_component(gate, 0)
+
+            self.assertEqual(c.evaluate(), c.compile().evaluate())
+
+    def test_adders(self):
+        for x in itertools.product([0, 1], repeat=8):
+            src = sources.digital_source_circuit(x)
+            a = adders.ripple_adder_no_carry(4)
+            circuit.connect_circuits(src, a, {i: i for i in xrange(0, 8)})
+
+            self.assertEqual(a.evaluate(), a.compile().evaluate())
+
+        for x in itertools.product([0, 1], repeat=3):
+            src = sources.digital_source_circuit(x)
+            a = adders.full_adder_circuit()
+            circuit.connect_circuits(src, a, {0: 0, 1: 1, 2: 2})
+
+            self.assertEqual(a.evaluate(), a.compile().evaluate())
+
+    def test_shifters(self):
+        src = sources.digital_source_int_circuit(0xA5, 8)
+        for shift in xrange(0, 8):
+            c = shifters.left_rotate(src, shift)
+            self.assertEqual(c.evaluate(), c.compile().evaluate())
+
+            c = shifters.right_rotate(src, shift)
+            self.assertEqual(c.evaluate(), c.compile().evaluate())
+
+    def test_inputs(self):
+        a = adders.ripple_adder_no_carry(4)
+        n = a.compile()
+
+        self.assertEqual(8, n.input_size)
+        for x in itertools.product([0, 1], repeat=8):
+            n1 = int(''.join(map(str, x[:4])), 2)
+            n2 = int(''.join(map(str, x[4:])), 2)
+
+            num = int(''.join(map(str, n.evaluate(list(x)))), 2)
+            self.assertEqual((n1 + n2) % 16, num)
+
+        self.assertRaises(ValueError, n.evaluate)
+        self.assertRaises(ValueError, n.evaluate, [0] * 7)
+
+    def test_does_not_alter_gates(self):
+        src = sources.digital_source_int_circuit(3, 4)
+        c = bitwise.bitwise_not_circuit(4)
+        circuit.connect_circuits(src, c, {i: i for i in xrange(0, 4)})
+
+        c.compile().evaluate()
+        for gate in c._outputs + src._outputs:
+            self.assertIsNone(gate.output_bit)
+
+    def test_failures(self):
+        c = circuit.Circuit('c', 0, 2)
+        c.add_output_component(gates.ANDGate(), 0)
+        self.assertRaises(circuit.InvalidCircuitException, c.compile)
+
+        c.add_output_component(gates.ORGate(), 1)
+        self.assertRaises(base.MissingInputException, c.compile)
+
+        c = circuit.Circuit('c', 0, 1)
+        c.add_output_component(base.ComponentBase('custom', 1), 0)
+        self.assertRaises(ValueError, c.compile)
+
+
+class TestBitSliced(unittest.TestCase):
+    def test_pack_lanes(self):
+        vectors = [[1, 0, 1], [0, 0, 1], [1, 1, 0]]
+        lanes = netlist.pack_lanes(vectors, 3)
+
+        self.assertEqual([5, 4, 3], lanes)
+        self.assertEqual(vectors, netlist.unpack_lanes(lanes, 3))
+        self.assertRaises(ValueError, netlist.pack_lanes, [[1, 0]], 3)
+
+    def test_batch_adder(self):
+        a = adders.ripple_adder_no_carry(4)
+        n = a.compile()
+
+        vectors = [list(x) for x in itertools.product([0, 1], repeat=8)]
+        results = n.evaluate_batch(vectors)
+
+        self.assertEqual(256, len(results))
+        for x, result in itertools.izip(vectors, results):
+            self.assertEqual(n.evaluate(x), result)
+
+    def test_batch_all_gates(self):
+        # NOT and constant outputs must be masked to the lane width
+        for cls in [gates.NANDGate, gates.NORGate, gates.XNORGate,
+                    gates.ANDGate, gates.ORGate, gates.XORGate]:
+            gate = cls()
+            inv = gates.NOTGate()
+            inv.add_input(gate, 0)
+
+            c = circuit.Circuit('c', 2, 3)
+            c.add_input_component(gate, {0: 0, 1: 1})
+            c.add_output_component(gate, 0)
+            c.add_output_component(inv, 1)
+            c.add_output_component(
+                sources.digital_source_circuit([1])._outputs[0], 2)
+            n = c.compile()
+
+            vectors = [list(x) for x in itertools.product([0, 1], repeat=2)]
+            self.assertEqual([n.evaluate(x) for x in vectors],
+                             n.evaluate_batch(vectors))
+
+    def test_lanes(self):
+        n = bitwise.bitwise_not_circuit(2).compile()
+        self.assertEqual([0b1010, 0b0101], n.evaluate_lanes([0b0101, 0b1010], 4))
+        self.assertEqual([], n.evaluate_batch([]))
@@ -0,0 +1,292 @@
+from lcsim.circuits import adders, bitwise, circuit, optimize, sources
+from lcsim.components import base, gates
+from lcsim.components.sources import DigitalSourceBase
+from lcsim.sha1 import builder
+
+__author__ = 'Jacky'
+
+import unittest
+import itertools
+import random
+
+
+def two_input_circuit(cls, a, b):
+    """
+    Create a circuit with a single two-input gate of the given class. Each
+    input is a constant if it is 0 or 1, or an open input space otherwise.
+    """
+    c = circuit.Circuit('c', 2, 1)
+    gate = cls()
+    for j, x in enumerate([a, b]):
+        if x is None:
+            c.add_input_component(gate, {j: j})
+        else:
+            gate.add_input(sources.digital_source_circuit([x])._outputs[0], j)
+
+    c.add_output_component(gate, 0)
+    return c, gate
+
+
+class ConstantOne(base.ComponentBase):
+    """
+    Component without inputs that is not a digital source.
+    """
+
+    def __init__(self):
+        super(ConstantOne, self).__init__('one', 0)
+
+    def evaluate(self):
+        self.output_bit = 1
+
+
+class TestFoldConstants(unittest.TestCase):
+    def test_constant_adder(self):
+        for x in itertools.product([0, 1], repeat=6):
+            src = sources.digital_source_circuit(x)
+            a = adders.ripple_adder_no_carry(3)
+            circuit.connect_circuits(src, a, {i: i for i in xrange(0, 6)})
+
+            expected = a.compile().evaluate()
+            stats = optimize.fold_constants(a)
+
+            self.assertLessEqual(stats['after'], 2)
+            self.assertEqual(stats['before'] - stats['after'], stats['removed'])
+            for gate in a._outputs:
+                self.assertIsInstance(gate, DigitalSourceBase)
+            self.assertEqual(expected, a.evaluate())
+
+    def test_gates(self):
+        classes = [gates.ANDGate, gates.ORGate, gates.XORGate, gates.NANDGate,
+                   gates.NORGate, gates.XNORGate]
+
+        for cls in classes:
+            for (a, b) in itertools.product([0, 1, None], repeat=2):
+                c, gate = two_input_circuit(cls, a, b)
+                n = c.compile()
+
+                optimize.fold_constants(c)
+                for x in itertools.product([0, 1], repeat=2):
+                    self.assertEqual(n.evaluate(list(x)), c.evaluate(list(x)))
+
+    def test_wires(self):
+        # XOR with 0, AND with 1 and OR with 0 become wires
+        for (cls, x) in [(gates.XORGate, 0), (gates.ANDGate, 1),
+                         (gates.ORGate, 0), (gates.XNORGate, 1)]:
+            src = sources.digital_source_circuit([1, 0, 1])
+            gate = cls()
+            gate.add_input(src._outputs[0], 0)
+            gate.add_input(sources.digital_source_circuit([x])._outputs[0], 1)
+            inv = gates.NOTGate()
+            inv.add_input(gate, 0)
+
+            c = circuit.Circuit('c', 1, 2)
+            c.add_output_component(inv, 0)
+            c.add_output_component(gate, 1)
+
+            c2, gate2 = two_input_circuit(cls, None, x)
+            optimize.fold_constants(c2)
+
+            self.assertEqual([], c2._inputs[1])
+            self.assertEqual(1, len(c2._inputs[0]))
+            self.assertEqual(c2._outputs[0], gate2)
+
+            optimize.fold_constants(c)
+            self.assertEqual([0, 1], c.evaluate())
+
+    def test_open_inputs(self):
+        # Partially constant adder keeps reading from its input space
+        a = adders.ripple_adder_no_carry(8)
+        src = sources.digital_source_int_circuit(0x01, 8)
+        circuit.connect_circuits(src, a, {i: i + 8 for i in xrange(0, 8)})
+
+        stats = optimize.fold_constants(a)
+        self.assertGreater(stats['removed'], 0)
+
+        inputs = circuit.Circuit('in', 8, 8)
+        inputs._inputs = a._inputs[:8]
+        inputs._outputs = a._outputs
+        for x in xrange(0, 256):
+            self.assertEqual((x + 1) % 256, inputs.evaluate(x, int))
+
+    def test_sha1(self):
+        chunk = random.getrandbits(512)
+        message = sources.digital_source_int_circuit(chunk, 512)
+        h = builder.hash_circuit(message, rounds=20)
+        expected = h.compile().evaluate()
+
+        # Fully constant circuit folds down to its two constant sources
+        stats = optimize.fold_constants(h)
+        self.assertEqual(2, stats['after'])
+        self.assertEqual(expected, h.evaluate())
+
+    def test_sha1_inputs(self):
+        c = builder.sha1_circuit(rounds=20)
+        expected = [c.evaluate(x, int) for x in [0, 1, (1 << 512) - 1]]
+
+        stats = optimize.fold_constants(c)
+        self.assertGreater(stats['removed'], 0)
+        self.assertEqual(expected,
+                         [c.evaluate(x, int) for x in [0, 1, (1 << 512) - 1]])
+
+    def test_not_chain(self):
+        src = sources.digital_source_circuit([1])
+        n1 = bitwise.bitwise_not_circuit(1)
+        n2 = bitwise.bitwise_not_circuit(1)
+        circuit.connect_circuits(src, n1, {0: 0})
+        circuit.connect_circuits(n1, n2, {0: 0})
+
+        self.assertEqual({'before': 3, 'after': 1, 'removed': 2},
+                         optimize.fold_constants(n2))
+        self.assertEqual([1], n2.evaluate())
+
+    def test_constant_component(self):
+        one = ConstantOne()
+        inv = gates.NOTGate()
+        inv.add_input(one, 0)
+        c = circuit.Circuit('c', 0, 2)
+        c.add_output_component(one, 0)
+        c.add_output_component(inv, 1)
+
+        self.assertEqual({'before': 2, 'after': 2, 'removed': 0},
+                         optimize.fold_constants(c))
+        self.assertIs(one, c._outputs[0])
+        self.assertIsInstance(c._outputs[1], DigitalSourceBase)
+        self.assertEqual([1, 0], c.evaluate())
+
+
+class TestStructuralHashTable(unittest.TestCase):
+    def test_add(self):
+        src = sources.digital_source_circuit([1, 0])
+        a, b = src._outputs
+
+        g1 = gates.ANDGate()
+        g1.add_input(a, 0)
+        g1.add_input(b, 1)
+        g2 = gates.ANDGate()
+        g2.add_input(b, 0)
+        g2.add_input(a, 1)
+        g3 = gates.ORGate()
+        g3.add_input(a, 0)
+        g3.add_input(b, 1)
+
+        table = optimize.StructuralHashTable()
+        self.assertIs(g1, table.add(g1))
+        self.assertIs(g1, table.add(g2))
+        self.assertIs(g3, table.add(g3))
+
+        # Constants are keyed by value, open gates are never shared
+        self.assertIs(a, table.add(a))
+        self.assertIs(a, table.add(sources.digital_source_circuit([1])._outputs[0]))
+        g4 = gates.NOTGate()
+        self.assertIs(g4, table.add(g4))
+        self.assertIsNot(g4, table.add(gates.NOTGate()))
+        self.assertEqual(3, len(table))
+
+    def test_gate(self):
+        a, b = sources.digital_source_circuit([1, 0])._outputs
+        table = optimize.StructuralHashTable()
+
+        g = table.gate(gates.XORGate, a, b)
+        self.assertEqual([a, b], g._input_bits)
+        self.assertIs(g, table.gate(gates.XORGate, b, a))
+        self.assertIsNot(g, table.gate(gates.XNORGate, b, a))
+        self.assertIs(table.gate(gates.NOTGate, g), table.gate(gates.NOTGate, g))
+
+        # Hits do not instantiate gates
+        count = base.ComponentBase.count
+        for _ in xrange(0, 100):
+            table.gate(gates.XORGate, b, a)
+        self.assertEqual(count, base.ComponentBase.count)
+
+        self.assertRaises(ValueError, table.gate, ConstantOne)
+
+
+class TestHashStructure(unittest.TestCase):
+    def test_duplicates(self):
+        # Two identical NOT -> AND cones collapse into one
+        c = circuit.Circuit('c', 2, 2)
+        for i in xrange(0, 2):
+            inv = gates.NOTGate()
+            gate = gates.ANDGate()
+            gate.add_input(inv, 1 - i)
+            c.add_input_component(inv, {0: 0})
+            c.add_input_component(gate, {1: i})
+            c.add_output_component(gate, i)
+
+        # Open input bits are never shared
+        self.assertEqual(0, optimize.hash_structure(c)['removed'])
+
+        src = sources.digital_source_circuit([1, 0])
+        circuit.connect_circuits(src, c, {0: 0, 1: 1})
+
+        stats = optimize.hash_structure(c)
+        self.assertEqual({'before': 6, 'after': 4, 'removed': 2}, stats)
+        self.assertIs(c._outputs[0], c._outputs[1])
+        self.assertEqual([0, 0], c.evaluate())
+
+    def test_sha1_inputs(self):
+        c = builder.sha1_circuit(rounds=24)
+        messages = [random.getrandbits(512) for _ in xrange(0, 3)]
+        expected = [c.evaluate(x, int) for x in messages]
+
+        stats = optimize.hash_structure(c)
+        self.assertGreater(stats['removed'], 0)
+        self.assertEqual(expected, [c.evaluate(x, int) for x in messages])
+
+
+class TestPrune(unittest.TestCase):
+    def test_adder(self):
+        a = adders.ripple_adder_no_carry(8)
+
+        # The lowest bit of the sum only depends on the lowest input bits
+        low, stats = optimize.prune(a, [7])
+        self.assertEqual(1, stats['after'])
+        self.assertEqual(1, stats['outputs'])
+        self.assertEqual(stats['before'] - 1, stats['removed'])
+
+        for x in xrange(0, 1 << 16, 97):
+            self.assertEqual(a.evaluate(x)[7:], low.evaluate(x))
+
+    def test_copies(self):
+        a = adders.ripple_adder_no_carry(4)
+        pruned, stats = optimize.prune(a)
+
+        self.assertEqual(stats['before'], stats['after'])
+        for (old, new) in zip(a._outputs, pruned._outputs):
+            self.assertIsNot(old, new)
+            self.assertIs(type(old), type(new))
+
+        # Pruned gates are not connected to the original circuit
+        for gate in pruned.compile().components:
+            if gate is not None:
+                self.assertFalse(gate.children & set(a.compile().components))
+
+        for x in xrange(0, 256):
+            self.assertEqual(a.evaluate(x), pruned.evaluate(x))
+
+    def test_order(self):
+        src = sources.digital_source_circuit([1, 0, 0])
+        pruned, stats = optimize.prune(src, [2, 0])
+
+        self.assertEqual([0, 1], pruned.evaluate())
+        self.assertEqual(3, stats['before'])
+        self.assertEqual(2, stats['after'])
+
+    def test_failures(self):
+        a = adders.ripple_adder_no_carry(4)
+        self.assertRaises(ValueError, optimize.prune, a, [4])
+        self.assertRaises(ValueError, optimize.prune, a, [-1])
+
+        c = circuit.Circuit('c', 0, 2)
+        c.add_output_component(gates.NOTGate(), 0)
+        self.assertRaises(circuit.InvalidCircuitException, optimize.prune, c, [1])
+
+    def test_sha1_word(self):
+        c = builder.sha1_circuit(rounds=20)
+        h4, stats = optimize.prune(c, range(128, 160))
+
+        self.assertLess(stats['after'], stats['before'])
+        for _ in xrange(0, 3):
+            chunk = random.getrandbits(512)
+            self.assertEqual(c.evaluate(chunk, int) & 0xFFFFFFFF,
+                             h4.evaluate(chunk, int))
@@ -0,0 +1,27 @@
+from lcsim.circuits import adders, parallel
+from lcsim.sha1 import builder
+
+__author__ = 'Jacky'
+
+import unittest
+import random
+
+
+class TestBatchEvaluator(unittest.TestCase):
+    def test_adder(self):
+        a = adders.ripple_adder_no_carry(8)
+        vectors = range(0, 1 << 16, 37)
+
+        with parallel.BatchEvaluator(a, processes=2, chunk_size=100) as e:
+            self.assertEqual([a.evaluate(x) for x in vectors],
+                             e.evaluate(vectors))
+            self.assertEqual([a.evaluate(x, int) for x in vectors],
+                             e.evaluate(vectors, int))
+            self.assertEqual([], e.evaluate([]))
+
+    def test_sha1(self):
+        c = builder.sha1_circuit(rounds=16)
+        messages = [random.getrandbits(512) for _ in xrange(0, 20)]
+
+        self.assertEqual([c.evaluate(m, bytes) for m in messages],
+                         parallel.evaluate_batch(c, messages, 2, bytes))
@@ -0,0 +1,88 @@
+from lcsim.circuits import ports
+
+__author__ = 'Jacky'
+
+import unittest
+
+
+class TestPortView(unittest.TestCase):
+    def test_abstract(self):
+        self.assertRaises(TypeError, ports.PortView)
+
+
+class TestRotatedPorts(unittest.TestCase):
+    def test_function(self):
+        base = range(0, 5)
+        for shift in xrange(-7, 8):
+            expected = [base[(i + shift) % 5] for i in xrange(0, 5)]
+            view = ports.RotatedPorts(base, shift)
+
+            self.assertEqual(expected, list(view))
+            self.assertEqual(expected, [view[i] for i in xrange(0, 5)])
+            self.assertEqual(expected[1:4], view[1:4])
+            self.assertEqual(expected[-1], view[-1])
+            self.assertEqual(5, len(view))
+
+        self.assertRaises(IndexError, lambda: ports.RotatedPorts(base, 1)[5])
+        self.assertEqual([], list(ports.RotatedPorts([], 3)))
+
+    def test_combined(self):
+        base = range(0, 32)
+        view = ports.RotatedPorts(ports.RotatedPorts(base, 30), 5)
+
+        self.assertIs(base, view._base)
+        self.assertEqual(base[3:] + base[:3], view)
+
+    def test_shared(self):
+        base = [[], []]
+        view = ports.RotatedPorts(base, 1)
+
+        view[0].append(1)
+        base[0] = 'x'
+        self.assertEqual([[1], 'x'], view)
+
+    def test_copy_on_write(self):
+        base = [0, 1, 2]
+        view = ports.RotatedPorts(base, 1)
+
+        view[0] = 'x'
+        self.assertEqual(['x', 2, 0], view)
+        self.assertEqual([0, 1, 2], base)
+
+        base[2] = 'y'
+        self.assertEqual(['x', 2, 0], view)
+
+
+class TestConcatenatedPorts(unittest.TestCase):
+    def test_function(self):
+        parts = [[0, 1], [], [2], [3, 4, 5]]
+        view = ports.ConcatenatedPorts(parts)
+
+        self.assertEqual(range(0, 6), view)
+        self.assertEqual(range(0, 6), [view[i] for i in xrange(0, 6)])
+        self.assertEqual([5, 3, 1], view[::-2])
+        self.assertTrue(4 in view)
+        self.assertFalse(None in view)
+        self.assertEqual([0, 1, 2, 3, 4, 5, 6], view + [6])
+        self.assertEqual([-1, 0, 1, 2, 3, 4, 5], [-1] + view)
+
+    def test_flattened(self):
+        view = ports.ConcatenatedPorts([[0]])
+        for i in xrange(1, 100):
+            view = ports.ConcatenatedPorts([view, [i]])
+
+        self.assertEqual(100, len(view._parts))
+        self.assertEqual(range(0, 100), view)
+
+    def test_copy_on_write(self):
+        a, b = [0, 1], [2]
+        view = ports.ConcatenatedPorts([a, b])
+        outer = ports.ConcatenatedPorts([view, b])
+
+        view[2] = 'x'
+        self.assertEqual([0, 1, 'x'], view)
+        self.assertEqual([0, 1, 2, 2], outer)
+        self.assertEqual([2], b)
+
+        # Modified views are kept as a single part
+        self.assertEqual(2, len(ports.ConcatenatedPorts([view, b])._parts))
@@ -0,0 +1,74 @@
+from lcsim.circuits import adders, circuit, registers, sources
+from lcsim.components import base, registers as components
+
+__author__ = 'Jacky'
+
+import unittest
+
+
+def counter_circuit(bits):
+    """
+    Returns a circuit that counts up by one on every clock cycle.
+    """
+    r = registers.register_circuit(bits)
+    a = adders.ripple_adder_no_carry(bits)
+
+    circuit.connect_circuits(r, a, {i: i for i in xrange(0, bits)})
+    circuit.connect_circuits(sources.digital_source_int_circuit(1, bits), a,
+                             {i: i + bits for i in xrange(0, bits)})
+    circuit.connect_circuits(a, r, {i: i for i in xrange(0, bits)})
+
+    return r
+
+
+class TestRegisterCircuit(unittest.TestCase):
+    def test_function(self):
+        r = registers.register_circuit(4, 0x3)
+        self.assertEqual(0x3, r.evaluate(output_format=int))
+
+        circuit.connect_circuits(sources.digital_source_int_circuit(0x9, 4), r,
+                                 {i: i for i in xrange(0, 4)})
+        self.assertEqual(0x3, r.evaluate(output_format=int))
+
+        r.clock()
+        self.assertEqual(0x9, r.evaluate(output_format=int))
+
+        r.reset()
+        self.assertEqual(0x3, r.evaluate(output_format=int))
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, registers.register_circuit, 2, 4)
+
+
+class TestClock(unittest.TestCase):
+    def test_counter(self):
+        c = counter_circuit(4)
+
+        for cycle in xrange(0, 20):
+            self.assertEqual(cycle % 16, c.evaluate(output_format=int))
+            c.clock()
+
+        c.reset()
+        c.clock(5)
+        self.assertEqual(5, c.evaluate(output_format=int))
+
+    def test_registers(self):
+        c = counter_circuit(4)
+        regs = c.registers()
+
+        self.assertEqual(4, len(regs))
+        self.assertEqual(set(c._outputs), set(regs))
+        for register in regs:
+            self.assertIsInstance(register, components.DFlipFlop)
+
+        # Registers behind other registers are found as well
+        shift = registers.register_circuit(4)
+        circuit.connect_circuits(c, shift, {i: i for i in xrange(0, 4)})
+        self.assertEqual(8, len(shift.registers()))
+
+        shift.clock(3)
+        self.assertEqual(2, shift.evaluate(output_format=int))
+
+    def test_missing_input(self):
+        r = registers.register_circuit(2)
+        self.assertRaises(base.MissingInputException, r.clock)
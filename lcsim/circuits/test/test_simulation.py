@@ -0,0 +1,92 @@
+from lcsim.circuits import adders, circuit, simulation, sources
+from lcsim.components import gates
+from lcsim.sha1 import builder
+
+__author__ = 'Jacky'
+
+import unittest
+import itertools
+import random
+
+
+class TestEventSimulator(unittest.TestCase):
+    def test_initial(self):
+        a = adders.ripple_adder_no_carry(4)
+        sim = simulation.EventSimulator(a, 0x35)
+
+        self.assertEqual(0x35, sim.inputs(int))
+        self.assertEqual(a.evaluate(0x35), sim.outputs())
+
+        sim = simulation.EventSimulator(a)
+        self.assertEqual([0, 0, 0, 0], sim.outputs())
+
+    def test_adder(self):
+        a = adders.ripple_adder_no_carry(3)
+        sim = simulation.EventSimulator(a)
+
+        for x in itertools.product([0, 1], repeat=6):
+            sim.set_inputs(list(x))
+            self.assertEqual(a.evaluate(list(x)), sim.outputs())
+
+    def test_toggled(self):
+        gate = gates.ANDGate()
+        inv = gates.NOTGate()
+        inv.add_input(gate, 0)
+
+        c = circuit.Circuit('c', 2, 1)
+        c.add_input_component(gate, {0: 0, 1: 1})
+        c.add_output_component(inv, 0)
+
+        sim = simulation.EventSimulator(c, [0, 0])
+        self.assertEqual(1, inv.output_bit)
+
+        # Output of the AND gate does not change, so propagation stops
+        self.assertEqual([], sim.set_inputs({0: 1}))
+        self.assertEqual([], sim.set_inputs({0: 1}))
+
+        self.assertEqual([gate, inv], sim.set_inputs({1: 1}))
+        self.assertEqual([0], sim.outputs())
+        self.assertEqual(0, inv.output_bit)
+
+        self.assertEqual([gate, inv], sim.set_inputs(0))
+        self.assertEqual([1], sim.outputs())
+
+    def test_constant(self):
+        src = sources.digital_source_int_circuit(3, 2)
+        gate = gates.XORGate()
+
+        c = circuit.Circuit('c', 1, 1)
+        gate.add_input(src._outputs[0], 0)
+        c.add_input_component(gate, {0: 1})
+        c.add_output_component(gate, 0)
+
+        sim = simulation.EventSimulator(c, [1])
+        self.assertEqual([0], sim.outputs())
+        self.assertEqual([gate], sim.set_inputs({0: 0}))
+        self.assertEqual([1], sim.outputs())
+
+    def test_invalid(self):
+        sim = simulation.EventSimulator(adders.ripple_adder_no_carry(2))
+
+        self.assertRaises(ValueError, sim.set_inputs, {4: 1})
+        self.assertRaises(ValueError, sim.set_inputs, {0: 2})
+        self.assertRaises(ValueError, sim.set_inputs, [0, 1])
+
+    def test_sha1(self):
+        c = builder.sha1_circuit(2)
+        message = random.getrandbits(512)
+        sim = simulation.EventSimulator(c, message)
+
+        for k in random.sample(xrange(0, 512), 8):
+            bit = sim.inputs()[k] ^ 1
+            toggled = sim.set_inputs({k: bit})
+            self.assertEqual(c.evaluate(sim.inputs(int), int),
+                             sim.outputs(int))
+
+            flipped = [c._outputs[i] for i, (x, y) in enumerate(zip(
+                c.evaluate(message), sim.outputs())) if x != y]
+            self.assertEqual(set(flipped),
+                             set(toggled).intersection(c._outputs))
+
+            sim.set_inputs({k: bit ^ 1})
+            self.assertEqual(c.evaluate(message, int), sim.outputs(int))
@@ -47,3 +47,15 @@ class TestDigitalSourceInt(unittest.TestCase):
         c = sources.digital_source_int_circuit(0xBEEF, 32)
         self.assertEqual([0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
                           1, 0, 1, 1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1], c.evaluate())
+
+
+class TestDigitalInput(unittest.TestCase):
+    def test_function(self):
+        c = sources.digital_input_circuit(4)
+
+        self.assertEqual('dIn', c.name)
+        self.assertEqual(4, len(c._inputs))
+        self.assertEqual(4, len(c._outputs))
+
+        self.assertEqual([1, 0, 1, 1], c.evaluate([1, 0, 1, 1]))
+        self.assertEqual(0xC, c.evaluate(0xC, int))
@@ -0,0 +1,88 @@
+from lcsim.circuits import adders, circuit, netlist, sources, storage
+from lcsim.components import gates
+from lcsim.sha1 import builder
+
+__author__ = 'Jacky'
+
+import unittest
+import itertools
+import os
+import random
+import shutil
+import tempfile
+
+
+class TestStorage(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'test.lcsn')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        a = adders.ripple_adder_no_carry(3)
+        n = a.compile()
+        storage.save(a, self.path)
+
+        loaded = storage.load(self.path)
+        self.assertEqual(list(n.ops), list(loaded.ops))
+        self.assertEqual(list(n.in0), list(loaded.in0))
+        self.assertEqual(list(n.in1), list(loaded.in1))
+        self.assertEqual(list(n.outputs), list(loaded.outputs))
+        self.assertEqual(n.input_size, loaded.input_size)
+
+        for x in itertools.product([0, 1], repeat=6):
+            self.assertEqual(n.evaluate(list(x)), loaded.evaluate(list(x)))
+
+    def test_constants(self):
+        src = sources.digital_source_circuit([1, 0, 1])
+        storage.save(src.compile(), self.path)
+
+        self.assertEqual([1, 0, 1], storage.load(self.path).evaluate())
+
+    def test_load_circuit(self):
+        gate = gates.NANDGate()
+        c = circuit.Circuit('c', 3, 2)
+        c.add_input_component(gate, {0: 0, 2: 1})
+        c.add_output_component(gate, 0)
+        c.add_output_component(gates.BUFGate(), 1)
+        c.add_input_component(c._outputs[1], {1: 0})
+        storage.save(c, self.path)
+
+        loaded = storage.load_circuit(self.path, 'loaded')
+        self.assertEqual('loaded', loaded.name)
+        for x in itertools.product([0, 1], repeat=3):
+            self.assertEqual(c.evaluate(list(x)), loaded.evaluate(list(x)))
+
+    def test_sha1(self):
+        c = builder.sha1_circuit(rounds=21)
+        storage.save(c, self.path)
+        loaded = storage.load(self.path)
+
+        for _ in xrange(0, 3):
+            x = random.getrandbits(512)
+            self.assertEqual(c.evaluate(x), loaded.evaluate(
+                [int(b) for b in bin(x)[2:].zfill(512)]))
+
+    def test_invalid(self):
+        with open(self.path, 'wb') as f:
+            f.write('not a netlist file')
+        self.assertRaises(ValueError, storage.load, self.path)
+
+        storage.save(adders.ripple_adder_no_carry(2), self.path)
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        with open(self.path, 'wb') as f:
+            f.write(data[:-4])
+        self.assertRaises(ValueError, storage.load, self.path)
+
+
+class TestDecompile(unittest.TestCase):
+    def test_function(self):
+        n = adders.ripple_adder_no_carry(4).compile()
+        c = netlist.decompile(n)
+
+        self.assertEqual(list(n.ops), c.compile().ops)
+        for x in xrange(0, 256):
+            self.assertEqual(((x >> 4) + x) & 0xF, c.evaluate(x, int))
@@ -0,0 +1,71 @@
+from lcsim.circuits import adders, bitwise, circuit, sources
+from lcsim.components import gates
+
+__author__ = 'Jacky'
+
+import unittest
+import itertools
+import random
+
+try:
+    import numpy as np
+    from lcsim.circuits import vectorized
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, 'NumPy is not installed')
+class TestVectorizedNetlist(unittest.TestCase):
+    def test_adder(self):
+        n = adders.ripple_adder_no_carry(4).compile()
+        v = vectorized.VectorizedNetlist(n)
+
+        vectors = [list(x) for x in itertools.product([0, 1], repeat=8)]
+        result = v.evaluate(np.array(vectors))
+
+        self.assertEqual((256, 4), result.shape)
+        self.assertEqual(n.evaluate_batch(vectors), result.tolist())
+
+    def test_all_gates(self):
+        for cls in [gates.NANDGate, gates.NORGate, gates.XNORGate,
+                    gates.ANDGate, gates.ORGate, gates.XORGate]:
+            gate = cls()
+            inv = gates.NOTGate()
+            inv.add_input(gate, 0)
+
+            c = circuit.Circuit('c', 2, 3)
+            c.add_input_component(gate, {0: 0, 1: 1})
+            c.add_output_component(gate, 0)
+            c.add_output_component(inv, 1)
+            c.add_output_component(
+                sources.digital_source_circuit([1])._outputs[0], 2)
+            n = c.compile()
+
+            vectors = [list(x) for x in itertools.product([0, 1], repeat=2)]
+            result = vectorized.VectorizedNetlist(n).evaluate(vectors)
+            self.assertEqual(n.evaluate_batch(vectors), result.tolist())
+
+    def test_large_batch(self):
+        # More than one 64-bit word per wire, not a multiple of 64
+        n = adders.ripple_adder_no_carry(32).compile()
+        vectors = [[random.getrandbits(1) for _ in xrange(0, 64)]
+                   for _ in xrange(0, 150)]
+
+        result = vectorized.VectorizedNetlist(n).evaluate(vectors)
+        self.assertEqual(n.evaluate_batch(vectors), result.tolist())
+
+    def test_constant(self):
+        src = sources.digital_source_int_circuit(0xA5, 8)
+        c = bitwise.bitwise_not_circuit(8)
+        circuit.connect_circuits(src, c, {i: i for i in xrange(0, 8)})
+
+        v = vectorized.VectorizedNetlist(c.compile())
+        self.assertEqual([c.evaluate()] * 3, v.evaluate(batch=3).tolist())
+        self.assertEqual(1, v.depth)
+
+    def test_failures(self):
+        v = vectorized.VectorizedNetlist(
+            adders.ripple_adder_no_carry(2).compile())
+
+        self.assertRaises(ValueError, v.evaluate)
+        self.assertRaises(ValueError, v.evaluate, np.zeros((2, 3)))
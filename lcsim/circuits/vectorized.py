@@ -0,0 +1,140 @@
+import numpy as np
+
+from lcsim.circuits import netlist
+
+__author__ = 'Jacky'
+
+
+class VectorizedNetlist(object):
+    """
+    Batch evaluation engine for compiled netlists backed by NumPy.
+
+    Gates are grouped by topological level and gate type, so every group
+    is evaluated with a single vectorized operation over all input vectors
+    at once. Wire values are bit-packed into rows of uint64 words, 64
+    input vectors per word.
+    """
+
+    def __init__(self, compiled):
+        """
+        Build the level/type groups for a compiled netlist.
+
+        Parameters:
+            compiled:
+                Netlist to evaluate, e.g. the result of Circuit.compile().
+
+        Example usage:
+            >>> from lcsim.circuits import adders
+            >>> v = VectorizedNetlist(adders.ripple_adder_no_carry(2).compile())
+            >>> v.evaluate(np.array([[0, 1, 0, 1], [1, 1, 0, 1]]))
+            array([[1, 0],
+                   [0, 0]], dtype=uint8)
+
+        :type compiled Netlist
+        """
+        ops, in0, in1 = compiled.ops, compiled.in0, compiled.in1
+
+        self.size = len(ops)
+        self.input_size = compiled.input_size
+        self.outputs = np.array(compiled.outputs, dtype=np.intp)
+
+        # Input and constant wires have no gate inputs and are filled in
+        # directly before the level groups are evaluated.
+        self.input_wires = np.array(
+            [i for i, op in enumerate(ops) if op == netlist.INPUT],
+            dtype=np.intp)
+        self.input_spaces = np.array([in0[i] for i in self.input_wires],
+                                     dtype=np.intp)
+        self.ones = np.array(
+            [i for i, op in enumerate(ops) if op == netlist.CONST1],
+            dtype=np.intp)
+
+        levels = [0] * len(ops)
+        groups = {}
+        for i, op in enumerate(ops):
+            if op in (netlist.CONST0, netlist.CONST1, netlist.INPUT):
+                continue
+
+            level = levels[in0[i]]
+            if op not in (netlist.NOT, netlist.BUF):
+                level = max(level, levels[in1[i]])
+            levels[i] = level + 1
+
+            groups.setdefault((level + 1, op), []).append(i)
+
+        # List of (op, wires, first inputs, second inputs) in level order
+        self.groups = []
+        for (level, op) in sorted(groups):
+            wires = groups[(level, op)]
+            self.groups.append((
+                op,
+                np.array(wires, dtype=np.intp),
+                np.array([in0[i] for i in wires], dtype=np.intp),
+                np.array([in1[i] for i in wires], dtype=np.intp)))
+
+        self.depth = max(levels) if levels else 0
+
+    def evaluate(self, inputs=None, batch=None):
+        """
+        Evaluate the netlist for a batch of input vectors.
+
+        Parameters:
+            inputs:
+                Array of shape (batch, input_size) of 0/1 values, one row
+                for each input vector. May be None if the netlist does not
+                read from its input space, in which case 'batch' gives the
+                number of output rows.
+            batch:
+                Number of vectors to evaluate if 'inputs' is None.
+
+        Returns:
+            uint8 array of shape (batch, output_size), one row of output
+            bits for each input vector.
+
+        Raises:
+            ValueError if the input array has the wrong shape.
+        """
+        if inputs is None:
+            if len(self.input_wires):
+                raise ValueError('Netlist requires %d input bits.' %
+                                 self.input_size)
+            batch = 1 if batch is None else batch
+        else:
+            inputs = np.asarray(inputs)
+            if inputs.ndim != 2 or inputs.shape[1] != self.input_size:
+                raise ValueError('Inputs must have shape (batch, %d).' %
+                                 self.input_size)
+            batch = inputs.shape[0]
+
+        words = max(1, (batch + 63) // 64)
+        values = np.zeros((self.size, words), dtype=np.uint64)
+
+        if len(self.input_wires):
+            # Pack input bits along the batch axis, padded to whole words
+            packed = np.zeros((self.input_size, words * 8), dtype=np.uint8)
+            bits = np.packbits(inputs.T.astype(np.bool_), axis=1)
+            packed[:, :bits.shape[1]] = bits
+            values[self.input_wires] = packed.view(np.uint64)[self.input_spaces]
+
+        values[self.ones] = ~np.uint64(0)
+
+        for (op, wires, a, b) in self.groups:
+            if op == netlist.AND:
+                values[wires] = values[a] & values[b]
+            elif op == netlist.XOR:
+                values[wires] = values[a] ^ values[b]
+            elif op == netlist.OR:
+                values[wires] = values[a] | values[b]
+            elif op == netlist.NOT:
+                values[wires] = ~values[a]
+            elif op == netlist.NAND:
+                values[wires] = ~(values[a] & values[b])
+            elif op == netlist.NOR:
+                values[wires] = ~(values[a] | values[b])
+            elif op == netlist.XNOR:
+                values[wires] = ~(values[a] ^ values[b])
+            elif op == netlist.BUF:
+                values[wires] = values[a]
+
+        out = np.ascontiguousarray(values[self.outputs]).view(np.uint8)
+        return np.unpackbits(out, axis=1)[:, :batch].T.copy()
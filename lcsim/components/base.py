@@ -1,3 +1,5 @@
+import copy
+
 __author__ = 'Jacky Tian'
 
 
@@ -24,10 +26,25 @@ class ComponentBase(object):
     circumstances it may be necessary to extend or override add_input(),
     and only in extremely rare circumstances should any other methods need
     to be overridden.
+
+    Components use __slots__ to keep large circuits small in memory. Child
+    classes that do not declare __slots__ themselves simply get an
+    instance dictionary and can store any extra state they need.
+
+    Evaluated output bits are stamped with the global epoch counter at the
+    time they are set. Bumping the epoch with invalidate_all() marks every
+    evaluated output bit stale in constant time, and stale output bits
+    read as None until the component is evaluated again. Rewiring any
+    component bumps the epoch as well.
     """
 
+    __slots__ = ('name', '_input_bits', '_output_bit', '_epoch', 'children')
+
     count = 0
 
+    # Current evaluation epoch, see invalidate_all()
+    epoch = 0
+
     def __init__(self, name, input_bits, *args, **kwargs):
         """
         Initialize a base circuit component with a name and specific number
@@ -42,18 +59,20 @@ class ComponentBase(object):
         :type name str
         :type input_bits int
         """
-        self.name = name
+        self.name = intern(name) if type(name) is str else name
 
         # Each element in the array represents an input bit, and is
         # a reference to a ComponentBase object that connects to
         # the input slot.
         self._input_bits = [None] * input_bits
 
-        # Value of the output - None if unevaluated, otherwise 0 or 1
-        self.output_bit = None
+        # Value of the output - None if unevaluated or stale, otherwise 0 or
+        # 1. See the output_bit property.
+        self._output_bit = None
+        self._epoch = ComponentBase.epoch
 
-        # Graph edges for representing circuits as graphs
-        self.parents = set()
+        # Graph edges for representing circuits as graphs. Parents are
+        # derived from the input bits, see the parents property.
         self.children = set()
 
         ComponentBase.count += 1
@@ -90,9 +109,41 @@ class ComponentBase(object):
             raise ValueError('Input bit index %d is already taken' % input_space)
 
         self._input_bits[input_space] = component
-
-        self.parents.add(component)
         component.children.add(self)
+        ComponentBase.epoch += 1
+
+    @staticmethod
+    def invalidate_all():
+        """
+        Mark the evaluated output bits of all components stale by bumping
+        the global epoch. Takes constant time regardless of the number of
+        components - stale components are only re-evaluated when they are
+        needed again.
+        """
+        ComponentBase.epoch += 1
+
+    @property
+    def output_bit(self):
+        """
+        Evaluated output of this component (0 or 1), or None if it has not
+        been evaluated since the last invalidation.
+        """
+        if self._epoch != ComponentBase.epoch:
+            return None
+
+        return self._output_bit
+
+    @output_bit.setter
+    def output_bit(self, value):
+        self._output_bit = value
+        self._epoch = ComponentBase.epoch
+
+    @property
+    def parents(self):
+        """
+        Set of all components connected to the input bits of this component.
+        """
+        return set(gate for gate in self._input_bits if gate is not None)
 
     def evaluate_inputs(self):
         """
@@ -102,7 +153,8 @@ class ComponentBase(object):
 
         Input values  are evaluated recursively, so the states of all parents
         and (grand)+parents of this component will be altered - namely,
-        their output bits will be evaluated.
+        their output bits will be evaluated. Inputs are only evaluated if
+        their output bits are unevaluated or stale (see invalidate_all).
 
         Returns:
             int list of evaluated input bits in order.
@@ -112,12 +164,14 @@ class ComponentBase(object):
             evaluated to evaluate the result of this component have missing
             input connections.
         """
+        epoch = ComponentBase.epoch
+
         result = [0] * len(self._input_bits)
         for j, gate in enumerate(self._input_bits):
-            if gate.output_bit is None:
+            if gate._epoch != epoch or gate._output_bit is None:
                 gate.evaluate()
 
-            result[j] = gate.output_bit
+            result[j] = gate._output_bit
 
         return result
 
@@ -133,6 +187,22 @@ class ComponentBase(object):
         """
         pass
 
+    def copy(self):
+        """
+        Returns a copy of this component with the same type, name and
+        behavior, but with no input or output connections and no evaluated
+        output.
+
+        :rtype ComponentBase
+        """
+        result = copy.copy(self)
+        result._input_bits = [None] * len(self._input_bits)
+        result.output_bit = None
+        result.children = set()
+
+        ComponentBase.count += 1
+        return result
+
     def disconnect_inputs(self):
         """
         Free all input bits for this component. Calling this method will
@@ -142,8 +212,8 @@ class ComponentBase(object):
         for component in self.parents:
             component.children.remove(self)
 
-        self.parents = set()
         self._input_bits = [None] * len(self._input_bits)
+        ComponentBase.epoch += 1
 
     def disconnect_outputs(self):
         """
@@ -154,6 +224,28 @@ class ComponentBase(object):
         for component in frozenset(self.children):
             component._remove_input(self)
 
+    def move_outputs(self, component):
+        """
+        Rewire every component connected to the output of this component
+        so that it is connected to the output of the given component
+        instead. This component is left with no output connections.
+
+        Parameters:
+            component:
+                Component to move the output connections to.
+
+        :type component ComponentBase
+        """
+        for child in frozenset(self.children):
+            for i, gate in enumerate(child._input_bits):
+                if gate is self:
+                    child._input_bits[i] = component
+
+            component.children.add(child)
+
+        self.children = set()
+        ComponentBase.epoch += 1
+
     def _remove_input(self, component):
         """
         Remove a specific input component from the inputs for this
@@ -161,16 +253,17 @@ class ComponentBase(object):
         should not, except under extraordinary conditions,
         be called by client implementations.
         """
-        if component not in self.parents:
+        if component not in self._input_bits:
             return
 
-        self.parents.remove(component)
         component.children.remove(self)
 
         for i, gate in enumerate(self._input_bits):
             if gate is component:
                 self._input_bits[i] = None
 
+        ComponentBase.epoch += 1
+
     def __hash__(self):
         """
         For hash(circuit_a) == hash(circuit_b), all inputs have to be
@@ -0,0 +1,87 @@
+from lcsim.components import base
+
+__author__ = 'Jacky'
+
+
+class CellInstance(base.ComponentBase):
+    """
+    A single instance of a reusable cell (see lcsim.circuits.hierarchy).
+    The instance has one input bit for every bit of the input space of the
+    cell, but owns no gates of its own - it evaluates the compiled netlist
+    shared by all instances of the cell.
+
+    Since components only have a single output bit, each bit of the output
+    space of the cell is read through a CellOutput port component connected
+    to the instance.
+    """
+
+    __slots__ = ('cell', '_values')
+
+    def __init__(self, cell):
+        """
+        Initialize an instance of a cell.
+
+        Parameters:
+            cell:
+                The cell definition to instantiate.
+
+        :type cell Cell
+        """
+        super(CellInstance, self).__init__(cell.name,
+                                           cell.netlist.input_size)
+
+        self.cell = cell
+        self._values = None
+
+    def evaluate(self):
+        """
+        Evaluate the cell for the current inputs. The results are read
+        through the CellOutput ports of the instance; the output bit of the
+        instance itself only marks it as evaluated.
+
+        Raises:
+            MissingInputException if any input bits are not connected.
+        """
+        for i, bit in enumerate(self._input_bits):
+            if bit is None:
+                raise base.MissingInputException(
+                    '%s cell requires %d input bits. Bit %d is missing.' % (
+                        self.name, len(self._input_bits), i))
+
+        self._values = self.cell.netlist.evaluate(self.evaluate_inputs())
+        self.output_bit = 0
+
+
+class CellOutput(base.ComponentBase):
+    """
+    Output port of a cell instance. Its single input bit is connected to
+    the instance, and it outputs one bit of the output space of the cell.
+    """
+
+    __slots__ = ('index',)
+
+    def __init__(self, instance, index):
+        """
+        Initialize a port for one output bit of a cell instance.
+
+        Parameters:
+            instance:
+                The cell instance to read from.
+            index:
+                Index of the output space of the cell.
+
+        :type instance CellInstance
+        :type index int
+        """
+        super(CellOutput, self).__init__(instance.name, 1)
+
+        self.index = index
+        self.add_input(instance, 0)
+
+    def evaluate(self):
+        if self._input_bits[0] is None:
+            raise base.MissingInputException(
+                'Cell output port is not connected to an instance.')
+
+        self.evaluate_inputs()
+        self.output_bit = self._input_bits[0]._values[self.index]
@@ -9,6 +9,8 @@ class LogicGateBase(base.ComponentBase):
     ComponentBase class.
     """
 
+    __slots__ = ()
+
     def __init__(self, name, input_bits):
         super(LogicGateBase, self).__init__(name, input_bits)
 
@@ -30,6 +32,8 @@ class ANDGate(LogicGateBase):
     Basic AND gate.
     """
 
+    __slots__ = ()
+
     def __init__(self):
         super(ANDGate, self).__init__('AND', 2)
 
@@ -45,6 +49,8 @@ class ORGate(LogicGateBase):
     Basic OR gate.
     """
 
+    __slots__ = ()
+
     def __init__(self):
         super(ORGate, self).__init__('OR', 2)
 
@@ -60,6 +66,8 @@ class XORGate(LogicGateBase):
     Basic XOR gate.
     """
 
+    __slots__ = ()
+
     def __init__(self):
         super(XORGate, self).__init__('XOR', 2)
 
@@ -75,6 +83,8 @@ class NOTGate(LogicGateBase):
     Basic NOT gate.
     """
 
+    __slots__ = ()
+
     def __init__(self):
         super(NOTGate, self).__init__('NOT', 1)
 
@@ -90,6 +100,8 @@ class NANDGate(LogicGateBase):
     Basic NAND gate.
     """
 
+    __slots__ = ()
+
     def __init__(self):
         super(NANDGate, self).__init__('NAND', 2)
 
@@ -105,6 +117,8 @@ class NORGate(LogicGateBase):
     Basic NOR gate.
     """
 
+    __slots__ = ()
+
     def __init__(self):
         super(NORGate, self).__init__('NOR', 2)
 
@@ -120,6 +134,8 @@ class XNORGate(LogicGateBase):
     Basic XNOR gate.
     """
 
+    __slots__ = ()
+
     def __init__(self):
         super(XNORGate, self).__init__('XNOR', 2)
 
@@ -127,4 +143,21 @@ class XNORGate(LogicGateBase):
         super(XNORGate, self).evaluate()
 
         inputs = self.evaluate_inputs()
-        self.output_bit = int(not (inputs[0] ^ inputs[1]))
\ No newline at end of file
+        self.output_bit = int(not (inputs[0] ^ inputs[1]))
+
+
+class BUFGate(LogicGateBase):
+    """
+    Basic buffer gate, outputs its input unchanged.
+    """
+
+    __slots__ = ()
+
+    def __init__(self):
+        super(BUFGate, self).__init__('BUF', 1)
+
+    def evaluate(self):
+        super(BUFGate, self).evaluate()
+
+        inputs = self.evaluate_inputs()
+        self.output_bit = inputs[0]
@@ -0,0 +1,79 @@
+from lcsim.components import base
+
+__author__ = 'Jacky'
+
+
+class DFlipFlop(base.ComponentBase):
+    """
+    Edge-triggered D flip-flop, the basic storage element of sequential
+    circuits. The single input bit is the D input, and the output bit is the
+    stored state Q.
+
+    Evaluating a flip-flop only reads its stored state - it does not
+    evaluate the logic connected to its D input. That cuts feedback loops,
+    so the output of a register may feed back into the logic that computes
+    its own next state. A clock edge happens in two steps over all
+    registers of a circuit: sample() reads every D input, then latch()
+    stores the sampled values. See Circuit.clock().
+    """
+
+    __slots__ = ('initial', 'state', '_sample')
+
+    def __init__(self, initial=0):
+        """
+        Initialize a flip-flop with an initial state.
+
+        Parameters:
+            initial:
+                State of the flip-flop before the first clock edge and
+                after reset().
+
+        Raises:
+            ValueError if the initial state is not a bit.
+
+        :type initial int
+        """
+        if initial != 0 and initial != 1:
+            raise ValueError('Bits can only be 0 or 1. Invalid value %d.' %
+                             initial)
+
+        super(DFlipFlop, self).__init__('DFF', 1)
+
+        self.initial = initial
+        self.state = initial
+        self._sample = None
+
+    def evaluate(self):
+        self.output_bit = self.state
+
+    def sample(self):
+        """
+        Evaluate the D input and keep its value until the next call to
+        latch(). Does not change the state of the flip-flop.
+
+        Raises:
+            MissingInputException if the D input is not connected.
+        """
+        if self._input_bits[0] is None:
+            raise base.MissingInputException(
+                'DFF requires 1 input bit. Bit 0 is missing.')
+
+        self._sample = self.evaluate_inputs()[0]
+
+    def latch(self):
+        """
+        Store the value of the D input read by the last call to sample().
+        """
+        if self._sample is not None:
+            self.state = self._sample
+            self._sample = None
+
+        self.output_bit = self.state
+
+    def reset(self):
+        """
+        Restore the initial state of the flip-flop.
+        """
+        self.state = self.initial
+        self._sample = None
+        self.output_bit = self.state
@@ -8,6 +8,9 @@ class DigitalSourceBase(base.ComponentBase):
     Base class for all digital source components. Digital sources are gates
     that map 0->n bits, always outputting the same permutation of bit values.
     """
+
+    __slots__ = ('__exp_output',)
+
     def __init__(self, name, output):
         """
         Initialize a new digital source component.
@@ -21,6 +24,14 @@ class DigitalSourceBase(base.ComponentBase):
         self.__exp_output = output
         self.output_bit = output
 
+    @property
+    def value(self):
+        """
+        The constant output bit of the source, available without evaluating
+        it.
+        """
+        return self.__exp_output
+
     def evaluate(self):
         self.output_bit = self.__exp_output
 
@@ -29,6 +40,9 @@ class DigitalZero(DigitalSourceBase):
     """
     Digital source component that always outputs 0.
     """
+
+    __slots__ = ()
+
     def __init__(self):
         super(DigitalZero, self).__init__('D0', 0)
 
@@ -37,5 +51,8 @@ class DigitalOne(DigitalSourceBase):
     """
     Digital source component that always outputs 1.
     """
+
+    __slots__ = ()
+
     def __init__(self):
         super(DigitalOne, self).__init__('D1', 1)
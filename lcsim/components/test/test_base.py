@@ -1,3 +1,4 @@
+from lcsim.components import gates, sources
 from lcsim.components.test import mocks
 
 __author__ = 'jacky'
@@ -137,11 +138,108 @@ class TestComponentBase(unittest.TestCase):
         self.assertEqual([None], in_com1._input_bits)
         self.assertEqual([None], in_com2._input_bits)
 
+    def test_move_outputs(self):
+        in_com1 = ComponentBase('', 2)
+        in_com2 = ComponentBase('', 1)
+        out_com = ComponentBase('', 0)
+        other = ComponentBase('', 0)
+
+        self.add_input_alias(in_com1, out_com, 0)
+        self.add_input_alias(in_com1, out_com, 1)
+        self.add_input_alias(in_com2, out_com, 0)
+
+        out_com.move_outputs(other)
+
+        self.assertEqual(0, len(out_com.children))
+        self.assertEqual(set([in_com1, in_com2]), other.children)
+
+        self.assertEqual([other, other], in_com1._input_bits)
+        self.assertEqual([other], in_com2._input_bits)
+        self.assertEqual(set([other]), in_com1.parents)
+        self.assertEqual(set([other]), in_com2.parents)
+
+    def test_copy(self):
+        in_com = mocks.ComponentMockOne('name', 2)
+        out_com = ComponentBase('', 0)
+        self.add_input_alias(in_com, out_com, 1)
+        in_com.evaluate()
+
+        count = ComponentBase.count
+        c = in_com.copy()
+
+        self.assertIsInstance(c, mocks.ComponentMockOne)
+        self.assertEqual('name', c.name)
+        self.assertEqual([None, None], c._input_bits)
+        self.assertIsNone(c.output_bit)
+        self.assertEqual(0, len(c.parents))
+        self.assertEqual(0, len(c.children))
+        self.assertEqual(count + 1, ComponentBase.count)
+
+        # The original is untouched
+        self.assertEqual([None, out_com], in_com._input_bits)
+        self.assertEqual(set([in_com]), out_com.children)
+
+    def test_slots(self):
+        # Built-in components have no instance dictionary, but subclasses
+        # without __slots__ can still store extra state
+        for com in [ComponentBase('', 1), gates.ANDGate(), gates.NOTGate(),
+                    sources.DigitalOne(), sources.DigitalZero()]:
+            self.assertFalse(hasattr(com, '__dict__'))
+
+        mock = mocks.ComponentMockOne('', 0)
+        mock.extra = 1
+        self.assertEqual(1, mock.extra)
+
+    def test_parents(self):
+        in_com = ComponentBase('', 3)
+        out_com = ComponentBase('', 0)
+
+        in_com.add_input(out_com, 0)
+        in_com.add_input(out_com, 2)
+        self.assertEqual(set([out_com]), in_com.parents)
+
+    def test_invalidate_all(self):
+        gate = gates.NOTGate()
+        src = sources.DigitalZero()
+        inv = gates.NOTGate()
+        gate.add_input(src, 0)
+        inv.add_input(gate, 0)
+
+        inv.evaluate()
+        self.assertEqual(1, gate.output_bit)
+        self.assertEqual(0, inv.output_bit)
+
+        # Memoized results are reused until they are invalidated
+        gate.output_bit = 0
+        inv.evaluate()
+        self.assertEqual(1, inv.output_bit)
+
+        ComponentBase.invalidate_all()
+        self.assertIsNone(gate.output_bit)
+        self.assertIsNone(inv.output_bit)
+
+        inv.evaluate()
+        self.assertEqual(1, gate.output_bit)
+        self.assertEqual(0, inv.output_bit)
+
+    def test_rewire_invalidates(self):
+        gate = gates.NOTGate()
+        inv = gates.NOTGate()
+        inv.add_input(gate, 0)
+        gate.add_input(sources.DigitalZero(), 0)
+
+        inv.evaluate()
+        self.assertEqual(0, inv.output_bit)
+
+        gate.disconnect_inputs()
+        gate.add_input(sources.DigitalOne(), 0)
+        inv.evaluate()
+        self.assertEqual(1, inv.output_bit)
+
     def add_input_alias(self, in_com, out_com, index):
         """
         Alters state of components like add_input should without depending on
         the method itself.
         """
         in_com._input_bits[index] = out_com
-        in_com.parents.add(out_com)
         out_com.children.add(in_com)
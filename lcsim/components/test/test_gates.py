@@ -212,3 +212,24 @@ class TestNotGate(unittest.TestCase):
         self.gate.add_input(self.zero, 0)
         self.gate.evaluate()
         self.assertEqual(1, self.gate.output_bit)
+
+
+class TestBufGate(unittest.TestCase):
+    def setUp(self):
+        self.zero = mocks.ComponentMockZero('', 0)
+        self.one = mocks.ComponentMockOne('', 0)
+        self.gate = gates.BUFGate()
+
+    def test_constructor(self):
+        self.assertEqual('BUF', self.gate.name)
+        self.assertEqual(1, len(self.gate._input_bits))
+
+    def test_evaluate_1(self):
+        self.gate.add_input(self.one, 0)
+        self.gate.evaluate()
+        self.assertEqual(1, self.gate.output_bit)
+
+    def test_evaluate_0(self):
+        self.gate.add_input(self.zero, 0)
+        self.gate.evaluate()
+        self.assertEqual(0, self.gate.output_bit)
@@ -0,0 +1,50 @@
+from lcsim.components import base, gates, registers, sources
+
+__author__ = 'Jacky'
+
+import unittest
+
+
+class TestDFlipFlop(unittest.TestCase):
+    def test_constructor(self):
+        ff = registers.DFlipFlop()
+        self.assertEqual('DFF', ff.name)
+        self.assertEqual(1, len(ff._input_bits))
+        self.assertEqual(0, ff.state)
+
+        self.assertEqual(1, registers.DFlipFlop(1).state)
+        self.assertRaises(ValueError, registers.DFlipFlop, 2)
+
+    def test_evaluate(self):
+        # Evaluating only reads the state, even with a missing input
+        ff = registers.DFlipFlop(1)
+        ff.evaluate()
+        self.assertEqual(1, ff.output_bit)
+
+    def test_clock(self):
+        ff = registers.DFlipFlop()
+        inv = gates.NOTGate()
+        inv.add_input(ff, 0)
+        ff.add_input(inv, 0)
+
+        for expected in [1, 0, 1]:
+            ff.sample()
+            self.assertEqual(expected ^ 1, ff.state)
+            ff.latch()
+            self.assertEqual(expected, ff.state)
+            self.assertEqual(expected, ff.output_bit)
+
+            base.ComponentBase.invalidate_all()
+
+        ff.reset()
+        self.assertEqual(0, ff.state)
+        self.assertEqual(0, ff.output_bit)
+
+    def test_missing_input(self):
+        ff = registers.DFlipFlop()
+        self.assertRaises(base.MissingInputException, ff.sample)
+
+        ff.add_input(sources.DigitalOne(), 0)
+        ff.sample()
+        ff.latch()
+        self.assertEqual(1, ff.state)
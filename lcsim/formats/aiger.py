@@ -0,0 +1,270 @@
+from lcsim.circuits import netlist
+from lcsim.components import sources
+from lcsim.formats import common
+
+__author__ = 'Jacky'
+
+# Size of the chunks the binary AND section is read in
+_CHUNK_SIZE = 1 << 16
+
+
+def read_aiger(source, name='aiger'):
+    """
+    Read an And-Inverter Graph in the AIGER format, either binary ('aig')
+    or ASCII ('aag'). The AND section of binary files is decoded while it
+    is streamed from the file in chunks, so it is never held in memory as
+    a whole.
+
+    Every AND becomes a two-input AND gate, and every negated literal a NOT
+    gate, shared between all uses of the same literal. Latches become D
+    flip-flops; latches that are uninitialized start at 0. Symbol tables
+    and comments are ignored.
+
+    Parameters:
+        source:
+            Path of the file, or an open file object.
+        name:
+            Name of the resulting circuit.
+
+    Returns:
+        The circuit that was read.
+
+    Raises:
+        ValueError if the file is malformed or uses sections beyond inputs,
+        latches, outputs and ANDs (bad states, constraints, justice or
+        fairness properties).
+
+    :rtype Circuit
+    """
+    f, close = common.open_file(source, 'rb')
+    try:
+        header = f.readline().split()
+        if len(header) < 6 or header[0] not in ('aig', 'aag'):
+            raise ValueError('Not an AIGER file.')
+
+        try:
+            counts = [int(x) for x in header[1:]]
+        except ValueError:
+            raise ValueError('Malformed AIGER header.')
+
+        if any(counts[5:]):
+            raise ValueError('AIGER properties and constraints are not '
+                             'supported.')
+
+        binary = header[0] == 'aig'
+        _, inputs, latches, outputs, ands = counts[:5]
+        reader = _AigerReader()
+
+        for k in xrange(0, inputs):
+            if binary:
+                reader.add_input(k + 1)
+            else:
+                reader.add_input(_variable(_numbers(f, 1)[0]))
+
+        for k in xrange(0, latches):
+            if binary:
+                line = [2 * (inputs + k + 1)] + _numbers(f, 1, 2)
+            else:
+                line = _numbers(f, 2, 3)
+
+            # The initial value is 0, 1, or the latch literal itself for an
+            # uninitialized latch
+            initial = 1 if len(line) == 3 and line[2] == 1 else 0
+            reader.latch(_variable(line[0]), reader.literal(line[1]),
+                         initial)
+
+        for k in xrange(0, outputs):
+            reader.add_output(reader.literal(_numbers(f, 1)[0]))
+
+        if binary:
+            lhs = 2 * (inputs + latches)
+            deltas = _varints(f)
+            for k in xrange(0, ands):
+                lhs += 2
+                try:
+                    rhs0 = lhs - next(deltas)
+                    rhs1 = rhs0 - next(deltas)
+                except StopIteration:
+                    raise ValueError('AIGER file is truncated.')
+
+                reader.and_gate(lhs, rhs0, rhs1)
+        else:
+            for k in xrange(0, ands):
+                reader.and_gate(*_numbers(f, 3))
+    finally:
+        if close:
+            f.close()
+
+    return reader.circuit(name)
+
+
+def write_aiger(circuit, destination):
+    """
+    Write a circuit in the binary AIGER format. The circuit is compiled
+    first (see netlist.compile_circuit), so it must be combinational.
+
+    Input space k becomes AIGER input k + 1. Gates are decomposed into ANDs
+    and negations: NOT, BUF, AND, NAND and NOR need no extra ANDs beyond
+    one for the gate itself, OR is a negated AND of negated inputs, and XOR
+    and XNOR take three ANDs each.
+
+    Parameters:
+        circuit:
+            The circuit or compiled netlist to write.
+        destination:
+            Path of the file, or an open file object.
+    """
+    compiled = common.compiled_netlist(circuit)
+    ops, in0, in1 = compiled.ops, compiled.in0, compiled.in1
+
+    # Literal of every wire
+    literals = [0] * len(ops)
+    # Binary encoding of the AND section
+    encoded = bytearray()
+    state = [compiled.input_size]
+
+    def conjunction(a, b):
+        state[0] += 1
+        lhs = 2 * state[0]
+        a, b = max(a, b), min(a, b)
+        _encode(lhs - a, encoded)
+        _encode(a - b, encoded)
+        return lhs
+
+    for i in xrange(0, len(ops)):
+        op = ops[i]
+        if op == netlist.CONST0:
+            literals[i] = 0
+            continue
+        if op == netlist.CONST1:
+            literals[i] = 1
+            continue
+        if op == netlist.INPUT:
+            literals[i] = 2 * (in0[i] + 1)
+            continue
+
+        a = literals[in0[i]]
+        b = literals[in1[i]] if in1[i] >= 0 else 0
+
+        if op == netlist.BUF:
+            literals[i] = a
+        elif op == netlist.NOT:
+            literals[i] = a ^ 1
+        elif op == netlist.AND:
+            literals[i] = conjunction(a, b)
+        elif op == netlist.NAND:
+            literals[i] = conjunction(a, b) ^ 1
+        elif op == netlist.OR:
+            literals[i] = conjunction(a ^ 1, b ^ 1) ^ 1
+        elif op == netlist.NOR:
+            literals[i] = conjunction(a ^ 1, b ^ 1)
+        else:
+            both = conjunction(a, b)
+            neither = conjunction(a ^ 1, b ^ 1)
+            result = conjunction(both ^ 1, neither ^ 1)
+            literals[i] = result ^ 1 if op == netlist.XNOR else result
+
+    ands = state[0] - compiled.input_size
+
+    f, close = common.open_file(destination, 'wb')
+    try:
+        f.write('aig %d %d 0 %d %d\n' % (state[0], compiled.input_size,
+                                         len(compiled.outputs), ands))
+        for i in compiled.outputs:
+            f.write('%d\n' % literals[i])
+        f.write(str(encoded))
+    finally:
+        if close:
+            f.close()
+
+
+class _AigerReader(common.NetlistReader):
+    """
+    NetlistReader for AIGER files, where signals are named by their
+    variable index and gates read literals.
+    """
+
+    def __init__(self):
+        super(_AigerReader, self).__init__()
+
+        # Digital sources for the constant literals 0 and 1
+        self._sources = [None, None]
+        # Variable -> NOT gate reading it
+        self._negated = {}
+
+    def literal(self, literal):
+        """
+        Returns the signal name or component for a literal.
+        """
+        if literal < 2:
+            if self._sources[literal] is None:
+                self._sources[literal] = (sources.DigitalOne() if literal
+                                          else sources.DigitalZero())
+            return self._sources[literal]
+
+        variable = _variable(literal)
+        if not literal & 1:
+            return variable
+
+        if variable not in self._negated:
+            self._negated[variable] = self.gate(netlist.NOT, [variable])
+        return self._negated[variable]
+
+    def and_gate(self, lhs, rhs0, rhs1):
+        """
+        Define the variable of an AND literal.
+        """
+        if lhs & 1:
+            raise ValueError('AND output literal %d is negated.' % lhs)
+
+        self.define(_variable(lhs), self.gate(
+            netlist.AND, [self.literal(rhs0), self.literal(rhs1)]))
+
+
+def _variable(literal):
+    return literal >> 1
+
+
+def _numbers(f, least, most=None):
+    """
+    Read a line of unsigned integers.
+    """
+    line = f.readline().split()
+    if not least <= len(line) <= (most or least):
+        raise ValueError('Malformed AIGER line %r.' % ' '.join(line))
+
+    try:
+        return [int(x) for x in line]
+    except ValueError:
+        raise ValueError('Malformed AIGER line %r.' % ' '.join(line))
+
+
+def _varints(f):
+    """
+    Decode the variable-length unsigned integers of the binary AND section,
+    reading the file in chunks. Each integer is stored 7 bits per byte,
+    least significant first, with the high bit set on all but the last
+    byte.
+    """
+    value = 0
+    shift = 0
+    for chunk in iter(lambda: f.read(_CHUNK_SIZE), ''):
+        for byte in bytearray(chunk):
+            value |= (byte & 0x7F) << shift
+            if byte & 0x80:
+                shift += 7
+                continue
+
+            yield value
+            value = 0
+            shift = 0
+
+
+def _encode(value, encoded):
+    """
+    Append the variable-length encoding of an unsigned integer.
+    """
+    while value >= 0x80:
+        encoded.append((value & 0x7F) | 0x80)
+        value >>= 7
+    encoded.append(value)
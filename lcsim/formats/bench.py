@@ -0,0 +1,158 @@
+import re
+
+from lcsim.circuits import netlist
+from lcsim.formats import common
+
+__author__ = 'Jacky'
+
+# Gate type names in .bench files -> netlist gate type code
+_CODES = {
+    'AND': netlist.AND,
+    'OR': netlist.OR,
+    'XOR': netlist.XOR,
+    'NOT': netlist.NOT,
+    'NAND': netlist.NAND,
+    'NOR': netlist.NOR,
+    'XNOR': netlist.XNOR,
+    'BUF': netlist.BUF,
+    'BUFF': netlist.BUF,
+    'GND': netlist.CONST0,
+    'VDD': netlist.CONST1,
+}
+
+# Netlist gate type code -> gate type name written to .bench files
+_NAMES = {
+    netlist.AND: 'AND',
+    netlist.OR: 'OR',
+    netlist.XOR: 'XOR',
+    netlist.NOT: 'NOT',
+    netlist.NAND: 'NAND',
+    netlist.NOR: 'NOR',
+    netlist.XNOR: 'XNOR',
+    netlist.BUF: 'BUFF',
+}
+
+# Signal names that stand for constants when used as gate inputs
+_CONSTANTS = {
+    'vdd': netlist.CONST1,
+    'gnd': netlist.CONST0,
+}
+
+_PORT = re.compile(r'^(INPUT|OUTPUT)\s*\(\s*([^\s()]+)\s*\)$', re.I)
+_GATE = re.compile(r'^([^\s=]+)\s*=\s*(\w+)\s*(?:\((.*)\))?$')
+
+
+def read_bench(source, name='bench'):
+    """
+    Read a circuit in the ISCAS .bench format. The file is read line by
+    line, and signals may be used before they are defined. Inputs and
+    outputs become the input and output space of the circuit in the order
+    they are declared, DFF gates become D flip-flops with initial state 0,
+    and 'vdd' and 'gnd' are constants, both as gates (x = vdd) and as gate
+    inputs (x = AND(a, gnd)).
+
+    Parameters:
+        source:
+            Path of the file, or an open file object.
+        name:
+            Name of the resulting circuit.
+
+    Returns:
+        The circuit that was read.
+
+    Raises:
+        ValueError if the file is malformed, uses unsupported gates or
+        leaves signals undefined.
+
+    Example usage:
+        >>> c = read_bench('c17.bench')
+        >>> len(c._inputs), len(c._outputs)
+        (5, 2)
+
+    :rtype Circuit
+    """
+    f, close = common.open_file(source, 'r')
+    reader = common.NetlistReader(_CONSTANTS)
+
+    try:
+        for number, line in enumerate(f, 1):
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+
+            match = _PORT.match(line)
+            if match:
+                if match.group(1).upper() == 'INPUT':
+                    reader.add_input(match.group(2))
+                else:
+                    reader.add_output(match.group(2))
+                continue
+
+            match = _GATE.match(line)
+            if not match:
+                raise ValueError('Line %d: cannot parse %r.' % (number, line))
+
+            signal, kind, args = match.groups()
+            kind = kind.upper()
+            items = [x.strip() for x in args.split(',')] if args else []
+            if '' in items:
+                raise ValueError('Line %d: empty gate input.' % number)
+
+            if kind == 'DFF':
+                if len(items) != 1:
+                    raise ValueError('Line %d: DFF requires 1 input.' %
+                                     number)
+                reader.latch(signal, items[0])
+            elif kind in _CODES:
+                reader.define(signal, reader.gate(_CODES[kind], items))
+            else:
+                raise ValueError('Line %d: unsupported gate %s.' %
+                                 (number, kind))
+    finally:
+        if close:
+            f.close()
+
+    return reader.circuit(name)
+
+
+def write_bench(circuit, destination):
+    """
+    Write a circuit in the ISCAS .bench format. The circuit is compiled
+    first (see netlist.compile_circuit), so it must be combinational. Input
+    space k is named I<k>, and every other signal n<wire index>.
+
+    Parameters:
+        circuit:
+            The circuit or compiled netlist to write.
+        destination:
+            Path of the file, or an open file object.
+    """
+    compiled = common.compiled_netlist(circuit)
+    names = common.wire_names(compiled)
+    ops, in0, in1 = compiled.ops, compiled.in0, compiled.in1
+
+    f, close = common.open_file(destination, 'w')
+    try:
+        for k in xrange(0, compiled.input_size):
+            f.write('INPUT(I%d)\n' % k)
+        for i in compiled.outputs:
+            f.write('OUTPUT(%s)\n' % names[i])
+
+        for i in xrange(0, len(ops)):
+            op = ops[i]
+            if op == netlist.INPUT:
+                continue
+
+            if op == netlist.CONST0:
+                f.write('%s = gnd\n' % names[i])
+            elif op == netlist.CONST1:
+                f.write('%s = vdd\n' % names[i])
+            elif in1[i] < 0:
+                f.write('%s = %s(%s)\n' % (names[i], _NAMES[op],
+                                           names[in0[i]]))
+            else:
+                f.write('%s = %s(%s, %s)\n' % (names[i], _NAMES[op],
+                                               names[in0[i]], names[in1[i]]))
+    finally:
+        if close:
+            f.close()
@@ -0,0 +1,294 @@
+from lcsim.circuits import netlist
+from lcsim.formats import common
+
+__author__ = 'Jacky'
+
+# Truth table [f(0), f(1)] or [f(0, 0), f(0, 1), f(1, 0), f(1, 1)] of a
+# single-output cover -> netlist gate type code
+_TABLES = {
+    (0, 1): netlist.BUF,
+    (1, 0): netlist.NOT,
+    (0, 0, 0, 1): netlist.AND,
+    (0, 1, 1, 1): netlist.OR,
+    (0, 1, 1, 0): netlist.XOR,
+    (1, 1, 1, 0): netlist.NAND,
+    (1, 0, 0, 0): netlist.NOR,
+    (1, 0, 0, 1): netlist.XNOR,
+}
+
+# Netlist gate type code -> cover rows written to BLIF files
+_COVERS = {
+    netlist.CONST0: [],
+    netlist.CONST1: ['1'],
+    netlist.BUF: ['1 1'],
+    netlist.NOT: ['0 1'],
+    netlist.AND: ['11 1'],
+    netlist.OR: ['1- 1', '-1 1'],
+    netlist.XOR: ['10 1', '01 1'],
+    netlist.NAND: ['0- 1', '-0 1'],
+    netlist.NOR: ['00 1'],
+    netlist.XNOR: ['11 1', '00 1'],
+}
+
+# Number of signal names per line in .inputs and .outputs
+_NAMES_PER_LINE = 16
+
+
+def read_blif(source, name=None):
+    """
+    Read a circuit in the Berkeley Logic Interchange Format. The file is
+    read line by line, and signals may be used before they are defined.
+
+    Only the first model of the file is read. Each .names cover is mapped
+    to a single basic gate if it has at most two inputs and computes one
+    of the basic gate functions, and decomposed into a sum of products of
+    two-input AND and OR gates otherwise. Latches become D flip-flops;
+    unknown initial values start at 0.
+
+    Parameters:
+        source:
+            Path of the file, or an open file object.
+        name:
+            Name of the resulting circuit, defaults to the model name.
+
+    Returns:
+        The circuit that was read.
+
+    Raises:
+        ValueError if the file is malformed, uses unsupported constructs
+        (e.g. .subckt) or leaves signals undefined.
+
+    :rtype Circuit
+    """
+    f, close = common.open_file(source, 'r')
+    reader = common.NetlistReader()
+    model = 'blif'
+
+    # Signals and cover rows of the .names block being read
+    cover = None
+
+    try:
+        for number, tokens in _statements(f):
+            if not tokens[0].startswith('.'):
+                if cover is None:
+                    raise ValueError('Line %d: cover row outside of .names.'
+                                     % number)
+                cover[1].append(tokens)
+                continue
+
+            if cover is not None:
+                _define_cover(reader, cover[0], cover[1], cover[2])
+                cover = None
+
+            keyword = tokens[0]
+            if keyword == '.model':
+                model = tokens[1] if len(tokens) > 1 else model
+            elif keyword == '.inputs':
+                for signal in tokens[1:]:
+                    reader.add_input(signal)
+            elif keyword == '.outputs':
+                for signal in tokens[1:]:
+                    reader.add_output(signal)
+            elif keyword == '.names':
+                if len(tokens) < 2:
+                    raise ValueError('Line %d: .names without output.' %
+                                     number)
+                cover = (tokens[1:], [], number)
+            elif keyword == '.latch':
+                if len(tokens) < 3:
+                    raise ValueError('Line %d: .latch requires an input '
+                                     'and an output.' % number)
+                initial = tokens[-1] if len(tokens) in (4, 6) else '0'
+                reader.latch(tokens[2], tokens[1], 1 if initial == '1' else 0)
+            elif keyword == '.end':
+                break
+            elif keyword in ('.clock', '.default_input_arrival',
+                             '.default_output_required', '.wire_load_slope'):
+                continue
+            else:
+                raise ValueError('Line %d: unsupported construct %s.' %
+                                 (number, keyword))
+
+        if cover is not None:
+            _define_cover(reader, cover[0], cover[1], cover[2])
+    finally:
+        if close:
+            f.close()
+
+    return reader.circuit(model if name is None else name)
+
+
+def write_blif(circuit, destination, name=None):
+    """
+    Write a circuit in the Berkeley Logic Interchange Format. The circuit
+    is compiled first (see netlist.compile_circuit), so it must be
+    combinational. Input space k is named I<k>, and every other signal
+    n<wire index>. Every gate is written as a .names cover.
+
+    Parameters:
+        circuit:
+            The circuit or compiled netlist to write.
+        destination:
+            Path of the file, or an open file object.
+        name:
+            Model name, defaults to the name of the circuit.
+    """
+    compiled = common.compiled_netlist(circuit)
+    if name is None:
+        name = getattr(circuit, 'name', 'netlist')
+
+    names = common.wire_names(compiled)
+    ops, in0, in1 = compiled.ops, compiled.in0, compiled.in1
+
+    f, close = common.open_file(destination, 'w')
+    try:
+        f.write('.model %s\n' % name)
+        _write_names(f, '.inputs',
+                     ['I%d' % k for k in xrange(0, compiled.input_size)])
+        _write_names(f, '.outputs', [names[i] for i in compiled.outputs])
+
+        for i in xrange(0, len(ops)):
+            op = ops[i]
+            if op == netlist.INPUT:
+                continue
+
+            signals = [names[j] for j in (in0[i], in1[i]) if j >= 0]
+            signals.append(names[i])
+            f.write('.names %s\n' % ' '.join(signals))
+            for row in _COVERS[op]:
+                f.write(row + '\n')
+
+        f.write('.end\n')
+    finally:
+        if close:
+            f.close()
+
+
+def _statements(f):
+    """
+    Yield (line number, tokens) for every statement of a BLIF file, with
+    comments removed and continued lines joined.
+    """
+    tokens = []
+    start = None
+
+    for number, line in enumerate(f, 1):
+        line = line.split('#', 1)[0].rstrip()
+        continued = line.endswith('\\')
+        if continued:
+            line = line[:-1]
+
+        if start is None:
+            start = number
+        tokens.extend(line.split())
+
+        if continued:
+            continue
+
+        if tokens:
+            yield start, tokens
+        tokens = []
+        start = None
+
+    if tokens:
+        yield start, tokens
+
+
+def _write_names(f, keyword, names):
+    """
+    Write a list of signal names, split over continued lines.
+    """
+    lines = [' '.join(names[i:i + _NAMES_PER_LINE])
+             for i in xrange(0, len(names), _NAMES_PER_LINE)]
+    f.write('%s %s\n' % (keyword, ' \\\n'.join(lines)))
+
+
+def _define_cover(reader, signals, rows, number):
+    """
+    Define the output signal of a .names block from its cover.
+    """
+    inputs, output = signals[:-1], signals[-1]
+
+    cubes = []
+    phase = None
+    for row in rows:
+        if len(inputs) == 0 and len(row) == 1:
+            cube, value = '', row[0]
+        elif len(row) == 2 and len(row[0]) == len(inputs):
+            cube, value = row
+        else:
+            raise ValueError('Line %d: malformed cover row %r.' %
+                             (number, ' '.join(row)))
+
+        if value not in ('0', '1') or (phase is not None and value != phase):
+            raise ValueError('Line %d: invalid cover output %r.' %
+                             (number, value))
+        if any(x not in '01-' for x in cube):
+            raise ValueError('Line %d: invalid cover row %r.' % (number, cube))
+
+        phase = value
+        cubes.append(cube)
+
+    # An empty cover is constant 0
+    if phase is None:
+        phase, cubes = '1', []
+
+    if len(inputs) <= 2:
+        table = tuple(int(_covered(cubes, x) == (phase == '1'))
+                      for x in _assignments(len(inputs)))
+
+        if all(table) or not any(table):
+            code = netlist.CONST1 if table[0] else netlist.CONST0
+            reader.define(output, reader.gate(code, []))
+            return
+
+        if table in _TABLES:
+            reader.define(output, reader.gate(_TABLES[table], inputs))
+            return
+
+    # Sum of products: OR of ANDs of literals, complemented for an
+    # off-set cover
+    negated = {}
+    products = []
+    for cube in cubes:
+        literals = []
+        for signal, x in zip(inputs, cube):
+            if x == '1':
+                literals.append(signal)
+            elif x == '0':
+                if signal not in negated:
+                    negated[signal] = reader.gate(netlist.NOT, [signal])
+                literals.append(negated[signal])
+
+        if not literals:
+            # A cube without literals covers everything
+            code = netlist.CONST1 if phase == '1' else netlist.CONST0
+            reader.define(output, reader.gate(code, []))
+            return
+
+        products.append(reader.gate(netlist.AND, literals)
+                        if len(literals) > 1 else literals[0])
+
+    if not products:
+        code = netlist.CONST0 if phase == '1' else netlist.CONST1
+        reader.define(output, reader.gate(code, []))
+        return
+
+    code = netlist.OR if phase == '1' else netlist.NOR
+    reader.define(output, reader.gate(code, products))
+
+
+def _assignments(size):
+    """
+    Returns all input assignments of the given size as strings of 0 and 1,
+    in counting order.
+    """
+    return [bin(x)[2:].zfill(size) if size else '' for x in xrange(0, 1 << size)]
+
+
+def _covered(cubes, assignment):
+    """
+    Returns True if any cube covers the input assignment.
+    """
+    return any(all(c == '-' or c == x for c, x in zip(cube, assignment))
+               for cube in cubes)
@@ -0,0 +1,227 @@
+from lcsim.circuits import circuit as circuits, netlist
+from lcsim.components import base, gates, registers, sources
+
+__author__ = 'Jacky'
+
+
+class NetlistReader(object):
+    """
+    Builds a circuit of basic gates from a stream of signal definitions, as
+    read from a netlist file. Signals are identified by arbitrary names
+    (strings or ints) and may be used before they are defined - such
+    connections are kept pending until the signal is defined, so files can
+    be read in a single pass with memory bounded by the size of the
+    netlist.
+
+    Gates with more than two inputs are decomposed into balanced trees of
+    two-input gates.
+    """
+
+    def __init__(self, constants=None):
+        """
+        Parameters:
+            constants:
+                Optional dictionary of signal names that stand for a
+                constant, to the netlist gate type code (CONST0 or CONST1).
+                Each is defined as a digital source the first time it is
+                used as a gate input, unless the netlist defines it first.
+
+        :type constants dict
+        """
+        self._constants = constants or {}
+        # Signal name -> component, or input space index for primary inputs
+        self._signals = {}
+        # Signal name -> list of (component, input bit) waiting for it
+        self._pending = {}
+        # Input space -> list of (component, input bit)
+        self._inputs = []
+        # Signal names or components for each output space
+        self._outputs = []
+
+    def add_input(self, name):
+        """
+        Add a primary input signal as the next bit of the input space.
+        """
+        self._inputs.append([])
+        self.define(name, len(self._inputs) - 1)
+
+    def add_output(self, item):
+        """
+        Add a signal name or component as the next bit of the output space.
+        """
+        self._outputs.append(item)
+
+    def define(self, name, value):
+        """
+        Define a signal as the output of a component and connect everything
+        that is waiting for it.
+
+        Raises:
+            ValueError if the signal is already defined.
+        """
+        if name in self._signals:
+            raise ValueError('Signal %s is defined more than once.' % name)
+
+        self._signals[name] = value
+        for (component, j) in self._pending.pop(name, ()):
+            self._wire(component, j, value)
+
+    def connect(self, component, j, item):
+        """
+        Connect an input bit of a component to a signal name or another
+        component.
+        """
+        if isinstance(item, base.ComponentBase):
+            component.add_input(item, j)
+            return
+
+        value = self._signals.get(item)
+        if value is None and item in self._constants:
+            value = self.gate(self._constants[item], ())
+            self.define(item, value)
+
+        if value is None:
+            self._pending.setdefault(item, []).append((component, j))
+        else:
+            self._wire(component, j, value)
+
+    def gate(self, code, items):
+        """
+        Returns a component computing a basic gate function of signal names
+        or components. AND, OR, XOR, NAND, NOR and XNOR accept any number of
+        inputs, NOT and BUF exactly one and constants none.
+
+        :type code int
+        :rtype ComponentBase
+        """
+        if code == netlist.CONST0:
+            return sources.DigitalZero()
+        if code == netlist.CONST1:
+            return sources.DigitalOne()
+
+        if not items:
+            raise ValueError('Gate requires at least one input.')
+
+        if code in (netlist.NOT, netlist.BUF) or len(items) == 1:
+            if code in (netlist.NOT, netlist.NAND, netlist.NOR,
+                        netlist.XNOR):
+                cls = gates.NOTGate
+            else:
+                cls = gates.BUFGate
+
+            if len(items) != 1:
+                raise ValueError('%s gate requires 1 input.' % cls.__name__)
+
+            result = cls()
+            self.connect(result, 0, items[0])
+            return result
+
+        base_code = _BASE.get(code, code)
+
+        items = list(items)
+        while len(items) > 2:
+            level = []
+            for i in xrange(0, len(items) - 1, 2):
+                level.append(self._gate2(base_code, items[i], items[i + 1]))
+            if len(items) % 2:
+                level.append(items[-1])
+
+            items = level
+
+        return self._gate2(code, items[0], items[1])
+
+    def latch(self, name, item, initial=0):
+        """
+        Define a signal as the output of a D flip-flop whose input is a
+        signal name or component.
+        """
+        ff = registers.DFlipFlop(initial)
+        self.connect(ff, 0, item)
+        self.define(name, ff)
+
+    def circuit(self, name):
+        """
+        Returns the circuit that was read. Output spaces that read a primary
+        input directly get a buffer gate.
+
+        Raises:
+            ValueError if any used signal was never defined.
+
+        :rtype Circuit
+        """
+        if self._pending:
+            raise ValueError('Signal %s is used but never defined.' %
+                             sorted(self._pending)[0])
+
+        result = circuits.Circuit(name, len(self._inputs), len(self._outputs))
+        result._inputs = self._inputs
+
+        for i, item in enumerate(self._outputs):
+            if not isinstance(item, base.ComponentBase):
+                if item not in self._signals:
+                    raise ValueError('Output signal %s is never defined.' %
+                                     item)
+                item = self._signals[item]
+
+            if not isinstance(item, base.ComponentBase):
+                buf = gates.BUFGate()
+                self._inputs[item].append((buf, 0))
+                item = buf
+
+            result.add_output_component(item, i)
+
+        return result
+
+    def _gate2(self, code, a, b):
+        result = netlist.gate_class(code)()
+        self.connect(result, 0, a)
+        self.connect(result, 1, b)
+        return result
+
+    def _wire(self, component, j, value):
+        if isinstance(value, base.ComponentBase):
+            component.add_input(value, j)
+        else:
+            self._inputs[value].append((component, j))
+
+
+# Gate code -> code of the gates in the inner levels of a gate tree
+_BASE = {
+    netlist.NAND: netlist.AND,
+    netlist.NOR: netlist.OR,
+    netlist.XNOR: netlist.XOR,
+}
+
+
+def open_file(source, mode):
+    """
+    Returns (file, close) for a path or an already open file object, where
+    close tells whether the caller opened the file and has to close it.
+    """
+    if isinstance(source, basestring):
+        return open(source, mode), True
+
+    return source, False
+
+
+def wire_names(compiled):
+    """
+    Returns the signal name of every wire of a netlist for writers: input
+    wires are named I<input space> and all other wires n<wire index>.
+
+    :type compiled Netlist
+    :rtype list[str]
+    """
+    return ['I%d' % compiled.in0[i] if compiled.ops[i] == netlist.INPUT
+            else 'n%d' % i for i in xrange(0, len(compiled.ops))]
+
+
+def compiled_netlist(circuit):
+    """
+    Returns the netlist of a circuit, or the argument itself if it already
+    is a netlist.
+    """
+    if isinstance(circuit, netlist.Netlist):
+        return circuit
+
+    return circuit.compile()
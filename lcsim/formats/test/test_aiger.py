@@ -0,0 +1,68 @@
+from lcsim.circuits import adders, bitwise, circuit, sources
+from lcsim.formats import aiger
+from lcsim.sha1 import builder
+
+__author__ = 'Jacky'
+
+import unittest
+import itertools
+import random
+import StringIO
+
+
+class TestAiger(unittest.TestCase):
+    def test_read_ascii(self):
+        # Half adder with a negated output and a constant output
+        text = 'aag 5 2 0 4 3\n2\n4\n6\n10\n0\n11\n6 4 2\n8 5 3\n10 9 7\n'
+        c = aiger.read_aiger(StringIO.StringIO(text))
+
+        for a, b in itertools.product([0, 1], repeat=2):
+            self.assertEqual([a & b, a ^ b, 0, 1 - (a ^ b)],
+                             c.evaluate([a, b]))
+
+    def test_read_binary(self):
+        # Same half adder, binary encoded
+        text = 'aig 5 2 0 2 3\n6\n10\n' + '\x02\x02\x03\x02\x01\x02'
+        c = aiger.read_aiger(StringIO.StringIO(text))
+
+        for a, b in itertools.product([0, 1], repeat=2):
+            self.assertEqual([a & b, a ^ b], c.evaluate([a, b]))
+
+    def test_latch(self):
+        # Toggle flip-flop, read through an AND with the input
+        text = 'aag 3 1 1 1 1\n2\n4 5\n6\n6 4 2\n'
+        c = aiger.read_aiger(StringIO.StringIO(text))
+        circuit.connect_circuits(sources.digital_source_circuit([1]), c,
+                                 {0: 0})
+
+        self.assertEqual([0], c.evaluate())
+        c.clock()
+        self.assertEqual([1], c.evaluate())
+        c.clock()
+        self.assertEqual([0], c.evaluate())
+
+    def test_round_trip(self):
+        for a in [adders.ripple_adder_no_carry(3),
+                  bitwise.bitwise_mux_circuit(2)]:
+            f = StringIO.StringIO()
+            aiger.write_aiger(a, f)
+            c = aiger.read_aiger(StringIO.StringIO(f.getvalue()))
+
+            size = len(a._inputs)
+            for x in xrange(0, 1 << size):
+                self.assertEqual(a.evaluate(x), c.evaluate(x))
+
+    def test_sha1(self):
+        a = builder.sha1_circuit(rounds=2)
+        f = StringIO.StringIO()
+        aiger.write_aiger(a, f)
+        c = aiger.read_aiger(StringIO.StringIO(f.getvalue()))
+
+        x = random.getrandbits(512)
+        self.assertEqual(a.evaluate(x), c.evaluate(x))
+
+    def test_invalid(self):
+        for text in ['aig 1 1 0 1\n', 'xyz 1 1 0 1 0\n2\n',
+                     'aig 3 1 0 1 1\n2\n', 'aag 1 1 0 1 0 1\n2\n2\n']:
+            self.assertRaises(ValueError, aiger.read_aiger,
+                              StringIO.StringIO(text))
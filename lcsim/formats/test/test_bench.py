@@ -0,0 +1,98 @@
+from lcsim.circuits import adders, circuit, sources
+from lcsim.formats import bench
+
+__author__ = 'Jacky'
+
+import unittest
+import itertools
+import StringIO
+
+_C17 = """# c17
+INPUT(1)
+INPUT(2)
+INPUT(3)
+INPUT(6)
+INPUT(7)
+OUTPUT(22)
+OUTPUT(23)
+
+10 = NAND(1, 3)
+11 = NAND(3, 6)
+16 = NAND(2, 11)
+19 = NAND(11, 7)
+22 = NAND(10, 16)
+23 = NAND(16, 19)
+"""
+
+
+def _c17(a, b, c, d, e):
+    n10 = 1 - (a & c)
+    n11 = 1 - (c & d)
+    n16 = 1 - (b & n11)
+    n19 = 1 - (n11 & e)
+    return [1 - (n10 & n16), 1 - (n16 & n19)]
+
+
+class TestBench(unittest.TestCase):
+    def test_read(self):
+        c = bench.read_bench(StringIO.StringIO(_C17), 'c17')
+        self.assertEqual('c17', c.name)
+
+        for x in itertools.product([0, 1], repeat=5):
+            self.assertEqual(_c17(*x), c.evaluate(list(x)))
+
+    def test_forward_references(self):
+        lines = _C17.splitlines()
+        text = '\n'.join(lines[:8] + list(reversed(lines[8:])))
+        c = bench.read_bench(StringIO.StringIO(text))
+
+        for x in itertools.product([0, 1], repeat=5):
+            self.assertEqual(_c17(*x), c.evaluate(list(x)))
+
+    def test_wide_gates(self):
+        text = ('INPUT(a)\nINPUT(b)\nINPUT(c)\nINPUT(d)\nINPUT(e)\n'
+                'OUTPUT(x)\nOUTPUT(y)\nOUTPUT(z)\nOUTPUT(a)\nOUTPUT(one)\n'
+                'x = NAND(a, b, c, d, e)\ny = XOR(a, b, c)\nz = NOR(d)\n'
+                'one = vdd\n')
+        c = bench.read_bench(StringIO.StringIO(text))
+
+        for x in itertools.product([0, 1], repeat=5):
+            self.assertEqual([1 - min(x), x[0] ^ x[1] ^ x[2], 1 - x[3],
+                              x[0], 1], c.evaluate(list(x)))
+
+    def test_constant_inputs(self):
+        text = ('INPUT(a)\nOUTPUT(x)\nOUTPUT(y)\nOUTPUT(z)\n'
+                'x = AND(a, vdd)\ny = OR(a, gnd)\nz = NAND(vdd, vdd)\n')
+        c = bench.read_bench(StringIO.StringIO(text))
+
+        for x in (0, 1):
+            self.assertEqual([x, x, 0], c.evaluate([x]))
+
+    def test_dff(self):
+        text = 'INPUT(d)\nOUTPUT(q)\nq = DFF(x)\nx = XOR(d, q)\n'
+        c = bench.read_bench(StringIO.StringIO(text))
+        circuit.connect_circuits(sources.digital_source_circuit([1]), c,
+                                 {0: 0})
+
+        self.assertEqual([0], c.evaluate())
+        c.clock()
+        self.assertEqual([1], c.evaluate())
+        c.clock()
+        self.assertEqual([0], c.evaluate())
+
+    def test_round_trip(self):
+        a = adders.ripple_adder_no_carry(3)
+        f = StringIO.StringIO()
+        bench.write_bench(a, f)
+        c = bench.read_bench(StringIO.StringIO(f.getvalue()))
+
+        for x in xrange(0, 64):
+            self.assertEqual(a.evaluate(x), c.evaluate(x))
+
+    def test_invalid(self):
+        for text in ['INPUT(a)\nOUTPUT(b)\n',
+                     'INPUT(a)\nOUTPUT(b)\nb = MUX(a, a)\n',
+                     'INPUT(a)\nOUTPUT(b)\nb = NOT(a\n',
+                     'INPUT(a)\nOUTPUT(b)\nb = NOT(a)\nb = NOT(a)\n']:
+            self.assertRaises(ValueError, bench.read_bench,
+                              StringIO.StringIO(text))
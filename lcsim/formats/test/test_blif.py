@@ -0,0 +1,83 @@
+from lcsim.circuits import adders, circuit, sources
+from lcsim.formats import blif
+
+__author__ = 'Jacky'
+
+import unittest
+import itertools
+import StringIO
+
+_MODEL = """# majority and friends
+.model test
+.inputs a b \\
+    c
+.outputs maj nab par zero one na
+.names nab c a maj
+11- 1
+1-1 1
+-11 1
+.names a b nab
+11 0
+.names a b c par
+100 1
+010 1
+001 1
+111 1
+.names zero
+.names one
+1
+.names a na
+0 1
+.end
+"""
+
+
+class TestBlif(unittest.TestCase):
+    def test_read(self):
+        c = blif.read_blif(StringIO.StringIO(_MODEL))
+        self.assertEqual('test', c.name)
+
+        for a, b, x in itertools.product([0, 1], repeat=3):
+            nab = 1 - (a & b)
+            self.assertEqual([int(nab + x + a >= 2), nab, a ^ b ^ x, 0, 1,
+                              1 - a], c.evaluate([a, b, x]))
+
+    def test_latch(self):
+        text = ('.model counter\n.inputs en\n.outputs q\n'
+                '.latch d q re clk 1\n.names en q d\n10 1\n01 1\n.end\n')
+        c = blif.read_blif(StringIO.StringIO(text), 'c')
+        self.assertEqual('c', c.name)
+        circuit.connect_circuits(sources.digital_source_circuit([1]), c,
+                                 {0: 0})
+
+        self.assertEqual([1], c.evaluate())
+        c.clock()
+        self.assertEqual([0], c.evaluate())
+        c.clock()
+        self.assertEqual([1], c.evaluate())
+
+    def test_round_trip(self):
+        a = adders.ripple_adder_no_carry(3)
+        f = StringIO.StringIO()
+        blif.write_blif(a, f)
+        c = blif.read_blif(StringIO.StringIO(f.getvalue()))
+
+        for x in xrange(0, 64):
+            self.assertEqual(a.evaluate(x), c.evaluate(x))
+
+    def test_round_trip_constants(self):
+        s = sources.digital_source_circuit([1, 0, 1])
+        f = StringIO.StringIO()
+        blif.write_blif(s, f)
+
+        self.assertEqual([1, 0, 1], blif.read_blif(
+            StringIO.StringIO(f.getvalue())).evaluate())
+
+    def test_invalid(self):
+        for text in ['.model m\n.inputs a\n.outputs b\n.subckt x a=a b=b\n',
+                     '.model m\n.inputs a\n.outputs b\n.names a b\n1\n',
+                     '.model m\n.inputs a\n.outputs b\n.names a b\n1 1\n0 0\n',
+                     '.model m\n.inputs a\n.outputs b\n.names a c\n1 1\n',
+                     '.model m\n.inputs a\n.outputs b\n1 1\n']:
+            self.assertRaises(ValueError, blif.read_blif,
+                              StringIO.StringIO(text))
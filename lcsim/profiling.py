@@ -0,0 +1,352 @@
+import collections
+import importlib
+import timeit
+
+from lcsim.circuits import circuit as circuits
+from lcsim.components import base
+# Imported so that their component classes are instrumented
+from lcsim.components import cells, gates, registers, sources  # noqa
+
+__author__ = 'Jacky'
+
+# Build functions timed as phases while profiling is enabled, as
+# (module, function name). Calls through the module attribute are timed,
+# references imported into other modules before enable() are not.
+PHASES = [
+    ('lcsim.sha1.builder', 'block_operation'),
+    ('lcsim.sha1.builder', 'create_words'),
+]
+
+_timer = timeit.default_timer
+
+# Statistics being collected, see stats()
+_profile = None
+
+# Patches installed by enable(), as (object, attribute, original value or
+# _MISSING if the attribute was inherited)
+_patches = []
+_MISSING = object()
+
+
+class Profile(object):
+    """
+    Statistics collected while profiling is enabled.
+
+    Evaluation is counted per component class (the class of the evaluated
+    component, not the class that implements evaluate) and per owning
+    circuit. The owner of a component is the name of the first circuit it
+    was added to as an input or output component while profiling was
+    enabled; components that are not ports of any circuit, e.g. the inner
+    gates of a full adder, belong to the circuit of the component that
+    first evaluated them.
+
+    Times are exclusive: the time spent evaluating the inputs of a
+    component is counted for the input components, not for the component
+    itself. Phase times are inclusive.
+    """
+
+    def __init__(self):
+        # Class name -> number of evaluate() calls
+        self.calls = collections.Counter()
+        # Class name -> number of inputs whose output bit was already up to
+        # date when a component started evaluating its inputs
+        self.hits = collections.Counter()
+        # Class name -> seconds spent in evaluate()
+        self.seconds = collections.Counter()
+
+        # Circuit name -> number of evaluate() calls / seconds
+        self.circuit_calls = collections.Counter()
+        self.circuit_seconds = collections.Counter()
+
+        # Deepest nesting of evaluate_inputs() calls
+        self.max_depth = 0
+
+        # Phase name -> [calls, seconds]
+        self.phases = collections.OrderedDict()
+
+        # id(component) -> name of the owning circuit
+        self._owners = {}
+        self._owner = None
+        self._depth = 0
+        # Time spent in nested evaluate() calls, one entry per active call
+        self._nested = []
+
+    def as_dict(self):
+        """
+        Returns the statistics as a dictionary of plain values, e.g. to
+        store them as JSON.
+
+        :rtype dict
+        """
+        return {
+            'classes': dict((name, {'calls': self.calls[name],
+                                    'hits': self.hits[name],
+                                    'seconds': self.seconds[name]})
+                            for name in set(self.calls) | set(self.hits)),
+            'circuits': dict((str(name), {
+                'calls': self.circuit_calls[name],
+                'seconds': self.circuit_seconds[name]})
+                for name in self.circuit_calls),
+            'max_depth': self.max_depth,
+            'phases': dict((name, {'calls': calls, 'seconds': seconds})
+                           for name, (calls, seconds)
+                           in self.phases.iteritems()),
+        }
+
+
+def enable():
+    """
+    Start collecting statistics. Evaluation and circuit construction are
+    instrumented by replacing the evaluate() methods of all component
+    classes, ComponentBase.evaluate_inputs, the methods that add
+    components to circuits and the PHASES functions with instrumented
+    versions, which disable() puts back. While profiling is disabled
+    nothing is instrumented, so it costs nothing.
+
+    Component classes defined after enable() are not instrumented.
+    Statistics are kept across disable() and enable() until reset().
+
+    Example usage:
+        >>> from lcsim import profiling
+        >>> profiling.enable()
+        >>> h = builder.sha1_circuit(rounds=20)
+        >>> h.evaluate(message_circuit)
+        >>> profiling.disable()
+        >>> print profiling.report()
+    """
+    global _profile
+
+    if _patches:
+        return
+
+    if _profile is None:
+        _profile = Profile()
+
+    for cls in _component_classes():
+        _patch(cls, 'evaluate', _instrument_evaluate(cls, cls.evaluate))
+    _patch(base.ComponentBase, 'evaluate_inputs',
+           _instrument_evaluate_inputs(base.ComponentBase.evaluate_inputs))
+
+    for name in ('add_input_component', 'add_input_bus',
+                 'add_output_component'):
+        _patch(circuits.Circuit, name,
+               _instrument_ports(getattr(circuits.Circuit, name)))
+
+    for (module_name, name) in PHASES:
+        module = importlib.import_module(module_name)
+        _patch(module, name, _instrument_phase(
+            '%s.%s' % (module_name, name), getattr(module, name)))
+
+
+def disable():
+    """
+    Stop collecting statistics and remove all instrumentation.
+    """
+    while _patches:
+        target, name, original = _patches.pop()
+        if original is _MISSING:
+            delattr(target, name)
+        else:
+            setattr(target, name, original)
+
+
+def is_enabled():
+    """
+    Returns True if profiling is enabled.
+    """
+    return bool(_patches)
+
+
+def reset():
+    """
+    Discard all statistics collected so far.
+    """
+    global _profile
+    _profile = Profile() if _patches else None
+
+
+def stats():
+    """
+    Returns the statistics collected so far, or None if profiling was never
+    enabled since the last reset().
+
+    :rtype Profile
+    """
+    return _profile
+
+
+def report(limit=20):
+    """
+    Returns a text report of the statistics collected so far: evaluation
+    calls, cache hits and time by component class and by circuit, the
+    deepest evaluate_inputs() nesting and the time of every build phase.
+
+    Parameters:
+        limit:
+            Maximum number of component classes and circuits to list, the
+            ones with the most evaluation time first.
+
+    :rtype str
+    """
+    profile = _profile
+    if profile is None:
+        return 'Profiling was not enabled.'
+
+    lines = ['Evaluation by component class:',
+             '  %-24s %10s %10s %10s' % ('class', 'calls', 'hits',
+                                          'seconds')]
+    names = sorted(set(profile.calls) | set(profile.hits),
+                   key=lambda x: -profile.seconds[x])
+    for name in names[:limit]:
+        lines.append('  %-24s %10d %10d %10.4f' % (
+            name, profile.calls[name], profile.hits[name],
+            profile.seconds[name]))
+
+    lines += ['Evaluation by circuit:',
+              '  %-24s %10s %10s' % ('circuit', 'calls', 'seconds')]
+    names = sorted(profile.circuit_calls,
+                   key=lambda x: -profile.circuit_seconds[x])
+    for name in names[:limit]:
+        lines.append('  %-24s %10d %10.4f' % (
+            '(none)' if name is None else name, profile.circuit_calls[name],
+            profile.circuit_seconds[name]))
+
+    lines.append('Maximum evaluate_inputs depth: %d' % profile.max_depth)
+
+    lines += ['Build phases:',
+              '  %-40s %10s %10s' % ('phase', 'calls', 'seconds')]
+    for name, (calls, seconds) in profile.phases.iteritems():
+        lines.append('  %-40s %10d %10.4f' % (name, calls, seconds))
+
+    return '\n'.join(lines)
+
+
+def _component_classes():
+    """
+    Returns ComponentBase and all of its subclasses.
+    """
+    result = []
+    pending = [base.ComponentBase]
+    while pending:
+        cls = pending.pop()
+        if cls not in result:
+            result.append(cls)
+            pending.extend(cls.__subclasses__())
+
+    return result
+
+
+def _patch(target, name, value):
+    _patches.append((target, name, target.__dict__.get(name, _MISSING)))
+    setattr(target, name, value)
+
+
+def _instrument_evaluate(cls, evaluate):
+    """
+    Returns an instrumented version of the evaluate() method resolved for a
+    component class.
+    """
+    evaluate = evaluate.__func__
+
+    def instrumented(self):
+        # Calls through super() from a subclass are part of the call being
+        # measured for the subclass
+        if type(self) is not cls:
+            return evaluate(self)
+
+        profile = _profile
+        key = id(self)
+
+        owner = profile._owners.get(key, _MISSING)
+        if owner is _MISSING:
+            owner = profile._owners[key] = profile._owner
+
+        outer = profile._owner
+        profile._owner = owner
+        profile._nested.append(0.0)
+        start = _timer()
+        try:
+            return evaluate(self)
+        finally:
+            elapsed = _timer() - start
+            own = elapsed - profile._nested.pop()
+            if profile._nested:
+                profile._nested[-1] += elapsed
+            profile._owner = outer
+
+            name = cls.__name__
+            profile.calls[name] += 1
+            profile.seconds[name] += own
+            profile.circuit_calls[owner] += 1
+            profile.circuit_seconds[owner] += own
+
+    instrumented.__name__ = evaluate.__name__
+    instrumented.__doc__ = evaluate.__doc__
+    return instrumented
+
+
+def _instrument_evaluate_inputs(evaluate_inputs):
+    """
+    Returns an instrumented version of ComponentBase.evaluate_inputs,
+    counting cache hits and the nesting depth.
+    """
+    evaluate_inputs = evaluate_inputs.__func__
+
+    def instrumented(self):
+        profile = _profile
+        epoch = base.ComponentBase.epoch
+        for gate in self._input_bits:
+            if gate is not None and gate._epoch == epoch and \
+                    gate._output_bit is not None:
+                profile.hits[type(gate).__name__] += 1
+
+        profile._depth += 1
+        if profile._depth > profile.max_depth:
+            profile.max_depth = profile._depth
+
+        try:
+            return evaluate_inputs(self)
+        finally:
+            profile._depth -= 1
+
+    instrumented.__name__ = evaluate_inputs.__name__
+    instrumented.__doc__ = evaluate_inputs.__doc__
+    return instrumented
+
+
+def _instrument_ports(method):
+    """
+    Returns an instrumented version of a Circuit method that adds
+    components to the circuit, recording the circuit as their owner.
+    """
+    method = method.__func__
+
+    def instrumented(self, components, *args, **kwargs):
+        owners = _profile._owners
+        for component in (components if isinstance(components, list)
+                          else [components]):
+            owners.setdefault(id(component), self.name)
+
+        return method(self, components, *args, **kwargs)
+
+    instrumented.__name__ = method.__name__
+    instrumented.__doc__ = method.__doc__
+    return instrumented
+
+
+def _instrument_phase(name, function):
+    """
+    Returns a version of a function whose calls are timed as a phase.
+    """
+    def instrumented(*args, **kwargs):
+        start = _timer()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            phase = _profile.phases.setdefault(name, [0, 0.0])
+            phase[0] += 1
+            phase[1] += _timer() - start
+
+    instrumented.__name__ = function.__name__
+    instrumented.__doc__ = function.__doc__
+    return instrumented
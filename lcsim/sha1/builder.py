@@ -1,200 +1,478 @@
 from itertools import izip
 
-from lcsim.circuits.bitwise import bitwise_or_circuit, bitwise_and_circuit, bitwise_not_circuit, bitwise_xor_circuit
-from lcsim.circuits.circuit import connect_circuits, stack_circuits
-from lcsim.circuits.sources import digital_source_int_circuit
+from lcsim.circuits import encoding
+from lcsim.circuits.bitwise import bitwise_or_circuit, bitwise_and_circuit, bitwise_not_circuit, bitwise_xor_circuit, bitwise_mux_circuit
+from lcsim.circuits.circuit import connect_bus, connect_circuits, stack_circuits, merge_circuits
+from lcsim.circuits.sources import digital_source_int_circuit, digital_input_circuit
 from lcsim.circuits.adders import ripple_adder_no_carry
 from lcsim.circuits.shifters import left_rotate
+from lcsim.circuits.registers import register_circuit
+from lcsim.circuits.hierarchy import Cell
+
+# Standard initial h-constants
+_H = [0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476, 0xC3D2E1F0]
+
+# Round constants k for rounds 0-19, 20-39, 40-59 and 60-79
+_K = [0x5A827999, 0x6ED9EBA1, 0x8F1BBCDC, 0xCA62C1D6]
+
+# Cells shared by all hierarchical sha-1 circuits, defined on first use
+_CELLS = {}
 
 
 def sha1(message, rounds=80):
     """
     Runs the sha-1 block operation on a 512-bit message/chunk.
     """
+    h = hash_circuit(message, rounds)
+
+    result = encoding.from_bits(h.compile().evaluate(), int)
+    return result, h
+
+
+def sha1_circuit(rounds=80, hierarchical=False):
+    """
+    Builds a circuit that runs the sha-1 block operation on its 512-bit
+    input space and outputs the 160-bit result. The message is bound when
+    the circuit is evaluated, so one circuit can be reused for every
+    message:
+
+        >>> c = sha1_circuit()
+        >>> c.evaluate(message, int)
+
+    See block_operation for the 'hierarchical' option.
+    """
+    message = digital_input_circuit(512)
+    h = hash_circuit(message, rounds, hierarchical)
+
+    return merge_circuits('SHA1', message, h)
+
+
+def hash_circuit(message, rounds=80, hierarchical=False, taps=None):
+    """
+    Builds the circuit for the sha-1 block operation on a 512-bit
+    message/chunk circuit with the standard initial h-constants. Returns
+    the 160-bit result circuit H.
+
+    See block_operation for the 'taps' option; the results of the reduced
+    rounds are appended to it as 160-bit circuits like H.
+    """
     # Initial constants
-    a = digital_source_int_circuit(0x67452301, 32)
-    b = digital_source_int_circuit(0xEFCDAB89, 32)
-    c = digital_source_int_circuit(0x98BADCFE, 32)
-    d = digital_source_int_circuit(0x10325476, 32)
-    e = digital_source_int_circuit(0xC3D2E1F0, 32)
+    a, b, c, d, e = [digital_source_int_circuit(x, 32) for x in _H]
 
-    h0, h1, h2, h3, h4 = block_operation(message, a, b, c, d, e, rounds)
+    if taps is None:
+        h0, h1, h2, h3, h4 = block_operation(message, a, b, c, d, e, rounds,
+                                             hierarchical)
 
-    # Concatenate results
-    h01 = stack_circuits('h01', h0, h1)
-    h012 = stack_circuits('h012', h01, h2)
-    h0123 = stack_circuits('h0123', h012, h3)
-    h = stack_circuits('H', h0123, h4)
+        # Concatenate results
+        return stack_circuits('H', h0, h1, h2, h3, h4)
 
-    result = int(''.join(map(str, h.evaluate())), 2)
-    return result, h
+    results = []
+    block_operation(message, a, b, c, d, e, rounds, hierarchical, results)
+    taps.extend(stack_circuits('H', *x) for x in results)
+
+    return taps[-1]
+
+
+def sha1_sequential(message, rounds=80):
+    """
+    Runs the sha-1 block operation on a 512-bit message/chunk circuit like
+    sha1(), but with the sequential circuit from sha1_sequential_circuit,
+    which is clocked once to load the message and once per round.
+    """
+    h = sha1_sequential_circuit(message, rounds)
+    h.clock(rounds + 1)
 
+    return h.evaluate(output_format=int), h
 
-def block_operation(chunk, h0, h1, h2, h3, h4, rounds=80):
+
+def sha1_sequential_circuit(message, rounds=80):
+    """
+    Builds a sequential circuit for the sha-1 block operation on a 512-bit
+    message/chunk circuit. Instead of unrolling every round, the circuit
+    holds the working variables a-e and the last 16 words of the message
+    schedule in registers, and contains the logic of a single round that
+    is reused on every clock cycle. The round function f and constant k
+    are selected by a one-hot round counter.
+
+    The first clock cycle loads the message into the word schedule, and
+    each of the following 'rounds' cycles runs one round. After clocking
+    the circuit rounds + 1 times, its outputs are the 160-bit result:
+
+        >>> h = sha1_sequential_circuit(message)
+        >>> h.clock(81)
+        >>> h.evaluate(output_format=int)
+
+    Call reset() on the circuit to run it again from the start.
+    """
+    # One-hot round counter: bit 0 is set during the load cycle, and bit
+    # i + 1 while round i runs.
+    step = register_circuit(rounds + 1, 1 << rounds)
+    connect_circuits(digital_source_int_circuit(0, 1), step, {0: 0})
+    connect_bus(step, step, 1, 0, rounds)
+
+    # Message schedule, w[t] to w[t + 15] for round t. The next word is
+    # w[t + 16] = (w[t + 13] xor w[t + 8] xor w[t + 2] xor w[t])
+    # leftrotate 1.
+    w = register_circuit(512)
+
+    xtemp = bitwise_xor_circuit(32)
+    connect_bus(w, xtemp, 0, 13 * 32, 32)
+    connect_bus(w, xtemp, 32, 8 * 32, 32)
+
+    xtemp2 = bitwise_xor_circuit(32)
+    connect_bus(xtemp, xtemp2)
+    connect_bus(w, xtemp2, 32, 2 * 32, 32)
+
+    xtemp = bitwise_xor_circuit(32)
+    connect_bus(xtemp2, xtemp)
+    connect_bus(w, xtemp, 32, 0, 32)
+
+    word = left_rotate(xtemp, 1)
+
+    # Load the message on the first cycle, shift by one word afterwards
+    w_next = bitwise_mux_circuit(512)
+    connect_circuits(step, w_next, {0: 0})
+    connect_bus(message, w_next, 1)
+    connect_bus(w, w_next, 513, 32)
+    connect_bus(word, w_next, 993)
+    connect_bus(w_next, w)
+
+    # Working variables, starting from the standard h-constants
+    h = [register_circuit(32, x) for x in _H]
+    a, b, c, d, e = h
+
+    # Select f and k by round
+    phases = [_any_step(step, range(20 * j + 1, min(20 * j + 21, rounds + 1)))
+              for j in xrange(0, 4)]
+
+    f = _select(phases[2], majority_circuit(b, c, d), parity_circuit(b, c, d))
+    f = _select(phases[0], choose_circuit(b, c, d), f)
+
+    k = _select(phases[2], digital_source_int_circuit(_K[2], 32),
+                digital_source_int_circuit(_K[3], 32))
+    k = _select(phases[1], digital_source_int_circuit(_K[1], 32), k)
+    k = _select(phases[0], digital_source_int_circuit(_K[0], 32), k)
+
+    temp = round_sum(a, f, e, k, (w, xrange(0, 32)))
+
+    # Hold the working variables during the load cycle
+    for (register, value) in izip(h, [temp, a, left_rotate(b, 30), c, d]):
+        hold = _select(step, register, value)
+        connect_bus(hold, register)
+
+    # Add the result to the h-constants
+    result = []
+    for (x, register) in izip(_H, h):
+        h_add = ripple_adder_no_carry(32)
+        connect_bus(digital_source_int_circuit(x, 32), h_add)
+        connect_bus(register, h_add, 32)
+        result.append(h_add)
+
+    return stack_circuits('H', *result)
+
+
+def _any_step(step, indices):
+    """
+    Returns a 1-bit circuit that outputs 1 if any of the given output bits
+    of the round counter is set.
+    """
+    if not indices:
+        return digital_source_int_circuit(0, 1)
+
+    result = bitwise_or_circuit(1)
+    connect_circuits(step, result, {indices[0]: 0})
+    connect_circuits(step, result, {indices[-1]: 1})
+
+    for i in indices[1:-1]:
+        any_bit = bitwise_or_circuit(1)
+        connect_circuits(result, any_bit, {0: 0})
+        connect_circuits(step, any_bit, {i: 1})
+        result = any_bit
+
+    return result
+
+
+def _select(select, x, y):
+    """
+    Returns a 32-bit circuit that outputs x if output bit 0 of 'select' is
+    set, otherwise y.
+    """
+    result = bitwise_mux_circuit(32)
+    connect_circuits(select, result, {0: 0})
+    connect_bus(x, result, 1)
+    connect_bus(y, result, 33)
+
+    return result
+
+
+def block_operation(chunk, h0, h1, h2, h3, h4, rounds=80, hierarchical=False,
+                    taps=None):
     """
     Returns (h0, h1, h2, h3, h4), the h-constants that result from running
     the SHA-1 algorithm on one block.
+
+    If 'taps' is a list, the result of the block operation reduced to i
+    rounds is appended to it for every i from 0 to 'rounds', each with its
+    own final addition on the shared gates of the first i rounds. The last
+    one is the result for all rounds.
+
+    If 'hierarchical' is True, every round, message schedule word and final
+    addition is an instance of a cell (see lcsim.circuits.hierarchy) shared
+    by all hierarchical sha-1 circuits, instead of a fresh set of gates.
+    Use hierarchy.flatten on the result to get individual gates.
     """
 
     a, b, c, d, e = h0, h1, h2, h3, h4
 
-    w = create_words(chunk, rounds)
+    w = create_words(chunk, rounds, hierarchical)
 
     # Main loop here
     for i in xrange(0, rounds):
-        if 0 <= i <= 19:
-            # f = (b and c) or ((not b) and d)
-            b_and_c = bitwise_and_circuit(32)
-            connect_circuits(b, b_and_c, {x: x for x in xrange(0, 32)})
-            connect_circuits(c, b_and_c, {x: x + 32 for x in xrange(0, 32)})
+        if taps is not None:
+            taps.append(_add_state((h0, h1, h2, h3, h4), (a, b, c, d, e),
+                                   hierarchical))
+
+        if hierarchical:
+            temp = _instance('round%d' % (i // 20), _round_circuit, i // 20)
+            for (j, x) in enumerate([a, b, c, d, e]):
+                connect_bus(x, temp, j * 32)
+            connect_bus(w[i][0], temp, 160, w[i][1][0], 32)
+        elif 0 <= i <= 19:
+            f = choose_circuit(b, c, d)
+            k = digital_source_int_circuit(_K[0], 32)
+        elif 20 <= i <= 39:
+            f = parity_circuit(b, c, d)
+            k = digital_source_int_circuit(_K[1], 32)
+        elif 40 <= i <= 59:
+            f = majority_circuit(b, c, d)
+            k = digital_source_int_circuit(_K[2], 32)
+        elif 60 <= i <= 79:
+            f = parity_circuit(b, c, d)
+            k = digital_source_int_circuit(_K[3], 32)
+        else:
+            raise Exception("Invalid word index in main loop!")
 
-            not_b = bitwise_not_circuit(32)
-            connect_circuits(b, not_b, {x: x for x in xrange(0, 32)})
+        if not hierarchical:
+            temp = round_sum(a, f, e, k, w[i])
 
-            not_b_and_d = bitwise_and_circuit(32)
-            connect_circuits(not_b, not_b_and_d, {x: x for x in xrange(0, 32)})
-            connect_circuits(d, not_b_and_d, {x: x + 32 for x in xrange(0, 32)})
+        e = d
+        d = c
+        c = left_rotate(b, 30)
+        b = a
+        a = temp
 
-            f = bitwise_or_circuit(32)
-            connect_circuits(b_and_c, f, {x: x for x in xrange(0, 32)})
-            connect_circuits(not_b_and_d, f, {x: x + 32 for x in xrange(0, 32)})
+    if taps is not None:
+        taps.append(_add_state((h0, h1, h2, h3, h4), (a, b, c, d, e),
+                               hierarchical))
+        return taps[-1]
 
-            k = digital_source_int_circuit(0x5A827999, 32)
-        elif 20 <= i <= 39:
-            # f = b xor c xor d
-            b_xor_c = bitwise_xor_circuit(32)
-            connect_circuits(b, b_xor_c, {x: x for x in xrange(0, 32)})
-            connect_circuits(c, b_xor_c, {x: x + 32 for x in xrange(0, 32)})
+    return _add_state((h0, h1, h2, h3, h4), (a, b, c, d, e), hierarchical)
 
-            f = bitwise_xor_circuit(32)
-            connect_circuits(b_xor_c, f, {x: x for x in xrange(0, 32)})
-            connect_circuits(d, f, {x: x + 32 for x in xrange(0, 32)})
 
-            k = digital_source_int_circuit(0x6ED9EBA1, 32)
-        elif 40 <= i <= 59:
-            # f = (b and c) or (b and d) or (c and d)
-            b_and_c = bitwise_and_circuit(32)
-            connect_circuits(b, b_and_c, {x: x for x in xrange(0, 32)})
-            connect_circuits(c, b_and_c, {x: x + 32 for x in xrange(0, 32)})
+def _add_state(h, state, hierarchical):
+    """
+    Returns the five adder circuits for the final addition of the
+    h-constants h and the working variables state = (a, b, c, d, e).
+    """
+    return tuple(_add_word(x, y, hierarchical) for (x, y) in izip(h, state))
 
-            b_and_d = bitwise_and_circuit(32)
-            connect_circuits(b, b_and_d, {x: x for x in xrange(0, 32)})
-            connect_circuits(d, b_and_d, {x: x + 32 for x in xrange(0, 32)})
 
-            c_and_d = bitwise_and_circuit(32)
-            connect_circuits(c, c_and_d, {x: x for x in xrange(0, 32)})
-            connect_circuits(d, c_and_d, {x: x + 32 for x in xrange(0, 32)})
+def _add_word(x, y, hierarchical):
+    add = _adder(hierarchical)
+    connect_bus(x, add)
+    connect_bus(y, add, 32)
 
-            bnc_or_bnd = bitwise_or_circuit(32)
-            connect_circuits(b_and_c, bnc_or_bnd, {x: x for x in xrange(0, 32)})
-            connect_circuits(b_and_d, bnc_or_bnd, {x: x + 32 for x in xrange(0, 32)})
+    return add
 
-            f = bitwise_or_circuit(32)
-            connect_circuits(bnc_or_bnd, f, {x: x for x in xrange(0, 32)})
-            connect_circuits(c_and_d, f, {x: x + 32 for x in xrange(0, 32)})
 
-            k = digital_source_int_circuit(0x8F1BBCDC, 32)
-        elif 60 <= i <= 79:
-            # f = b xor c xor d
-            b_xor_c = bitwise_xor_circuit(32)
-            connect_circuits(b, b_xor_c, {x: x for x in xrange(0, 32)})
-            connect_circuits(c, b_xor_c, {x: x + 32 for x in xrange(0, 32)})
+def choose_circuit(b, c, d):
+    """
+    Returns a circuit for the sha-1 choose function of rounds 0-19,
+    f = (b and c) or ((not b) and d).
+    """
+    b_and_c = bitwise_and_circuit(32)
+    connect_bus(b, b_and_c)
+    connect_bus(c, b_and_c, 32)
 
-            f = bitwise_xor_circuit(32)
-            connect_circuits(b_xor_c, f, {x: x for x in xrange(0, 32)})
-            connect_circuits(d, f, {x: x + 32 for x in xrange(0, 32)})
+    not_b = bitwise_not_circuit(32)
+    connect_bus(b, not_b)
 
-            k = digital_source_int_circuit(0xCA62C1D6, 32)
-        else:
-            raise Exception("Invalid word index in main loop!")
+    not_b_and_d = bitwise_and_circuit(32)
+    connect_bus(not_b, not_b_and_d)
+    connect_bus(d, not_b_and_d, 32)
 
-        # (a leftrotate 5) + f
-        temp = ripple_adder_no_carry(32)
-        connect_circuits(a, temp, {x: x - 5 for x in xrange(5, 32)})
-        connect_circuits(a, temp, {x: x + 27 for x in xrange(0, 5)})
-        connect_circuits(f, temp, {x: x + 32 for x in xrange(0, 32)})
+    f = bitwise_or_circuit(32)
+    connect_bus(b_and_c, f)
+    connect_bus(not_b_and_d, f, 32)
 
-        # result + e
-        temp2 = ripple_adder_no_carry(32)
-        connect_circuits(temp, temp2, {x: x for x in xrange(0, 32)})
-        connect_circuits(e, temp2, {x: x + 32 for x in xrange(0, 32)})
+    return f
 
-        # result + k
-        temp = ripple_adder_no_carry(32)
-        connect_circuits(temp2, temp, {x: x for x in xrange(0, 32)})
-        connect_circuits(k, temp, {x: x + 32 for x in xrange(0, 32)})
 
-        # result + w[i]
-        temp2 = ripple_adder_no_carry(32)
-        connect_circuits(temp, temp2, {x: x for x in xrange(0, 32)})
-        connect_circuits(w[i][0], temp2, {x: y for (x, y) in izip(w[i][1], xrange(32, 64))})
+def parity_circuit(b, c, d):
+    """
+    Returns a circuit for the sha-1 parity function of rounds 20-39 and
+    60-79, f = b xor c xor d.
+    """
+    b_xor_c = bitwise_xor_circuit(32)
+    connect_bus(b, b_xor_c)
+    connect_bus(c, b_xor_c, 32)
 
-        # temp = (a leftrotate 5) + f + e + k + w[i]
-        temp = temp2
+    f = bitwise_xor_circuit(32)
+    connect_bus(b_xor_c, f)
+    connect_bus(d, f, 32)
 
-        e = d
-        d = c
-        c = left_rotate(b, 30)
-        b = a
-        a = temp
+    return f
 
-    h0_add = ripple_adder_no_carry(32)
-    connect_circuits(h0, h0_add, {i: i for i in xrange(0, 32)})
-    connect_circuits(a, h0_add, {i: i + 32 for i in xrange(0, 32)})
 
-    h1_add = ripple_adder_no_carry(32)
-    connect_circuits(h1, h1_add, {i: i for i in xrange(0, 32)})
-    connect_circuits(b, h1_add, {i: i + 32 for i in xrange(0, 32)})
+def majority_circuit(b, c, d):
+    """
+    Returns a circuit for the sha-1 majority function of rounds 40-59,
+    f = (b and c) or (b and d) or (c and d).
+    """
+    b_and_c = bitwise_and_circuit(32)
+    connect_bus(b, b_and_c)
+    connect_bus(c, b_and_c, 32)
+
+    b_and_d = bitwise_and_circuit(32)
+    connect_bus(b, b_and_d)
+    connect_bus(d, b_and_d, 32)
 
-    h2_add = ripple_adder_no_carry(32)
-    connect_circuits(h2, h2_add, {i: i for i in xrange(0, 32)})
-    connect_circuits(c, h2_add, {i: i + 32 for i in xrange(0, 32)})
+    c_and_d = bitwise_and_circuit(32)
+    connect_bus(c, c_and_d)
+    connect_bus(d, c_and_d, 32)
 
-    h3_add = ripple_adder_no_carry(32)
-    connect_circuits(h3, h3_add, {i: i for i in xrange(0, 32)})
-    connect_circuits(d, h3_add, {i: i + 32 for i in xrange(0, 32)})
+    bnc_or_bnd = bitwise_or_circuit(32)
+    connect_bus(b_and_c, bnc_or_bnd)
+    connect_bus(b_and_d, bnc_or_bnd, 32)
 
-    h4_add = ripple_adder_no_carry(32)
-    connect_circuits(h4, h4_add, {i: i for i in xrange(0, 32)})
-    connect_circuits(e, h4_add, {i: i + 32 for i in xrange(0, 32)})
+    f = bitwise_or_circuit(32)
+    connect_bus(bnc_or_bnd, f)
+    connect_bus(c_and_d, f, 32)
 
-    return h0_add, h1_add, h2_add, h3_add, h4_add
+    return f
 
 
-def create_words(chunk, rounds=80):
+def round_sum(a, f, e, k, word):
+    """
+    Returns a circuit for temp = (a leftrotate 5) + f + e + k + w of one
+    sha-1 round. The word is a (circuit, output bits) pair as returned by
+    create_words.
+    """
+    # (a leftrotate 5) + f
+    temp = ripple_adder_no_carry(32)
+    connect_bus(a, temp, rotation=5)
+    connect_bus(f, temp, 32)
+
+    # result + e
+    temp2 = ripple_adder_no_carry(32)
+    connect_bus(temp, temp2)
+    connect_bus(e, temp2, 32)
+
+    # result + k
+    temp = ripple_adder_no_carry(32)
+    connect_bus(temp2, temp)
+    connect_bus(k, temp, 32)
+
+    # result + w[i]
+    temp2 = ripple_adder_no_carry(32)
+    connect_bus(temp, temp2)
+    connect_bus(word[0], temp2, 32, word[1][0], 32)
+
+    return temp2
+
+
+def create_words(chunk, rounds=80, hierarchical=False):
     w = [None] * rounds
 
     for i in xrange(0, min(rounds, 16)):
         w[i] = (chunk, xrange(i * 32, i * 32 + 32))
 
     for i in xrange(16, min(rounds, 80)):
+        if hierarchical:
+            word = _instance('word', _word_circuit)
+            for (j, x) in enumerate([3, 8, 14, 16]):
+                connect_bus(w[i - x][0], word, j * 32, w[i - x][1][0], 32)
+
+            w[i] = (word, xrange(0, 32))
+            continue
+
         # w[i] = (w[i-3] xor w[i-8] xor w[i-14] xor w[i-16]) leftrotate 1
-        xtemp = bitwise_xor_circuit(32)
-
-        connect_circuits(w[i - 3][0], xtemp, {
-            x: y for (x, y) in izip(w[i - 3][1], xrange(0, 32))
-        })
-
-        connect_circuits(w[i - 8][0], xtemp, {
-            x: y for (x, y) in izip(w[i - 8][1], xrange(32, 64))
-        })
-
-        # result xor w[i - 14]
-        xtemp2 = bitwise_xor_circuit(32)
-        connect_circuits(xtemp, xtemp2, {x: x for x in xrange(0, 32)})
-        connect_circuits(w[i - 14][0], xtemp2, {
-            x: y for (x, y) in izip(w[i - 14][1], xrange(32, 64))
-        })
-
-        # result xor w[i - 16]
-        xtemp = bitwise_xor_circuit(32)
-        connect_circuits(xtemp2, xtemp, {x: x for x in xrange(0, 32)})
-        connect_circuits(w[i - 16][0], xtemp, {
-            x: y for (x, y) in izip(w[i - 16][1], xrange(32, 64))
-        })
-
-        # leftrotate 1
-        word = left_rotate(xtemp, 1)
+        word = _next_word(w[i - 3], w[i - 8], w[i - 14], w[i - 16])
         w[i] = (word, xrange(0, 32))
 
-    return w
\ No newline at end of file
+    return w
+
+
+def _next_word(w3, w8, w14, w16):
+    """
+    Returns a circuit for the message schedule word
+    (w3 xor w8 xor w14 xor w16) leftrotate 1, where each word is a
+    (circuit, output bits) pair as returned by create_words.
+    """
+    xtemp = bitwise_xor_circuit(32)
+
+    connect_bus(w3[0], xtemp, 0, w3[1][0], 32)
+    connect_bus(w8[0], xtemp, 32, w8[1][0], 32)
+
+    # result xor w[i - 14]
+    xtemp2 = bitwise_xor_circuit(32)
+    connect_bus(xtemp, xtemp2)
+    connect_bus(w14[0], xtemp2, 32, w14[1][0], 32)
+
+    # result xor w[i - 16]
+    xtemp = bitwise_xor_circuit(32)
+    connect_bus(xtemp2, xtemp)
+    connect_bus(w16[0], xtemp, 32, w16[1][0], 32)
+
+    # leftrotate 1
+    return left_rotate(xtemp, 1)
+
+
+def _instance(name, build, *args):
+    """
+    Returns a new instance of a shared cell. The cell is defined from the
+    circuit returned by build(*args) the first time it is needed.
+    """
+    if name not in _CELLS:
+        _CELLS[name] = Cell(build(*args), name)
+
+    return _CELLS[name].instance()
+
+
+def _adder(hierarchical):
+    """
+    Returns a 32-bit adder circuit, an instance of a shared cell if
+    'hierarchical' is True.
+    """
+    if hierarchical:
+        return _instance('add', ripple_adder_no_carry, 32)
+
+    return ripple_adder_no_carry(32)
+
+
+def _round_circuit(phase):
+    """
+    Builds the cell circuit for temp = (a leftrotate 5) + f + e + k + w in
+    rounds 20 * phase to 20 * phase + 19. The input space is a-b-c-d-e-w.
+    """
+    a, b, c, d, e, word = [digital_input_circuit(32) for _ in xrange(0, 6)]
+
+    f = [choose_circuit, parity_circuit, majority_circuit, parity_circuit][phase](b, c, d)
+    k = digital_source_int_circuit(_K[phase], 32)
+    temp = round_sum(a, f, e, k, (word, xrange(0, 32)))
+
+    inputs = stack_circuits('in', a, b, c, d, e, word)
+
+    return merge_circuits('round%d' % phase, inputs, temp)
+
+
+def _word_circuit():
+    """
+    Builds the cell circuit for a message schedule word,
+    (w[i-3] xor w[i-8] xor w[i-14] xor w[i-16]) leftrotate 1. The input
+    space is w[i-3]-w[i-8]-w[i-14]-w[i-16].
+    """
+    message = digital_input_circuit(128)
+    words = [(message, xrange(j * 32, j * 32 + 32)) for j in xrange(0, 4)]
+
+    return merge_circuits('word', message, _next_word(*words))
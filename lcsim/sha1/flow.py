@@ -0,0 +1,509 @@
+"""
+Max-flow/min-cut for circuit graphs with unit capacities, see min_cut().
+
+The solver is Dinic's algorithm on a residual graph of integer arrays.
+Every augmenting path carries one unit of flow, so on unit capacity
+graphs it needs O(E * sqrt(V)) time (Even and Tarjan).
+
+Nodes can be added to and removed from a ResidualGraph between solves,
+keeping as much of the flow as possible, to solve a sequence of
+overlapping cut problems incrementally.
+"""
+from array import array
+from collections import deque
+
+__author__ = 'Jacky'
+
+
+class ResidualGraph(object):
+    """
+    Flow network of a CSRGraph. Arc a and its reverse arc a ^ 1 are stored
+    next to each other: head[a] is the node arc a points to and cap[a] its
+    residual capacity, so pushing a unit of flow over arc a decrements
+    cap[a] and increments cap[a ^ 1]. The arcs leaving node u are
+    arcs[first[u]:first[u + 1]].
+
+    In edge mode the nodes of the network are those of the graph and every
+    undirected edge has its capacity in both directions. In vertex mode
+    every node u is split into an in-node 2u and an out-node 2u + 1 joined
+    by an arc of capacity 1, and edges have unlimited capacity, so cuts
+    consist of nodes instead of edges. The source and sink nodes have
+    unlimited capacity.
+
+    Only arcs between active nodes have capacity. Nodes removed while
+    flow passes through them leave excess flow at the nodes before them,
+    kept in excess until the next augment() forwards it to the sink or
+    returns it to the source.
+    """
+
+    def __init__(self, graph, source=0, sink=1, vertex=False, active=None):
+        """
+        Parameters:
+            graph:
+                The CSRGraph to compute flows on.
+            source:
+                Node id of the source.
+            sink:
+                Node id of the sink.
+            vertex:
+                If True, nodes have capacity 1 instead of edges.
+            active:
+                Optional sequence of a truth value for every node id,
+                whether the node is initially part of the network. The
+                source and sink are always active. Defaults to all nodes.
+
+        Raises:
+            ValueError if the source and sink are adjacent in vertex mode,
+            so no set of nodes separates them.
+
+        :type graph CSRGraph
+        :type source int
+        :type sink int
+        :type vertex bool
+        """
+        self.graph = graph
+        self.vertex = vertex
+
+        size = len(graph)
+        indptr, indices, capacities = graph.indptr, graph.indices, \
+            graph.capacities
+        # Larger than any cut
+        unlimited = 1 + (len(indices) if capacities is None
+                         else sum(capacities))
+
+        tails = array('l')
+        head = array('l')
+        cap = array('l')
+
+        def add_arc(u, v, capacity, reverse):
+            tails.append(u)
+            head.append(v)
+            cap.append(capacity)
+            tails.append(v)
+            head.append(u)
+            cap.append(reverse)
+
+        if vertex:
+            if sink in graph.neighbors(source):
+                raise ValueError('Source and sink are adjacent')
+
+            self.size = 2 * size
+            self.source = 2 * source + 1
+            self.sink = 2 * sink
+
+            for u in xrange(0, size):
+                add_arc(2 * u, 2 * u + 1,
+                        unlimited if u in (source, sink) else 1, 0)
+            for u in xrange(0, size):
+                for i in xrange(indptr[u], indptr[u + 1]):
+                    add_arc(2 * u + 1, 2 * indices[i], unlimited, 0)
+        else:
+            self.size = size
+            self.source = source
+            self.sink = sink
+
+            for u in xrange(0, size):
+                for i in xrange(indptr[u], indptr[u + 1]):
+                    v = indices[i]
+                    if v > u:
+                        c = 1 if capacities is None else capacities[i]
+                        add_arc(u, v, c, c)
+
+        # Bucket the arcs by tail
+        first = array('l', [0]) * (self.size + 1)
+        for u in tails:
+            first[u + 1] += 1
+        for u in xrange(0, self.size):
+            first[u + 1] += first[u]
+
+        arcs = array('l', [0]) * len(tails)
+        position = array('l', first)
+        for a, u in enumerate(tails):
+            arcs[position[u]] = a
+            position[u] += 1
+
+        self.head = head
+        self.cap = cap
+        self.first = first
+        self.arcs = arcs
+        self._original = array('l', cap)
+        self._unlimited = unlimited
+
+        self._active = bytearray([1]) * self.size
+        if active is not None:
+            for u in xrange(0, size):
+                if not active[u] and u not in (source, sink):
+                    for x in self._split(u):
+                        self._active[x] = 0
+
+            for a in xrange(0, len(head), 2):
+                if not (self._active[head[a]] and self._active[head[a ^ 1]]):
+                    cap[a] = cap[a ^ 1] = 0
+
+        # Capacities of the arcs between active nodes; the flow over arc a
+        # is _capacity[a] - cap[a]
+        self._capacity = array('l', cap)
+
+        self.flow = 0
+        # Node -> units of excess flow, see remove_nodes
+        self.excess = {}
+
+    def levels(self, sources=None, target=None, initial=None):
+        """
+        Returns the BFS distance of every node from the source, or the
+        closest of the given nodes, in the residual graph, -1 for
+        unreachable nodes. If a target is given, the search stops at the
+        distance of the target, so only the nodes closer than the target
+        and the target itself get their distance.
+
+        If 'initial' is given, it is an array of -1 for the nodes to search
+        and the number of nodes for the nodes to avoid, which keep that
+        distance.
+
+        :rtype array.array
+        """
+        head, cap, first, arcs = self.head, self.cap, self.first, self.arcs
+
+        if sources is None:
+            sources = [self.source]
+
+        if initial is None:
+            level = array('l', [-1]) * self.size
+        else:
+            level = array('l', initial)
+        for u in sources:
+            level[u] = 0
+        q = deque(sources)
+        while q:
+            u = q.popleft()
+            if target is not None and 0 <= level[target] <= level[u]:
+                break
+
+            next_level = level[u] + 1
+            for i in xrange(first[u], first[u + 1]):
+                a = arcs[i]
+                if cap[a] > 0 and level[head[a]] < 0:
+                    level[head[a]] = next_level
+                    q.append(head[a])
+
+        return level
+
+    def augment(self, nearby=None):
+        """
+        Push flow along shortest augmenting paths until the flow is
+        maximal, one blocking flow per BFS phase. Excess flow left by
+        remove_nodes is first forwarded to the sink as far as possible
+        and the rest returned to the source.
+
+        Parameters:
+            nearby:
+                Optional list of graph nodes to forward the excess flow
+                through first, before searching the whole network. The
+                search for augmenting paths spreads over most of a circuit
+                graph within a few steps, so if most of the excess can
+                reach the sink through a small part of the network this is
+                much faster.
+
+        Returns:
+            The value of the maximum flow.
+
+        :rtype int
+        """
+        if self.excess:
+            if nearby is not None:
+                initial = array('l', [self.size]) * self.size
+                for u in nearby:
+                    for x in self._split(u):
+                        initial[x] = -1
+                initial[self.sink] = -1
+
+                self.flow += self._route(self.excess, self.sink, initial)
+
+            self.flow += self._route(self.excess, self.sink)
+            self._route(self.excess, self.source)
+            self.excess = {}
+
+        # No flow is larger than the capacity around the source or sink
+        if self.flow < min(self._degree(self.source, False),
+                           self._degree(self.sink, True)):
+            self.flow += self._route({self.source: self._unlimited},
+                                     self.sink)
+
+        return self.flow
+
+    def add_nodes(self, nodes):
+        """
+        Activate nodes, giving their arcs to other active nodes their
+        capacity. The flow is kept, so augment() continues from it.
+
+        :type nodes list[int]
+        """
+        head, cap, first, arcs = self.head, self.cap, self.first, self.arcs
+        capacity, original, active = self._capacity, self._original, \
+            self._active
+
+        added = [x for u in nodes for x in self._split(u) if not active[x]]
+        for x in added:
+            active[x] = 1
+
+        for x in added:
+            for i in xrange(first[x], first[x + 1]):
+                a = arcs[i]
+                if active[head[a]]:
+                    for b in (a, a ^ 1):
+                        cap[b] = capacity[b] = original[b]
+
+    def remove_nodes(self, nodes):
+        """
+        Deactivate nodes. Every unit of flow through them is cancelled from
+        the first removed node of its flow path on, which leaves a unit of
+        excess at the node before it; flow cycles through them are
+        cancelled entirely. The flow on all other arcs is kept, so after
+        removing the nodes around the sink and adding a new part of the
+        network, augment() only has to extend the kept flow.
+
+        The excess flow must have been resolved by augment() before
+        removing nodes again.
+
+        :type nodes list[int]
+        """
+        head, cap, first, arcs = self.head, self.cap, self.first, self.arcs
+        capacity, active = self._capacity, self._active
+
+        removed = [x for u in nodes for x in self._split(u) if active[x]]
+        removing = bytearray(self.size)
+        for x in removed:
+            removing[x] = 1
+
+        for x in removed:
+            for i in xrange(first[x], first[x + 1]):
+                a = arcs[i]
+                for b in (a, a ^ 1):
+                    while capacity[b] > cap[b]:
+                        self._cancel_unit(b, removing)
+
+        for x in removed:
+            active[x] = 0
+            self.excess.pop(x, None)
+            for i in xrange(first[x], first[x + 1]):
+                a = arcs[i]
+                cap[a] = cap[a ^ 1] = capacity[a] = capacity[a ^ 1] = 0
+
+    def cut(self):
+        """
+        Returns the minimum cut of the current flow, which must be
+        maximal: the (u, v) edges with u on the source side and v on the
+        sink side in edge mode, or the cut nodes in vertex mode, as node
+        ids of the graph.
+
+        :rtype list
+        """
+        level = self.levels()
+        head, cap = self.head, self._capacity
+
+        result = []
+        for a in xrange(0, len(head), 2):
+            u, v = head[a ^ 1], head[a]
+            if cap[a] > 0 and level[u] >= 0 and level[v] < 0:
+                result.append(u // 2 if self.vertex else (u, v))
+            elif cap[a ^ 1] > 0 and level[v] >= 0 and level[u] < 0:
+                result.append((v, u))
+
+        return result
+
+    def _split(self, u):
+        """
+        Returns the nodes of the network for node u of the graph.
+        """
+        return (2 * u, 2 * u + 1) if self.vertex else (u,)
+
+    def _degree(self, u, incoming):
+        """
+        Returns the total capacity of the arcs out of node u, or into it if
+        'incoming' is True.
+        """
+        capacity, first, arcs = self._capacity, self.first, self.arcs
+
+        return sum(capacity[arcs[i] ^ 1 if incoming else arcs[i]]
+                   for i in xrange(first[u], first[u + 1]))
+
+    def _route(self, supply, target, initial=None):
+        """
+        Push flow from the nodes in supply, a dictionary of node -> units
+        of flow available, to target along shortest augmenting paths until
+        there is no more augmenting path or supply. Units pushed are
+        subtracted from supply. See levels for 'initial'.
+
+        Returns:
+            The number of units pushed.
+        """
+        head, cap, first, arcs = self.head, self.cap, self.first, self.arcs
+        routed = 0
+
+        while True:
+            starts = [u for u in supply if supply[u] > 0]
+            if not starts:
+                return routed
+
+            level = self.levels(starts, target, initial)
+            if level[target] < 0:
+                return routed
+
+            # Next arc to try for every node
+            current = array('l', first)
+            for start in starts:
+                path = []
+                u = start
+                while supply[start] > 0:
+                    if u == target:
+                        for a in path:
+                            cap[a] -= 1
+                            cap[a ^ 1] += 1
+                        supply[start] -= 1
+                        routed += 1
+                        del path[:]
+                        u = start
+                        continue
+
+                    end = first[u + 1]
+                    i = current[u]
+                    next_level = level[u] + 1
+                    while i < end:
+                        a = arcs[i]
+                        if cap[a] > 0 and level[head[a]] == next_level:
+                            break
+                        i += 1
+                    current[u] = i
+
+                    if i < end:
+                        path.append(arcs[i])
+                        u = head[arcs[i]]
+                    elif u == start:
+                        break
+                    else:
+                        # Dead end, never visit u again in this phase
+                        level[u] = -1
+                        u = head[path.pop() ^ 1]
+                        current[u] += 1
+
+    def _cancel_unit(self, a, removing):
+        """
+        Cancel a unit of flow through arc a, or a flow cycle, for
+        remove_nodes. The flow path through arc a is traced back to the
+        source and forward to the sink or a node with excess.
+        """
+        head, cap = self.head, self.cap
+        source, sink = self.source, self.sink
+
+        # The flow path is node(low) -> ... -> node(high), where the node
+        # with key j has path[j] as its outgoing arc
+        key = {head[a ^ 1]: 0, head[a]: 1}
+        path = {0: a}
+        low, high = 0, 1
+
+        u = head[a]
+        while u != sink:
+            b = self._flow_arc(u)
+            if b is None:
+                break
+
+            v = head[b]
+            if v in key:
+                self._cancel([path[j] for j in xrange(key[v], high)] + [b])
+                return
+
+            path[high] = b
+            high += 1
+            key[v] = high
+            u = v
+        end = u
+
+        u = head[a ^ 1]
+        while u != source:
+            b = self._flow_arc(u, incoming=True)
+            v = head[b ^ 1]
+            if v in key:
+                self._cancel([b] + [path[j] for j in xrange(low, key[v])])
+                return
+
+            low -= 1
+            path[low] = b
+            key[v] = low
+            u = v
+
+        j = low
+        while not removing[head[path[j]]]:
+            j += 1
+
+        self._cancel([path[i] for i in xrange(j, high)])
+
+        start = head[path[j] ^ 1]
+        if start != source:
+            self.excess[start] = self.excess.get(start, 0) + 1
+        if end == sink:
+            self.flow -= 1
+        else:
+            self.excess[end] -= 1
+
+    def _flow_arc(self, u, incoming=False):
+        """
+        Returns an arc carrying flow out of node u, or into it if
+        'incoming' is True, or None if there is none.
+        """
+        cap, capacity, first, arcs = self.cap, self._capacity, self.first, \
+            self.arcs
+
+        for i in xrange(first[u], first[u + 1]):
+            a = arcs[i] ^ 1 if incoming else arcs[i]
+            if capacity[a] > cap[a]:
+                return a
+
+        return None
+
+    def _cancel(self, path):
+        cap = self.cap
+        for a in path:
+            cap[a] += 1
+            cap[a ^ 1] -= 1
+
+
+def min_cut(graph, source=0, sink=1, vertex=False):
+    """
+    Compute a minimum cut between two nodes of a circuit graph. Edges have
+    the capacities of the graph, or 1 if it has none.
+
+    Parameters:
+        graph:
+            The CSRGraph to cut, e.g. from sha1.graph.to_csr().
+        source:
+            Node id of the source.
+        sink:
+            Node id of the sink.
+        vertex:
+            If True, cut nodes (each of capacity 1) instead of edges. The
+            source and sink cannot be cut.
+
+    Returns:
+        (value, cut), where value is the size of the minimum cut (the
+        total capacity of the cut edges) and cut the list of cut edges as
+        (u, v) pairs of node ids with u on the source side, or the list of
+        cut node ids in vertex mode.
+
+    Raises:
+        ValueError if the source and sink are adjacent in vertex mode.
+
+    Example usage:
+        >>> g = to_csr(message, h._outputs)
+        >>> value, cut = min_cut(g)
+        >>> [(g.nodes[u], g.nodes[v]) for (u, v) in cut]
+
+    :type graph CSRGraph
+    :type source int
+    :type sink int
+    :type vertex bool
+    :rtype tuple
+    """
+    network = ResidualGraph(graph, source, sink, vertex)
+    value = network.augment()
+
+    return value, network.cut()
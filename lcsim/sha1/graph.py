@@ -1,4 +1,6 @@
+from array import array
 from collections import deque
+from itertools import chain
 
 import networkx as nx
 
@@ -62,3 +64,428 @@ def to_graph(inputs, weighted=True):
         processed.add(gate)
 
     return result
+
+
+class CSRGraph(object):
+    """
+    Undirected graph of a circuit with dense integer node ids, stored as
+    compressed sparse row (CSR) adjacency arrays: the neighbors of node u
+    are indices[indptr[u]:indptr[u + 1]], so every edge appears once in
+    the neighbors of each of its two nodes. Edges have unit capacity,
+    unless the graph has capacities: then capacities[i] is the capacity
+    of the edge to indices[i], see contract().
+
+    The gate (or terminal name) of node u is nodes[u].
+    """
+
+    def __init__(self, nodes, indptr, indices, capacities=None):
+        """
+        Parameters:
+            nodes:
+                List of the gate of every node id.
+            indptr:
+                array of len(nodes) + 1 offsets into indices.
+            indices:
+                array of the neighbor ids of all nodes.
+            capacities:
+                Optional array of the capacity of every edge in indices.
+
+        :type nodes list
+        :type indptr array.array
+        :type indices array.array
+        :type capacities array.array
+        """
+        self.nodes = nodes
+        self.indptr = indptr
+        self.indices = indices
+        self.capacities = capacities
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def number_of_edges(self):
+        """
+        Returns the number of undirected edges of the graph.
+
+        :rtype int
+        """
+        return len(self.indices) // 2
+
+    def neighbors(self, u):
+        """
+        Returns the ids of the neighbors of node u.
+
+        :type u int
+        :rtype array.array
+        """
+        return self.indices[self.indptr[u]:self.indptr[u + 1]]
+
+    def node_ids(self):
+        """
+        Returns a dictionary keyed by gate (or terminal name) to its node id.
+
+        :rtype dict
+        """
+        return dict((node, u) for u, node in enumerate(self.nodes))
+
+    def subgraph(self, keep, sources, sinks, source='source', sink='sink'):
+        """
+        Returns the subgraph induced by the nodes u for which keep[u] is
+        true, with a source node (id 0) connected to the nodes in
+        'sources' and a sink node (id 1) connected to the nodes in 'sinks',
+        laid out like the result of to_csr(inputs, outputs). Kept nodes
+        keep their order and their entries in nodes.
+
+        Parameters:
+            keep:
+                Sequence of a truth value for every node id.
+            sources:
+                Ids of kept nodes to connect to the source.
+            sinks:
+                Ids of kept nodes to connect to the sink.
+            source:
+                Name of the source node.
+            sink:
+                Name of the sink node.
+
+        Raises:
+            ValueError if a source or sink node is not kept.
+
+        :rtype CSRGraph
+        """
+        indptr, indices, capacities = self.indptr, self.indices, \
+            self.capacities
+
+        nodes = [source, sink]
+        index = array('l', [-1]) * len(self.nodes)
+        for u in xrange(0, len(self.nodes)):
+            if keep[u]:
+                index[u] = len(nodes)
+                nodes.append(self.nodes[u])
+
+        result_indptr = array('l', [0])
+        result_indices = array('l')
+        result_capacities = None if capacities is None else array('l')
+        # Kept node id -> terminal ids connected to the node
+        extra = {}
+        for t, terminals in enumerate((sources, sinks)):
+            for u in sorted(set(terminals)):
+                if index[u] < 0:
+                    raise ValueError('Terminal node %d is not kept' % u)
+
+                result_indices.append(index[u])
+                extra.setdefault(u, []).append(t)
+            result_indptr.append(len(result_indices))
+
+        # Terminal edges have unit capacity
+        if capacities is not None:
+            result_capacities.extend([1] * len(result_indices))
+
+        for u in xrange(0, len(self.nodes)):
+            if index[u] >= 0:
+                for i in xrange(indptr[u], indptr[u + 1]):
+                    if index[indices[i]] >= 0:
+                        result_indices.append(index[indices[i]])
+                        if capacities is not None:
+                            result_capacities.append(capacities[i])
+                terminals = extra.get(u, ())
+                result_indices.extend(terminals)
+                if capacities is not None:
+                    result_capacities.extend([1] * len(terminals))
+                result_indptr.append(len(result_indices))
+
+        return CSRGraph(nodes, result_indptr, result_indices,
+                        result_capacities)
+
+    def to_numpy(self):
+        """
+        Returns (indptr, indices) as NumPy arrays sharing memory with the
+        arrays of the graph.
+
+        Raises:
+            ImportError if NumPy is not installed.
+        """
+        import numpy as np
+
+        return (np.frombuffer(self.indptr, dtype=_numpy_type(self.indptr)),
+                np.frombuffer(self.indices, dtype=_numpy_type(self.indices)))
+
+    def to_scipy(self):
+        """
+        Returns the adjacency matrix of the graph as a scipy.sparse CSR
+        matrix of the edge capacities.
+
+        Raises:
+            ImportError if SciPy is not installed.
+        """
+        import numpy as np
+        from scipy import sparse
+
+        indptr, indices = self.to_numpy()
+        if self.capacities is None:
+            data = np.ones(len(indices), dtype=np.int32)
+        else:
+            data = np.array(self.capacities, dtype=np.int32)
+
+        size = len(self.nodes)
+        return sparse.csr_matrix((data, indices, indptr), shape=(size, size))
+
+    def to_networkx(self, weighted=True):
+        """
+        Returns the graph as a networkx graph with the gates as nodes, the
+        same graph to_graph() returns.
+
+        Parameters:
+            weighted:
+                If True, each edge in the graph will have its capacity (1
+                unless the graph has capacities), otherwise the graph will
+                be unweighted.
+
+        :rtype networkx.Graph
+        """
+        result = nx.Graph()
+        result.add_nodes_from(self.nodes)
+
+        nodes, indptr, indices = self.nodes, self.indptr, self.indices
+        capacities = self.capacities
+        for u in xrange(0, len(nodes)):
+            for i in xrange(indptr[u], indptr[u + 1]):
+                if indices[i] <= u:
+                    continue
+
+                if not weighted:
+                    result.add_edge(nodes[u], nodes[indices[i]])
+                else:
+                    result.add_edge(nodes[u], nodes[indices[i]], capacity=(
+                        1 if capacities is None else capacities[i]))
+
+        return result
+
+
+def to_csr(inputs, outputs=None, source='source', sink='sink'):
+    """
+    Run a BFS on a circuit from the given gates like to_graph(), but return
+    a CSRGraph with dense integer node ids instead of a networkx graph.
+    Node ids are assigned in BFS order, so the adjacency arrays are filled
+    in a single pass without storing any edge twice.
+
+    If 'outputs' is given, the graph also gets a source node (id 0)
+    connected to all input gates and a sink node (id 1) connected to all
+    output gates, with the given names in CSRGraph.nodes, as for a min-cut
+    between the inputs and outputs of a circuit.
+
+    Parameters:
+        inputs:
+            The gates to start the BFS from.
+        outputs:
+            Optional gates to connect to the sink node.
+        source:
+            Name of the source node.
+        sink:
+            Name of the sink node.
+
+    Example usage:
+        >>> message = [gate for in_list in h._inputs for (gate, _) in in_list]
+        >>> g = to_csr(message, h._outputs)
+        >>> [g.nodes[v] for v in g.neighbors(1)]  # output gates
+
+    :type inputs list[ComponentBase]
+    :type outputs list[ComponentBase]
+    :rtype CSRGraph
+    """
+    # id(gate) -> node id; keyed by id so gates are never hashed or compared
+    ids = {}
+    nodes = []
+    indptr = array('l', [0])
+    indices = array('l')
+
+    def node_id(node):
+        key = id(node)
+        u = ids.get(key)
+        if u is None:
+            u = ids[key] = len(nodes)
+            nodes.append(node)
+
+        return u
+
+    if outputs is not None:
+        terminals = {node_id(source): _unique(inputs),
+                     node_id(sink): _unique(outputs)}
+        # id(gate) -> terminal ids connected to the gate
+        extra = {}
+        for u, gates in terminals.iteritems():
+            for gate in gates:
+                extra.setdefault(id(gate), []).append(u)
+    else:
+        terminals = {}
+        extra = {}
+        for gate in inputs:
+            node_id(gate)
+
+    # Nodes are processed in id order, which is the order they were
+    # discovered in, so node u's neighbors are appended right after those
+    # of node u - 1.
+    u = 0
+    while u < len(nodes):
+        if u in terminals:
+            neighbors = [node_id(gate) for gate in terminals[u]]
+        else:
+            gate = nodes[u]
+            neighbors = [node_id(x) for x in _unique(
+                chain(gate.children, gate._input_bits)) if x is not None]
+            neighbors.extend(extra.get(id(gate), ()))
+
+        indices.extend(neighbors)
+        indptr.append(len(indices))
+        u += 1
+
+    return CSRGraph(nodes, indptr, indices)
+
+
+def contract(graph, source=0, sink=1):
+    """
+    Reduce a graph for the minimum edge cut between two of its nodes,
+    without changing the size of the cut:
+
+      - nodes that are not connected to the source are dropped, and so
+        are dead ends, nodes other than the source and sink with a single
+        neighbor, since no flow passes through them;
+      - chains are contracted: a node other than the source and sink with
+        exactly two neighbors is replaced by an edge between them with the
+        smaller capacity of its two edges, as cutting the cheaper one
+        separates them;
+      - parallel edges are merged into one edge with the sum of their
+        capacities.
+
+    Contraction repeats until no node qualifies. Node cuts (vertex mode of
+    flow.min_cut) are not preserved, as contracted nodes can no longer be
+    cut.
+
+    Parameters:
+        graph:
+            The CSRGraph to reduce.
+        source:
+            Node id of the source.
+        sink:
+            Node id of the sink.
+
+    Returns:
+        (contracted, stats):
+            The reduced graph, with the source as node 0, the sink as node
+            1 and the remaining nodes in their original order, and a
+            dictionary of statistics: the number of 'nodes' and 'edges'
+            before and after as (before, after) pairs, the number of
+            'dropped' and 'contracted' nodes, and the 'ratio' of edges
+            after to before. An edge (u, v) of a cut of the reduced graph
+            stands for the cheapest edge of a chain between u and v.
+
+    Example usage:
+        >>> g = to_csr(message, h._outputs)
+        >>> reduced, stats = contract(g)
+        >>> flow.min_cut(reduced)[0] == flow.min_cut(g)[0]
+        True
+
+    :type graph CSRGraph
+    :type source int
+    :type sink int
+    :rtype tuple
+    """
+    indptr, indices, capacities = graph.indptr, graph.indices, \
+        graph.capacities
+    size = len(graph)
+
+    # Nodes connected to the source
+    reached = bytearray(size)
+    reached[source] = 1
+    q = deque([source])
+    while q:
+        u = q.popleft()
+        for i in xrange(indptr[u], indptr[u + 1]):
+            if not reached[indices[i]]:
+                reached[indices[i]] = 1
+                q.append(indices[i])
+
+    # Neighbor -> capacity of every reached node, parallel edges merged
+    adjacency = [None] * size
+    for u in xrange(0, size):
+        if reached[u]:
+            neighbors = adjacency[u] = {}
+            for i in xrange(indptr[u], indptr[u + 1]):
+                v = indices[i]
+                neighbors[v] = neighbors.get(v, 0) + (
+                    1 if capacities is None else capacities[i])
+
+    dropped = size - sum(reached)
+    contracted = 0
+
+    pending = [u for u in xrange(size - 1, -1, -1)
+               if reached[u] and len(adjacency[u]) <= 2]
+    while pending:
+        x = pending.pop()
+        neighbors = adjacency[x]
+        if neighbors is None or len(neighbors) > 2 or x in (source, sink):
+            continue
+
+        for v in neighbors:
+            del adjacency[v][x]
+            pending.append(v)
+
+        if len(neighbors) == 2:
+            (u, a), (v, b) = neighbors.items()
+            capacity = min(a, b)
+            adjacency[u][v] = adjacency[u].get(v, 0) + capacity
+            adjacency[v][u] = adjacency[v].get(u, 0) + capacity
+            contracted += 1
+        else:
+            dropped += 1
+
+        adjacency[x] = None
+
+    order = [source, sink] + [u for u in xrange(0, size)
+                              if adjacency[u] is not None and
+                              u not in (source, sink)]
+    index = dict((u, i) for i, u in enumerate(order))
+
+    result_indptr = array('l', [0])
+    result_indices = array('l')
+    result_capacities = array('l')
+    for u in order:
+        for v, capacity in (adjacency[u] or {}).iteritems():
+            result_indices.append(index[v])
+            result_capacities.append(capacity)
+        result_indptr.append(len(result_indices))
+
+    result = CSRGraph([graph.nodes[u] for u in order], result_indptr,
+                      result_indices, result_capacities)
+
+    edges = (graph.number_of_edges(), result.number_of_edges())
+    return result, {
+        'nodes': (size, len(result)),
+        'edges': edges,
+        'dropped': dropped,
+        'contracted': contracted,
+        'ratio': float(edges[1]) / edges[0] if edges[0] else 1.0,
+    }
+
+
+def _unique(gates):
+    """
+    Returns the gates without duplicates, in order of first occurrence.
+    """
+    seen = set()
+    result = []
+    for gate in gates:
+        if id(gate) not in seen:
+            seen.add(id(gate))
+            result.append(gate)
+
+    return result
+
+
+def _numpy_type(values):
+    """
+    Returns the NumPy dtype of the items of an array.array.
+    """
+    import numpy as np
+
+    return np.dtype('i%d' % values.itemsize)
@@ -1,71 +1,435 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import os
 import sys
-import random
+import time
+from array import array
+from multiprocessing import sharedctypes
 
-import networkx as nx
-
-from lcsim.sha1.graph import to_graph
-from lcsim.circuits import circuit, sources
+from lcsim.sha1 import flow
+from lcsim.sha1 import graph as graphs
+from lcsim import profiling
+from lcsim.circuits import netlist, optimize, storage
+from lcsim.circuits.sources import digital_input_circuit
 from lcsim.sha1 import builder
 from lcsim.components.base import ComponentBase
 
+# Columns of the sweep results, see sweep()
+FIELDS = ['rounds', 'nodes', 'edges', 'reduced_nodes', 'reduced_edges', 'cut',
+          'graph_seconds', 'flow_seconds']
+
+# Graph of all rounds of the current sweep worker process, set up by
+# _initialize_worker.
+_worker = None
 
-def main(rounds=80):
-    sys.setrecursionlimit(100000)
 
-    a = sources.digital_source_int_circuit(0x67452301, 32)
-    b = sources.digital_source_int_circuit(0xEFCDAB89, 32)
-    c = sources.digital_source_int_circuit(0x98BADCFE, 32)
-    d = sources.digital_source_int_circuit(0x10325476, 32)
-    e = sources.digital_source_int_circuit(0xC3D2E1F0, 32)
+def main(rounds=80, outputs=None, cache=None, profile=False, vertex=False,
+         contract=False):
+    """
+    Print the min-cut between the message and the output of the SHA-1
+    circuit reduced to the given number of rounds. If 'outputs' is given,
+    the circuit is first pruned to the cone of those output bits only.
 
-    message_circuit = sources.digital_source_int_circuit(random.getrandbits(512), 512)
+    If 'cache' is a directory, the compiled circuit for each round count is
+    saved there the first time it is built and loaded from the saved
+    netlist on later runs instead of being rebuilt. A saved netlist only
+    keeps the gates in the cone of the outputs, so the graph is smaller
+    than that of a built circuit (with the same min-cut), and the printed
+    sizes are labelled as such. Instead of the number of instantiated
+    components, the number of components of the loaded circuit is printed.
 
-    h0, h1, h2, h3, h4 = builder.block_operation(message_circuit, a, b, c, d, e, rounds)
+    If 'profile' is True, the run is profiled (see lcsim.profiling) and
+    the report is printed at the end.
 
-    # Concatenate results
-    h01 = circuit.stack_circuits('h01', h0, h1)
-    h012 = circuit.stack_circuits('h012', h01, h2)
-    h0123 = circuit.stack_circuits('h0123', h012, h3)
+    If 'vertex' is True, the cut consists of gates instead of wires.
 
-    h = circuit.stack_circuits('H', h0123, h4)
+    If 'contract' is True, the graph is reduced with graph.contract before
+    the min-cut. Contraction only preserves cuts of wires, so it cannot be
+    combined with 'vertex'.
+    """
+    if vertex and contract:
+        raise ValueError('Contraction does not preserve vertex cuts')
+
+    sys.setrecursionlimit(100000)
 
-    g = to_graph(message_circuit._outputs)
+    if profile:
+        profiling.reset()
+        profiling.enable()
 
-    # All gates/nodes that input hooks into
-    # a = set()
-    # for gate in message_circuit._outputs:
-    #     a |= set(g.neighbors(gate))
-    #     g.remove_node(gate)
-    #
-    # g.add_node('source')
-    # for gate in a:
-    #     g.add_edge('source', gate)
-    #
-    # g.add_node('sink')
-    # for gate in h._outputs:
-    #     g.add_edge(gate, 'sink')
+    h = sha1_circuit(rounds, cache)
 
-    g.add_node('source')
-    for gate in message_circuit._outputs:
-        g.add_edge('source', gate, capacity=1)
+    if outputs is not None:
+        h, stats = optimize.prune(h, outputs)
+        print 'Pruned %(removed)d of %(before)d gates outside the cone ' \
+              'of %(outputs)d output bits' % stats
 
-    g.add_node('sink')
-    for gate in h._outputs:
-        g.add_edge(gate, 'sink', capacity=1)
+    # Message bits are the input space of the circuit
+    message = [gate for in_list in h._inputs for (gate, _) in in_list]
+
+    g = graphs.to_csr(message, h._outputs)
 
     print '\n'
     print '---- Min-Cut on Reduced Rounds %d Rounds ----' % rounds
-    print 'Number of nodes in circuit graph: %d' % len(g.nodes())
-    print 'Number of edges in circuit graph: %d' % len(g.edges())
-    print 'Total number of instantiated components: %d' % ComponentBase.count
+    # Saved netlists only keep the gates in the cone of the outputs
+    scope = ' (output cone)' if cache is not None else ''
+    print 'Number of nodes in circuit graph%s: %d' % (scope, len(g))
+    print 'Number of edges in circuit graph%s: %d' % (
+        scope, g.number_of_edges())
+    if cache is None:
+        print 'Total number of instantiated components: %d' % \
+            ComponentBase.count
+    else:
+        print 'Components of the cached netlist: %d' % len(
+            netlist.topological_order(h._outputs))
+
+    if contract:
+        g, stats = graphs.contract(g)
+        print 'Contracted graph: %d nodes, %d edges (%.1f%% of the edges)' % (
+            stats['nodes'][1], stats['edges'][1], 100 * stats['ratio'])
 
-    mc = nx.max_flow(g, 'source', 'sink')
+    mc, _ = flow.min_cut(g, vertex=vertex)
 
     print 'Min-cut size: %d' % mc
 
+    if profile:
+        profiling.disable()
+        print profiling.report()
+
+
+def sha1_circuit(rounds, cache=None):
+    """
+    Returns the SHA-1 circuit for the given number of rounds, loading it
+    from a saved netlist in the 'cache' directory if there is one.
+    """
+    if cache is None:
+        return builder.sha1_circuit(rounds)
+
+    path = os.path.join(cache, 'sha1-%d.lcsn' % rounds)
+    if not os.path.exists(path):
+        storage.save(builder.sha1_circuit(rounds), path)
+
+    return storage.load_circuit(path, 'SHA1')
+
+
+def sweep(rounds=80, processes=None, vertex=False, log=None,
+          contract=False):
+    """
+    Compute the min-cut between the message and the output of the SHA-1
+    circuit reduced to every number of rounds from 0 to 'rounds', with a
+    single build of the circuit.
+
+    The circuit for 'rounds' rounds is built once, with the final addition
+    of the reduced-round results tapped after every round (see
+    builder.block_operation), and exported as one CSR graph. The circuit
+    reduced to r rounds is the fan-in cone of tap r, so its cut problem is
+    the subgraph of the gates in that cone. The cut problems are solved on
+    a pool of worker processes, which inherit the graph arrays in shared
+    memory.
+
+    Parameters:
+        rounds:
+            Maximum number of rounds.
+        processes:
+            Number of worker processes, defaults to the number of CPUs. If
+            1, the cut problems are solved in this process.
+        vertex:
+            If True, the cuts consist of gates instead of wires.
+        log:
+            Optional file to report the result of every round to as it
+            completes.
+        contract:
+            If True, every cut problem is reduced with graph.contract
+            before it is solved. Cannot be combined with 'vertex'.
+
+    Returns:
+        List of dictionaries with the FIELDS of every round, ordered by
+        rounds: the number of nodes and edges of the cut problem and, if
+        it was contracted, of the reduced graph, the min-cut size, and the
+        seconds to derive the cut problem and to solve it.
+
+    :type rounds int
+    :type processes int
+    :type vertex bool
+    :type contract bool
+    :rtype list[dict]
+    """
+    if vertex and contract:
+        raise ValueError('Contraction does not preserve vertex cuts')
+
+    g, inputs, outputs, first, last = _round_graph(rounds)
+
+    shared = (sharedctypes.RawArray('l', g.indptr),
+              sharedctypes.RawArray('l', g.indices),
+              sharedctypes.RawArray('l', first),
+              sharedctypes.RawArray('l', last),
+              sharedctypes.RawArray('l', inputs),
+              sharedctypes.RawArray('l', [u for x in outputs for u in x]),
+              len(outputs), vertex, contract)
+
+    # Largest cut problems first, so no worker is left with one at the end
+    jobs = range(rounds, -1, -1)
+    if processes == 1:
+        _initialize_worker(*shared)
+        results = map(_solve_round, jobs)
+        _report(results, log)
+    else:
+        pool = multiprocessing.Pool(processes, _initialize_worker, shared)
+        try:
+            results = []
+            for result in pool.imap_unordered(_solve_round, jobs):
+                results.append(result)
+                _report([result], log)
+        finally:
+            pool.terminate()
+
+    return sorted(results, key=lambda x: x['rounds'])
+
+
+def cut_profile(rounds=80, vertex=False, log=None):
+    """
+    Compute the same min-cuts as sweep(), for every number of rounds from
+    0 to 'rounds', with a single flow network that is updated from one
+    round to the next instead of solving every cut problem from scratch.
+
+    Going from r to r + 1 rounds removes the gates of the final addition
+    of round r, which is where the flow of round r reaches the sink, and
+    adds the gates of round r + 1 and its final addition. Only the flow
+    through the removed gates is cancelled (see
+    flow.ResidualGraph.remove_nodes); the rest is kept and extended to the
+    new sink.
+
+    Parameters:
+        rounds:
+            Maximum number of rounds.
+        vertex:
+            If True, the cuts consist of gates instead of wires.
+        log:
+            Optional file to report the result of every round to.
+
+    Returns:
+        List of dictionaries of every round, ordered by rounds, with the
+        FIELDS except edges: nodes is the number of nodes of the network
+        for the round, graph_seconds the time to update the network and
+        flow_seconds the time to update the flow.
+
+    :type rounds int
+    :type vertex bool
+    :rtype list[dict]
+    """
+    g, inputs, outputs, first, last = _round_graph(rounds)
+
+    # One network of all rounds, with node 0 as the source and node 1 as
+    # the sink of every round
+    keep = [f >= 0 for f in first]
+    g = g.subgraph(keep, [u for u in inputs if keep[u]],
+                   [u for x in outputs for u in x])
+    kept = [u for u in xrange(0, len(keep)) if keep[u]]
+    first = [-1, -1] + [first[u] for u in kept]
+    last = [-1, -1] + [last[u] for u in kept]
+
+    # Nodes entering and leaving the network after every round
+    entering = [[] for _ in xrange(0, rounds + 1)]
+    leaving = [[] for _ in xrange(0, rounds + 1)]
+    for u in xrange(2, len(g)):
+        entering[first[u]].append(u)
+        leaving[last[u]].append(u)
+
+    network = flow.ResidualGraph(g, vertex=vertex,
+                                 active=[f == 0 for f in first])
+    nodes = 2 + len(entering[0])
+
+    results = []
+    for r in xrange(0, rounds + 1):
+        start = time.time()
+        if r > 0:
+            network.remove_nodes(leaving[r - 1])
+            network.add_nodes(entering[r])
+            nodes += len(entering[r]) - len(leaving[r - 1])
+        prepared = time.time()
+
+        # The flow mostly reaches the new sink through the new gates
+        value = network.augment(entering[r])
+
+        results.append({
+            'rounds': r,
+            'nodes': nodes,
+            'cut': value,
+            'graph_seconds': prepared - start,
+            'flow_seconds': time.time() - prepared,
+        })
+        _report(results[-1:], log)
+
+    return results
+
+
+def write_results(results, path):
+    """
+    Write sweep results to a file, as JSON if the path ends in .json and
+    as CSV with the FIELDS as columns otherwise.
+
+    :type results list[dict]
+    :type path str
+    """
+    with open(path, 'wb') as f:
+        if path.endswith('.json'):
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+        else:
+            writer = csv.DictWriter(f, FIELDS)
+            writer.writeheader()
+            writer.writerows(results)
+
+
+def _round_graph(rounds):
+    """
+    Build the SHA-1 circuit for 'rounds' rounds once, with the results of
+    all reduced rounds tapped, and export it as a CSR graph.
+
+    Returns:
+        (g, inputs, outputs, first, last), where inputs are the node ids
+        of the message gates, outputs[r] those of the output gates of
+        round r, and first and last the rounds range of every node, see
+        _round_ranges.
+    """
+    sys.setrecursionlimit(100000)
+
+    message = digital_input_circuit(512)
+    taps = []
+    builder.hash_circuit(message, rounds, taps=taps)
+
+    inputs = [gate for in_list in message._inputs for (gate, _) in in_list]
+    g = graphs.to_csr(inputs)
+    ids = g.node_ids()
+
+    outputs = [[ids[gate] for gate in tap._outputs] for tap in taps]
+    first, last = _round_ranges(g, ids, outputs)
+
+    return g, [ids[gate] for gate in inputs], outputs, first, last
+
+
+def _round_ranges(g, ids, outputs):
+    """
+    Returns arrays (first, last) of the first and last round whose
+    reduced-round circuit contains each node of g, -1 for nodes in none of
+    them. outputs[r] are the ids of the output gates of round r.
+
+    The gates of round r are in the fan-in cones of all later rounds, so
+    the reduced-round circuits containing a node are a range of rounds.
+    Every cone is walked only as far as gates that have not been reached
+    from an earlier (for first) or later (for last) round.
+    """
+    first = array('l', [-1]) * len(g)
+    last = array('l', [-1]) * len(g)
+
+    for ranges, order in ((first, xrange(0, len(outputs))),
+                          (last, xrange(len(outputs) - 1, -1, -1))):
+        for r in order:
+            stack = []
+            for u in outputs[r]:
+                if ranges[u] < 0:
+                    ranges[u] = r
+                    stack.append(u)
+
+            while stack:
+                for gate in g.nodes[stack.pop()]._input_bits:
+                    # Open inputs of the message gates are None
+                    v = ids.get(gate, -1)
+                    if v >= 0 and ranges[v] < 0:
+                        ranges[v] = r
+                        stack.append(v)
+
+    return first, last
+
+
+def _initialize_worker(indptr, indices, first, last, inputs, outputs, count,
+                       vertex, contract):
+    global _worker
+
+    graph = graphs.CSRGraph(range(0, len(indptr) - 1), array('l', indptr),
+                            array('l', indices))
+    # Output ids of every round, in order
+    width = len(outputs) // count
+    outputs = [array('l', outputs[i:i + width])
+               for i in xrange(0, len(outputs), width)]
+
+    _worker = (graph, array('l', first), array('l', last),
+               array('l', inputs), outputs, vertex, contract)
+
+
+def _solve_round(rounds):
+    """
+    Returns the result of the cut problem for the given number of rounds in
+    a sweep worker process.
+    """
+    graph, first, last, inputs, outputs, vertex, contract = _worker
+
+    start = time.time()
+    keep = [f <= rounds <= l for (f, l) in zip(first, last)]
+    g = graph.subgraph(keep, [u for u in inputs if keep[u]], outputs[rounds])
+
+    result = {
+        'rounds': rounds,
+        'nodes': len(g),
+        'edges': g.number_of_edges(),
+    }
+    if contract:
+        g, _ = graphs.contract(g)
+        result['reduced_nodes'] = len(g)
+        result['reduced_edges'] = g.number_of_edges()
+    prepared = time.time()
+
+    value, _ = flow.min_cut(g, vertex=vertex)
+
+    result['cut'] = value
+    result['graph_seconds'] = prepared - start
+    result['flow_seconds'] = time.time() - prepared
+    return result
+
+
+def _report(results, log):
+    if log is None:
+        return
+
+    for result in results:
+        print >> log, 'Rounds %(rounds)2d: min-cut %(cut)d, %(nodes)d ' \
+                      'nodes, %(flow_seconds).3fs' % result
+
 
 if __name__ == '__main__':
-    for i in xrange(0, 81):
-        main(rounds=i)
+    parser = argparse.ArgumentParser(
+        prog='python -m lcsim.sha1.min_cut_runner',
+        description='Compute the min-cut of the SHA-1 circuit reduced to '
+                    'every number of rounds.')
+    parser.add_argument('-r', '--rounds', type=int, default=80,
+                        help='maximum number of rounds')
+    parser.add_argument('-j', '--processes', type=int,
+                        help='worker processes (default: number of CPUs)')
+    parser.add_argument('--vertex', action='store_true',
+                        help='cut gates instead of wires')
+    parser.add_argument('-i', '--incremental', action='store_true',
+                        help='update one flow network from round to round '
+                             'instead of solving every round separately')
+    parser.add_argument('--contract', action='store_true',
+                        help='contract chains and dead ends of every cut '
+                             'problem before solving it')
+    parser.add_argument('-o', '--output',
+                        help='write the results to this file, as JSON if it '
+                             'ends in .json and as CSV otherwise')
+    args = parser.parse_args()
+
+    if args.contract and (args.vertex or args.incremental):
+        parser.error('--contract cannot be combined with --vertex or '
+                     '--incremental')
+
+    start = time.time()
+    if args.incremental:
+        results = cut_profile(args.rounds, args.vertex, sys.stdout)
+    else:
+        results = sweep(args.rounds, args.processes, args.vertex, sys.stdout,
+                        args.contract)
+    print 'Sweep of %d rounds took %.1fs' % (args.rounds, time.time() - start)
 
-        ComponentBase.count = 0
+    if args.output:
+        write_results(results, args.output)
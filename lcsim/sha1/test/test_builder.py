@@ -2,6 +2,7 @@ import unittest
 import sys
 import random
 
+from lcsim.circuits import hierarchy
 from lcsim.sha1.builder import *
 
 
@@ -160,6 +161,41 @@ class TestAlgorithm(unittest.TestCase):
 
         self.assertEqual(expected, result)
 
+    def test_compiled(self):
+        chunk = random.getrandbits(512)
+        chunk_circuit = digital_source_int_circuit(chunk, 512)
+
+        h = sha1(chunk_circuit)[1]
+        result = int(''.join(map(str, h.compile().evaluate())), 2)
+
+        self.assertEqual(sha1_algorithm(chunk), result)
+
+    def test_circuit_reuse(self):
+        c = sha1_circuit()
+
+        for _ in xrange(0, 3):
+            chunk = random.getrandbits(512)
+            self.assertEqual(sha1_algorithm(chunk), c.evaluate(chunk, int))
+
+        chunk = random.getrandbits(512)
+        result = c.evaluate(encoding.to_bits(chunk, 512), bytes)
+        self.assertEqual(encoding.to_bits(sha1_algorithm(chunk), 160),
+                         encoding.to_bits(result, 160))
+
+        c = sha1_circuit(rounds=17)
+        self.assertEqual(sha1_algorithm(chunk, rounds=17), c.evaluate(chunk, int))
+
+    def test_hierarchical(self):
+        c = sha1_circuit(hierarchical=True)
+        chunk = random.getrandbits(512)
+        self.assertEqual(sha1_algorithm(chunk), c.evaluate(chunk, int))
+
+        c = sha1_circuit(rounds=23, hierarchical=True)
+        self.assertEqual(sha1_algorithm(chunk, rounds=23), c.evaluate(chunk, int))
+
+        hierarchy.flatten(c)
+        self.assertEqual(sha1_algorithm(chunk, rounds=23), c.evaluate(chunk, int))
+
     def test_reduced_rounds(self):
         sys.setrecursionlimit(10000)
 
@@ -173,3 +209,38 @@ class TestAlgorithm(unittest.TestCase):
         result = sha1(chunk_circuit, rounds=r)[0]
 
         self.assertEqual(expected, result)
+
+    def test_taps(self):
+        chunk = random.getrandbits(512)
+        chunk_circuit = digital_source_int_circuit(chunk, 512)
+
+        taps = []
+        h = hash_circuit(chunk_circuit, 24, taps=taps)
+
+        self.assertEqual(25, len(taps))
+        self.assertIs(h, taps[-1])
+        for r, tap in enumerate(taps):
+            result = int(''.join(map(str, tap.compile().evaluate())), 2)
+            self.assertEqual(sha1_algorithm(chunk, rounds=r), result)
+
+
+class TestSequential(unittest.TestCase):
+    def test_function(self):
+        chunk = random.getrandbits(512)
+        chunk_circuit = digital_source_int_circuit(chunk, 512)
+
+        result, h = sha1_sequential(chunk_circuit)
+        self.assertEqual(sha1_algorithm(chunk), result)
+
+        h.reset()
+        h.clock(81)
+        self.assertEqual(sha1_algorithm(chunk), h.evaluate(output_format=int))
+
+    def test_reduced_rounds(self):
+        chunk = random.getrandbits(512)
+
+        for r in [0, 1, 17, 20, 21, random.randint(0, 80)]:
+            chunk_circuit = digital_source_int_circuit(chunk, 512)
+            result = sha1_sequential(chunk_circuit, rounds=r)[0]
+
+            self.assertEqual(sha1_algorithm(chunk, rounds=r), result)
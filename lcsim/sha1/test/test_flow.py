@@ -0,0 +1,192 @@
+import unittest
+import random
+from array import array
+
+import networkx as nx
+
+from lcsim.sha1 import builder
+from lcsim.sha1.flow import *
+from lcsim.sha1.graph import CSRGraph, to_csr
+
+
+def csr_graph(size, edges):
+    adjacency = [[] for _ in xrange(0, size)]
+    for (u, v) in edges:
+        adjacency[u].append(v)
+        adjacency[v].append(u)
+
+    indptr = array('l', [0])
+    indices = array('l')
+    for neighbors in adjacency:
+        indices.extend(neighbors)
+        indptr.append(len(indices))
+
+    return CSRGraph(range(0, size), indptr, indices)
+
+
+def random_graph(rng, size, count):
+    edges = set()
+    for _ in xrange(0, count):
+        u, v = rng.randrange(0, size), rng.randrange(0, size)
+        if u != v and (v, u) not in edges:
+            edges.add((u, v))
+
+    return csr_graph(size, edges)
+
+
+class TestMinCut(unittest.TestCase):
+    def test_path(self):
+        g = csr_graph(4, [(0, 2), (2, 3), (3, 1)])
+
+        self.assertEqual((1, [(0, 2)]), min_cut(g))
+        self.assertEqual((1, [2]), min_cut(g, vertex=True))
+
+    def test_disconnected(self):
+        g = csr_graph(4, [(0, 2), (3, 1)])
+
+        self.assertEqual((0, []), min_cut(g))
+        self.assertEqual((0, []), min_cut(g, vertex=True))
+
+    def test_vertex(self):
+        # Two paths through node 2, so two edges but one node must be cut
+        g = csr_graph(5, [(0, 3), (0, 4), (3, 2), (4, 2), (2, 1)])
+
+        self.assertEqual(1, min_cut(g)[0])
+        self.assertEqual((1, [2]), min_cut(g, vertex=True))
+
+        g = csr_graph(5, [(0, 3), (0, 4), (3, 2), (4, 2), (2, 1), (3, 1)])
+        self.assertEqual(2, min_cut(g)[0])
+        self.assertEqual(2, min_cut(g, vertex=True)[0])
+
+    def test_adjacent(self):
+        g = csr_graph(3, [(0, 1), (0, 2), (2, 1)])
+
+        self.assertEqual(2, min_cut(g)[0])
+        self.assertRaises(ValueError, min_cut, g, vertex=True)
+
+    def test_random(self):
+        rng = random.Random(0)
+        for _ in xrange(0, 100):
+            g = random_graph(rng, rng.randint(2, 20), rng.randint(0, 60))
+            expected = g.to_networkx()
+
+            value, cut = min_cut(g)
+            self.assertEqual(nx.maximum_flow_value(expected, 0, 1), value)
+            self.assertEqual(value, len(cut))
+
+            expected.remove_edges_from(cut)
+            self.assertFalse(nx.has_path(expected, 0, 1))
+
+    def test_random_vertex(self):
+        rng = random.Random(1)
+        for _ in xrange(0, 100):
+            g = random_graph(rng, rng.randint(3, 20), rng.randint(0, 60))
+            expected = g.to_networkx()
+            if expected.has_edge(0, 1):
+                continue
+
+            value, cut = min_cut(g, vertex=True)
+            self.assertEqual(value, len(cut))
+            self.assertNotIn(0, cut)
+            self.assertNotIn(1, cut)
+
+            expected.remove_nodes_from(cut)
+            self.assertFalse(nx.has_path(expected, 0, 1))
+            if value > 0:
+                expected = g.to_networkx()
+                self.assertEqual(
+                    len(nx.minimum_node_cut(expected, 0, 1)), value)
+
+    def test_sha1(self):
+        h = builder.sha1_circuit(2)
+        message = [gate for in_list in h._inputs for (gate, _) in in_list]
+        g = to_csr(message, h._outputs)
+
+        value, cut = min_cut(g)
+
+        self.assertEqual(
+            nx.maximum_flow_value(g.to_networkx(), 'source', 'sink'), value)
+        self.assertEqual(value, len(cut))
+
+
+class TestResidualGraph(unittest.TestCase):
+    def expected(self, g, active, vertex):
+        expected = nx.Graph()
+        expected.add_nodes_from(active)
+        for u in active:
+            for v in g.neighbors(u):
+                if v in active:
+                    expected.add_edge(u, v, capacity=1)
+
+        if not vertex:
+            return nx.maximum_flow_value(expected, 0, 1)
+        if not nx.has_path(expected, 0, 1):
+            return 0
+        return len(nx.minimum_node_cut(expected, 0, 1))
+
+    def check_updates(self, vertex, seed):
+        rng = random.Random(seed)
+        for _ in xrange(0, 40):
+            size = rng.randint(3, 16)
+            g = random_graph(rng, size, rng.randint(0, 50))
+            if vertex and 1 in g.neighbors(0):
+                continue
+
+            active = set([0, 1] + [u for u in xrange(2, size)
+                                   if rng.random() < 0.6])
+            network = ResidualGraph(
+                g, vertex=vertex,
+                active=[u in active for u in xrange(0, size)])
+
+            for _ in xrange(0, 5):
+                nodes = range(2, size)
+                removed = [u for u in nodes if u in active and
+                           rng.random() < 0.3]
+                added = [u for u in nodes if u not in active and
+                         rng.random() < 0.4]
+
+                network.remove_nodes(removed)
+                network.add_nodes(added)
+                active = (active - set(removed)) | set(added)
+
+                value = network.augment(added if rng.random() < 0.5
+                                        else None)
+                self.assertEqual(self.expected(g, active, vertex), value)
+                self.assertEqual(value, len(network.cut()))
+                self.assertEqual({}, network.excess)
+
+    def test_updates(self):
+        self.check_updates(False, 0)
+
+    def test_updates_vertex(self):
+        self.check_updates(True, 1)
+
+    def test_inactive(self):
+        g = csr_graph(4, [(0, 2), (2, 1), (0, 3), (3, 1)])
+        network = ResidualGraph(g, active=[True, True, True, False])
+
+        self.assertEqual(1, network.augment())
+        self.assertEqual([(0, 2)], network.cut())
+
+        network.add_nodes([3])
+        self.assertEqual(2, network.augment())
+
+        network.remove_nodes([2])
+        self.assertEqual({}, network.excess)
+        self.assertEqual(1, network.flow)
+        self.assertEqual(1, network.augment())
+
+    def test_excess(self):
+        # Flow 0 -> 2 -> 3 -> 1, where removing 3 leaves a unit of excess
+        # at 2 that reaches the sink again through 4
+        g = csr_graph(5, [(0, 2), (2, 3), (3, 1), (2, 4), (4, 1)])
+        network = ResidualGraph(g, active=[True, True, True, True, False])
+        self.assertEqual(1, network.augment())
+
+        network.remove_nodes([3])
+        self.assertEqual({2: 1}, network.excess)
+        self.assertEqual(0, network.flow)
+
+        network.add_nodes([4])
+        self.assertEqual(1, network.augment([4]))
+
@@ -0,0 +1,157 @@
+import unittest
+import random
+
+from lcsim.circuits import adders
+from lcsim.sha1 import builder, flow
+from lcsim.sha1.graph import *
+from lcsim.sha1.test.test_flow import csr_graph, random_graph
+
+try:
+    import scipy
+except ImportError:
+    scipy = None
+
+
+def edge_set(g):
+    return set(frozenset(edge) for edge in g.edges())
+
+
+class TestToCSR(unittest.TestCase):
+    def test_adder(self):
+        h = adders.ripple_adder_no_carry(4)
+        inputs = [gate for in_list in h._inputs for (gate, _) in in_list]
+
+        g = to_csr(inputs)
+        expected = to_graph(inputs)
+
+        self.assertEqual(expected.number_of_nodes(), len(g))
+        self.assertEqual(expected.number_of_edges(), g.number_of_edges())
+        self.assertEqual(len(g) + 1, len(g.indptr))
+        self.assertEqual(set(expected.nodes()), set(g.nodes))
+        self.assertEqual(edge_set(expected), edge_set(g.to_networkx()))
+
+        ids = g.node_ids()
+        for gate in g.nodes:
+            self.assertEqual(
+                set(expected.neighbors(gate)),
+                set(g.nodes[v] for v in g.neighbors(ids[gate])))
+
+    def test_terminals(self):
+        h = builder.sha1_circuit(2)
+        message = [gate for in_list in h._inputs for (gate, _) in in_list]
+
+        g = to_csr(message, h._outputs)
+
+        self.assertEqual(['source', 'sink'], g.nodes[:2])
+        self.assertEqual(set(message),
+                         set(g.nodes[v] for v in g.neighbors(0)))
+        self.assertEqual(set(h._outputs),
+                         set(g.nodes[v] for v in g.neighbors(1)))
+
+        # Adjacency is symmetric
+        for u in xrange(0, len(g)):
+            for v in g.neighbors(u):
+                self.assertIn(u, g.neighbors(v))
+
+        expected = to_graph(message)
+        self.assertEqual(
+            expected.number_of_edges() + len(set(message)) +
+            len(set(h._outputs)), g.number_of_edges())
+
+    def test_unweighted(self):
+        h = adders.ripple_adder_no_carry(2)
+        g = to_csr([gate for (gate, _) in h._inputs[0]])
+
+        for _, _, data in g.to_networkx().edges(data=True):
+            self.assertEqual(1, data['capacity'])
+        for _, _, data in g.to_networkx(weighted=False).edges(data=True):
+            self.assertEqual({}, data)
+
+    @unittest.skipIf(scipy is None, 'SciPy is not installed')
+    def test_scipy(self):
+        h = adders.ripple_adder_no_carry(2)
+        g = to_csr([gate for (gate, _) in h._inputs[0]])
+
+        matrix = g.to_scipy()
+        self.assertEqual((len(g), len(g)), matrix.shape)
+        self.assertEqual(2 * g.number_of_edges(), matrix.sum())
+
+
+class TestSubgraph(unittest.TestCase):
+    def test_drop_node(self):
+        h = adders.ripple_adder_no_carry(2)
+        g = to_csr([gate for in_list in h._inputs for (gate, _) in in_list])
+        dropped = len(g) - 1
+        keep = [u != dropped for u in xrange(0, len(g))]
+
+        sub = g.subgraph(keep, [0, 0, 1], [2])
+
+        self.assertEqual(['source', 'sink'] + g.nodes[:-1], sub.nodes)
+        self.assertEqual([2, 3], list(sub.neighbors(0)))
+        self.assertEqual([4], list(sub.neighbors(1)))
+        self.assertEqual(
+            g.number_of_edges() - len(g.neighbors(dropped)) + 3,
+            sub.number_of_edges())
+
+        for u in xrange(0, dropped):
+            expected = set(v + 2 for v in g.neighbors(u) if v != dropped)
+            self.assertEqual(expected,
+                             set(sub.neighbors(u + 2)) - set([0, 1]))
+
+    def test_missing_terminal(self):
+        h = adders.ripple_adder_no_carry(2)
+        g = to_csr([gate for in_list in h._inputs for (gate, _) in in_list])
+
+        self.assertRaises(ValueError, g.subgraph, [False] * len(g), [0], [])
+
+
+class TestContract(unittest.TestCase):
+    def test_chain(self):
+        # source - 2 - 3 - 4 - sink, with a dead end 5 at 3 and node 6
+        # not connected to anything
+        g = csr_graph(7, [(0, 2), (2, 3), (3, 4), (4, 1), (3, 5)])
+
+        reduced, stats = contract(g)
+
+        self.assertEqual([0, 1], reduced.nodes)
+        self.assertEqual([1], list(reduced.neighbors(0)))
+        self.assertEqual([1, 1], list(reduced.capacities))
+        self.assertEqual((7, 2), stats['nodes'])
+        self.assertEqual((5, 1), stats['edges'])
+        self.assertEqual(2, stats['dropped'])
+        self.assertEqual(3, stats['contracted'])
+        self.assertEqual(0.2, stats['ratio'])
+
+    def test_parallel(self):
+        # Two chains from the source to node 2 and a double edge on to the
+        # sink: merged into 2 - sink and 0 - 2 with capacity 2, then node 2
+        # is a chain link itself
+        g = csr_graph(5, [(0, 3), (3, 2), (0, 4), (4, 2), (2, 1), (2, 1)])
+
+        reduced, stats = contract(g)
+
+        self.assertEqual([0, 1], reduced.nodes)
+        self.assertEqual([2, 2], list(reduced.capacities))
+        self.assertEqual((6, 1), stats['edges'])
+        self.assertEqual(2, flow.min_cut(reduced)[0])
+
+    def test_random(self):
+        rng = random.Random(0)
+        for _ in xrange(0, 200):
+            g = random_graph(rng, 12, 16)
+            reduced, _ = contract(g)
+
+            self.assertEqual(flow.min_cut(g)[0], flow.min_cut(reduced)[0])
+            self.assertEqual(flow.min_cut(g)[0],
+                             flow.min_cut(contract(reduced)[0])[0])
+
+    def test_sha1(self):
+        h = builder.sha1_circuit(2)
+        message = [gate for in_list in h._inputs for (gate, _) in in_list]
+        g = to_csr(message, h._outputs)
+
+        reduced, stats = contract(g)
+
+        self.assertEqual(['source', 'sink'], reduced.nodes[:2])
+        self.assertLess(stats['edges'][1], stats['edges'][0])
+        self.assertEqual(flow.min_cut(g)[0], flow.min_cut(reduced)[0])
@@ -0,0 +1,97 @@
+import unittest
+import csv
+import json
+import os
+import shutil
+import tempfile
+
+from lcsim.sha1 import builder, flow
+from lcsim.sha1.graph import to_csr
+from lcsim.sha1.min_cut_runner import *
+
+
+def reduced_cut(rounds, vertex=False):
+    h = builder.sha1_circuit(rounds)
+    message = [gate for in_list in h._inputs for (gate, _) in in_list]
+
+    return flow.min_cut(to_csr(message, h._outputs), vertex=vertex)[0]
+
+
+class TestSweep(unittest.TestCase):
+    def test_cuts(self):
+        results = sweep(3, processes=1)
+
+        self.assertEqual(range(0, 4), [x['rounds'] for x in results])
+        self.assertEqual([reduced_cut(r) for r in xrange(0, 4)],
+                         [x['cut'] for x in results])
+        for x in results:
+            self.assertEqual(
+                set(FIELDS) - set(['reduced_nodes', 'reduced_edges']),
+                set(x))
+
+    def test_pool(self):
+        def cuts(results):
+            return [(x['rounds'], x['nodes'], x['edges'], x['cut'])
+                    for x in results]
+
+        self.assertEqual(cuts(sweep(2, processes=1)),
+                         cuts(sweep(2, processes=2)))
+
+    def test_vertex(self):
+        results = sweep(2, processes=1, vertex=True)
+
+        self.assertEqual([reduced_cut(r, True) for r in xrange(0, 3)],
+                         [x['cut'] for x in results])
+
+    def test_contract(self):
+        results = sweep(3, processes=1, contract=True)
+
+        self.assertEqual([x['cut'] for x in sweep(3, processes=1)],
+                         [x['cut'] for x in results])
+        for x in results:
+            self.assertEqual(set(FIELDS), set(x))
+            self.assertLessEqual(x['reduced_edges'], x['edges'])
+
+        self.assertRaises(ValueError, sweep, 3, vertex=True, contract=True)
+
+
+class TestCutProfile(unittest.TestCase):
+    def test_cuts(self):
+        results = cut_profile(6)
+
+        self.assertEqual(range(0, 7), [x['rounds'] for x in results])
+        self.assertEqual([x['cut'] for x in sweep(6, processes=1)],
+                         [x['cut'] for x in results])
+
+    def test_vertex(self):
+        self.assertEqual(
+            [x['cut'] for x in sweep(3, processes=1, vertex=True)],
+            [x['cut'] for x in cut_profile(3, vertex=True)])
+
+
+class TestWriteResults(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.results = [{'rounds': 0, 'nodes': 2, 'edges': 1, 'cut': 0,
+                         'graph_seconds': 0.5, 'flow_seconds': 0.25}]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_csv(self):
+        path = os.path.join(self.directory, 'sweep.csv')
+        write_results(self.results, path)
+
+        with open(path) as f:
+            rows = list(csv.DictReader(f))
+
+        self.assertEqual(1, len(rows))
+        self.assertEqual('0', rows[0]['cut'])
+        self.assertEqual('0.25', rows[0]['flow_seconds'])
+
+    def test_json(self):
+        path = os.path.join(self.directory, 'sweep.json')
+        write_results(self.results, path)
+
+        with open(path) as f:
+            self.assertEqual(self.results, json.load(f))
@@ -0,0 +1,81 @@
+from lcsim import benchmark
+
+__author__ = 'Jacky'
+
+import unittest
+
+
+def copy_engine(circuit):
+    """
+    Engine for the tests, evaluating a copy of the compiled netlist.
+    """
+    compiled = circuit.compile()
+    return lambda vectors: [compiled.evaluate(v) for v in vectors]
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_cases(self):
+        for name in ['adder-1024', 'bitwise-xor-1024', 'sha1-1', 'sha1-80']:
+            self.assertIn(name, benchmark.CASES)
+
+    def test_run_case(self):
+        result = benchmark.run_case('adder-8', vectors=16)
+
+        self.assertEqual('adder-8', result['case'])
+        self.assertEqual(42, result['gates'])
+        self.assertEqual(list(benchmark.ENGINES), list(result['engines']))
+        for values in result['engines'].itervalues():
+            if 'error' not in values:
+                self.assertTrue(values['matches'])
+                self.assertEqual(16, values['vectors'])
+
+    def test_register_engine(self):
+        def broken(circuit):
+            return lambda vectors: [[0] * len(circuit._outputs)
+                                    for _ in vectors]
+
+        def unavailable(circuit):
+            raise ImportError('No module named missing')
+
+        benchmark.register_engine('broken', broken)
+        benchmark.register_engine('unavailable', unavailable)
+        try:
+            result = benchmark.run_case('adder-8', ['broken', 'unavailable'])
+        finally:
+            del benchmark.ENGINES['broken']
+            del benchmark.ENGINES['unavailable']
+
+        self.assertFalse(result['engines']['broken']['matches'])
+        self.assertIn('error', result['engines']['unavailable'])
+
+    def test_run(self):
+        results = benchmark.run(['bitwise-not-8'], ['netlist'], vectors=4)
+
+        self.assertEqual(1, len(results['results']))
+        result = results['results'][0]
+        self.assertEqual('bitwise-not-8', result['case'])
+        self.assertEqual(['netlist'], list(result['engines']))
+
+        text = benchmark.compare(results, results)
+        self.assertTrue(text.startswith('bitwise-not-8'))
+
+    def test_run_registered_engine(self):
+        benchmark.register_engine('copy', copy_engine)
+        try:
+            results = benchmark.run(['bitwise-not-8'], ['copy'], vectors=4)
+            default = benchmark.run(['bitwise-not-8'], vectors=4)
+        finally:
+            del benchmark.ENGINES['copy']
+
+        engines = results['results'][0]['engines']
+        self.assertEqual(['copy'], list(engines))
+        self.assertTrue(engines['copy']['matches'])
+        self.assertIn('copy', default['results'][0]['engines'])
+
+    def test_run_local_engine(self):
+        benchmark.register_engine('local', lambda circuit: None)
+        try:
+            self.assertRaises(ValueError, benchmark.run, ['bitwise-not-8'],
+                              ['local'])
+        finally:
+            del benchmark.ENGINES['local']
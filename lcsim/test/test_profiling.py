@@ -0,0 +1,108 @@
+from lcsim import profiling
+from lcsim.circuits import adders, circuit, sources
+from lcsim.components import base, gates, sources as components
+from lcsim.sha1 import builder
+
+__author__ = 'Jacky'
+
+import unittest
+
+
+class TestProfiling(unittest.TestCase):
+    def tearDown(self):
+        profiling.disable()
+        profiling.reset()
+
+    def test_evaluate(self):
+        profiling.enable()
+        src = sources.digital_source_int_circuit(0x35, 8)
+        a = adders.ripple_adder_no_carry(4)
+        circuit.connect_circuits(src, a, {i: i for i in xrange(0, 8)})
+
+        self.assertEqual([1, 0, 0, 0], a.evaluate())
+        stats = profiling.stats()
+        # The carry out of the most significant bit is never evaluated
+        self.assertEqual(7, stats.calls['XORGate'])
+        self.assertEqual(5, stats.calls['ANDGate'])
+        self.assertEqual(2, stats.calls['ORGate'])
+        self.assertEqual(8, stats.calls['DigitalOne'] +
+                         stats.calls['DigitalZero'])
+        self.assertEqual(22, sum(stats.circuit_calls.itervalues()))
+        self.assertEqual(6, stats.max_depth)
+
+        # Outputs are evaluated again, their memoized inputs are hits
+        hits = sum(stats.hits.itervalues())
+        a.evaluate()
+        self.assertEqual(26, sum(stats.calls.itervalues()))
+        self.assertEqual(hits + 8, sum(stats.hits.itervalues()))
+
+        self.assertIn('XORGate', profiling.report())
+
+    def test_owners(self):
+        profiling.enable()
+        a = adders.ripple_adder_no_carry(2)
+        src = sources.digital_source_int_circuit(0x5, 4)
+        circuit.connect_circuits(src, a, {i: i for i in xrange(0, 4)})
+        a.evaluate()
+
+        stats = profiling.stats()
+        self.assertEqual(['2Add', 'dSrc'], sorted(stats.circuit_calls))
+        self.assertEqual(4, stats.circuit_calls['dSrc'])
+        # Inner gates of the adder belong to the adder as well
+        self.assertEqual(4, stats.circuit_calls['2Add'])
+
+    def test_keyword_arguments(self):
+        profiling.enable()
+        c = circuit.Circuit('bus', 2, 2)
+        inverters = [gates.NOTGate(), gates.NOTGate()]
+        c.add_input_bus(inverters, offset=0, index=0)
+        c.add_output_component(inverters[0], output_index=0)
+        c.add_output_component(inverters[1], output_index=1)
+
+        circuit.connect_circuits(sources.digital_source_circuit([1, 0]), c,
+                                 {0: 0, 1: 1})
+
+        self.assertEqual([0, 1], c.evaluate())
+        self.assertEqual(2, profiling.stats().circuit_calls['bus'])
+
+    def test_phases(self):
+        profiling.enable()
+        builder.sha1_circuit(rounds=1)
+
+        phases = profiling.stats().phases
+        self.assertEqual(1, phases['lcsim.sha1.builder.block_operation'][0])
+        self.assertEqual(1, phases['lcsim.sha1.builder.create_words'][0])
+        self.assertIn('create_words', profiling.report())
+
+    def test_disable(self):
+        evaluate = gates.ANDGate.__dict__['evaluate']
+        evaluate_inputs = base.ComponentBase.__dict__['evaluate_inputs']
+        block_operation = builder.block_operation
+
+        profiling.enable()
+        self.assertTrue(profiling.is_enabled())
+        self.assertIsNot(evaluate, gates.ANDGate.__dict__['evaluate'])
+        # Inherited methods are instrumented in the subclass
+        self.assertIn('evaluate', components.DigitalZero.__dict__)
+
+        profiling.disable()
+        self.assertFalse(profiling.is_enabled())
+        self.assertIs(evaluate, gates.ANDGate.__dict__['evaluate'])
+        self.assertIs(evaluate_inputs,
+                      base.ComponentBase.__dict__['evaluate_inputs'])
+        self.assertIs(block_operation, builder.block_operation)
+        self.assertNotIn('evaluate', components.DigitalZero.__dict__)
+
+        # Nothing is recorded while disabled
+        adders.ripple_adder_no_carry(2).evaluate(0x5)
+        self.assertEqual(0, sum(profiling.stats().calls.itervalues()))
+
+    def test_reset(self):
+        self.assertIsNone(profiling.stats())
+        self.assertEqual('Profiling was not enabled.', profiling.report())
+
+        profiling.enable()
+        src = sources.digital_source_circuit([1])
+        src.evaluate()
+        profiling.reset()
+        self.assertEqual(0, sum(profiling.stats().calls.itervalues()))